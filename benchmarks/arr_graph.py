@@ -0,0 +1,113 @@
+"""
+Scaling benchmark of argument reconstruction (ARR mode) on object graphs of 10^3 to 10^6 nodes.
+
+Each graph is a balanced binary tree of objects that also all point to one shared object,
+so lookups of already seen objects are exercised too. For each size, reports the time to
+classify the graph (ArgumentReconstructor.is_reconstructible) and to build its fixtures
+(ArgumentReconstructor.make_fixture), per node: with a linear traversal, these stay flat.
+"before" replays the list-based traversal that was used until the graph was keyed by id;
+it is quadratic, so it only runs on the smaller graphs. The fixtures of a graph hold several ASTs per node,
+so they are only built for graphs of up to 10^5 nodes by default (10^6 nodes need several GB).
+
+Run with: python benchmarks/arr_graph.py [max nodes] [max nodes for fixtures]
+"""
+
+import sys
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from explotest.helpers import is_primitive
+from explotest.reconstructors.argument_reconstructor import (
+    ArgumentReconstructor,
+    get_next_attrs,
+    is_bad,
+)
+from explotest.reconstructors.pickle_reconstructor import PickleReconstructor
+
+MAX_BEFORE = 10_000
+MAX_FIXTURES = 100_000
+
+
+class Config:
+    def __init__(self):
+        self.retries = 3
+
+
+class Node:
+    def __init__(self, value: int, config: Config):
+        self.value = value
+        self.config = config
+        self.left = None
+        self.right = None
+
+
+def make_tree(n: int) -> Node:
+    config = Config()
+    nodes = [Node(i, config) for i in range(n - 1)]
+    for i, node in enumerate(nodes):
+        if 2 * i + 1 < len(nodes):
+            node.left = nodes[2 * i + 1]
+        if 2 * i + 2 < len(nodes):
+            node.right = nodes[2 * i + 2]
+    return nodes[0]
+
+
+def before(obj: Any) -> bool:
+    """is_reconstructible, as it was with a list of visited objects."""
+    if is_bad(obj):
+        return False
+    visited: list[Any] = []
+    q: deque[Any] = deque([obj])
+    while q:
+        current = q.popleft()
+        visited.append(current)
+        for _, next_attr in get_next_attrs(current):
+            if not any([next_attr is v for v in visited]) and not is_primitive(
+                next_attr
+            ):
+                visited.append(next_attr)
+                if is_bad(next_attr):
+                    return False
+                q.append(next_attr)
+    return True
+
+
+def timed(f, *args) -> float:
+    start = time.perf_counter()
+    f(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    max_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    max_fixtures = int(sys.argv[2]) if len(sys.argv) > 2 else MAX_FIXTURES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        arr = ArgumentReconstructor(Path(tmp) / "fut.py", PickleReconstructor)
+        print(
+            f"{'nodes':>9} {'classify':>12} {'fixtures':>12} {'before':>12}  (us/node)"
+        )
+        n = 1_000
+        while n <= max_nodes:
+            tree = make_tree(n)
+            classify = timed(ArgumentReconstructor.is_reconstructible, tree)
+            fixtures = (
+                f"{timed(arr.make_fixture, 'tree', tree) / n * 1e6:12.2f}"
+                if n <= max_fixtures
+                else f"{'-':>12}"
+            )
+            old = (
+                f"{timed(before, tree) / n * 1e6:12.2f}"
+                if n <= MAX_BEFORE
+                else f"{'-':>12}"
+            )
+            print(f"{n:>9} {classify / n * 1e6:12.2f} {fixtures} {old}")
+            del tree
+            n *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Time to run the unit test generated for an ARR-mode argument of 10^2 to 10^4 objects, with one fixture per object
+and with builder fixtures (see meta_fixture.make_fixtures), which build the objects in local variables.
+
+Each argument is a balanced binary tree of objects that also all point to one shared object.
+The generated tests are run by pytest in a subprocess, so the times include collecting the test file
+and setting up its fixtures. Each test is run twice: "cold" includes compiling the test file, and "warm"
+reuses the bytecode that pytest cached on the first run.
+
+Run with: python benchmarks/fixture_modes.py [max objects]
+"""
+
+import ast
+import importlib
+import inspect
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from explotest import config
+from explotest.reconstructors.argument_reconstructor import ArgumentReconstructor
+from explotest.test_builder import TestBuilder
+
+FUT = """
+class Config:
+    def __init__(self):
+        self.retries = 3
+
+
+class Node:
+    def __init__(self, value, config):
+        self.value = value
+        self.config = config
+        self.left = None
+        self.right = None
+
+
+def walk(tree):
+    return tree.value
+"""
+
+
+def make_tree(fut, n: int):
+    config = fut.Config()
+    nodes = [fut.Node(i, config) for i in range(n - 1)]
+    for i, node in enumerate(nodes):
+        if 2 * i + 1 < len(nodes):
+            node.left = nodes[2 * i + 1]
+        if 2 * i + 2 < len(nodes):
+            node.right = nodes[2 * i + 2]
+    return nodes[0]
+
+
+def write_test(fut, directory: Path, tree, inline_threshold: int) -> Path:
+    config.inline_threshold = inline_threshold
+    fut_path = directory / "fut.py"
+    builder = TestBuilder(fut_path, "walk", {"tree": tree})
+    builder.build_imports(None).build_fixtures(
+        ArgumentReconstructor(fut_path)
+    ).build_act_phase(inspect.signature(fut.walk))
+    path = directory / f"test_walk_{inline_threshold}.py"
+    path.write_text(ast.unparse(builder.get_meta_test().make_test()))
+    return path
+
+
+def run(path: Path) -> float:
+    # let pytest cache the bytecode of the test file
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", path.name],
+        cwd=path.parent,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    max_objects = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        (directory / "fut.py").write_text(FUT)
+        sys.path.insert(0, tmp)
+        fut = importlib.import_module("fut")
+
+        print(f"{'':>9} {'per object':>25} {'builders':>25}")
+        print(f"{'objects':>9}" + f" {'cold':>12} {'warm':>12}" * 2 + "  (s)")
+        n = 100
+        while n <= max_objects:
+            tree = make_tree(fut, n)
+            times = []
+            for inline_threshold in (sys.maxsize, 0):
+                path = write_test(fut, directory, tree, inline_threshold)
+                times += [run(path), run(path)]
+            print(f"{n:>9}" + "".join(f" {t:12.2f}" for t in times))
+            n *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Import-time benchmark for `python -X importtime -c "import explotest"`.
+
+Reports the cumulative import time of explotest (best of a few runs, since the
+first run also pays for compiling bytecode), the heaviest modules it pulls in,
+and whether dill was loaded.
+
+Run with: python benchmarks/import_time.py [statement]
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+RUNS = 5
+SRC = Path(__file__).parent.parent / "src"
+
+
+def importtime(statement: str) -> dict[str, int]:
+    """Cumulative import time (us) of every module imported by statement, in a fresh interpreter."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    times = {}
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    statement = sys.argv[1] if len(sys.argv) > 1 else "import explotest"
+    runs = [importtime(statement) for _ in range(RUNS)]
+    best = min(runs, key=lambda times: times.get("explotest", 0))
+
+    print(statement)
+    print(f"  explotest: {best.get('explotest', 0) / 1000:.1f} ms (best of {RUNS})")
+    print(f"  dill loaded: {'dill' in best}")
+    print("  heaviest imports:")
+    heaviest = sorted(best.items(), key=lambda kv: kv[1], reverse=True)[1:6]
+    for module, cumulative in heaviest:
+        print(f"    {module:<40} {cumulative / 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
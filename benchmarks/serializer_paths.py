@@ -0,0 +1,60 @@
+"""
+Time to serialize 10^5 objects with serializer.dumps, compared to pickle and dill alone.
+
+"plain" values only hold instances of a class of a library module, which the C pickler saves; "__main__" values
+hold instances of a class of this script, captured for a function of this script (see module_globals.capturing),
+which only dill saves by value. Each value is serialized several times, as the values of successive captures are;
+the best of a few such runs is shown.
+
+Run with: python benchmarks/serializer_paths.py [objects]
+"""
+
+import fractions
+import pickle
+import sys
+import timeit
+from pathlib import Path
+
+import dill
+
+from explotest import module_globals, serializer
+
+CAPTURES = 5
+REPEATS = 3
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def measure(name: str, value, baseline) -> None:
+    with module_globals.capturing(Path(__file__).stem):
+        dumps = min(
+            timeit.repeat(
+                lambda: serializer.dumps(value), number=CAPTURES, repeat=REPEATS
+            )
+        )
+    alone = min(timeit.repeat(lambda: baseline(value), number=CAPTURES, repeat=REPEATS))
+    print(f"{name:>10} {dumps:12.2f} {alone:12.2f}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print(f"{'values':>10} {'dumps':>12} {'alone':>12}  (s, {CAPTURES} captures)")
+    measure(
+        "plain",
+        [fractions.Fraction(i, 7) for i in range(n)],
+        lambda value: pickle.dumps(value, serializer.PROTOCOL),
+    )
+    measure(
+        "__main__",
+        [Point(i, -i) for i in range(n)],
+        lambda value: dill.dumps(value, serializer.PROTOCOL, recurse=True),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of the per-call bookkeeping done by the @explore wrapper.
+
+"before" replays what the wrapper did on every call before capture plans were
+introduced; "after" is what it does now that the plan is built once.
+
+Run with: python benchmarks/wrapper_overhead.py
+"""
+
+import inspect
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from explotest.capture_plan import CapturePlan
+from explotest.helpers import Mode
+from explotest.reconstructors.pickle_reconstructor import PickleReconstructor
+from explotest.test_builder import make_imports
+
+N = 20_000
+
+
+def fut(a, b, c=3, *, d=None):
+    return a
+
+
+def fut_positional(a, b, c=3, d=None):
+    return a
+
+
+def before(func, fut_path: Path, args, kwargs):
+    inspect.getsourcefile(func)
+    signature = inspect.signature(func)
+    bound_args = signature.bind(*args, **kwargs)
+    bound_args.apply_defaults()
+    Mode.from_string("p")
+    package_name = getattr(sys.modules[func.__module__], "__package__", None)
+    make_imports(fut_path, package_name)
+    PickleReconstructor(fut_path)
+    return dict(bound_args.arguments)
+
+
+def after(plan: CapturePlan, args, kwargs):
+    plan.reconstructor
+    return plan.bind(args, kwargs)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        fut_path = Path(tmp) / "fut.py"
+        for func in (fut, fut_positional):
+            plan = CapturePlan.from_function(func, "p")
+            plan.fut_path = fut_path
+
+            args, kwargs = (1, 2), {}
+            t_before = timeit.timeit(
+                lambda: before(func, fut_path, args, kwargs), number=N
+            )
+            t_after = timeit.timeit(lambda: after(plan, args, kwargs), number=N)
+
+            print(f"{func.__name__}{plan.signature}")
+            print(f"  before: {t_before / N * 1e6:8.2f} us/call")
+            print(
+                f"  after:  {t_after / N * 1e6:8.2f} us/call ({t_before / t_after:.0f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,54 @@
+from typing import Any
+
+from .config import (
+    set_compression,
+    set_enabled,
+    set_max_overhead,
+    set_rerun_budget,
+    set_rerun_isolation,
+    set_storage,
+)
 from .explorer import explore, explotest_record
+from .sampling import (
+    AllOf,
+    Always,
+    CircuitBreaker,
+    FirstN,
+    OverheadBudget,
+    Percentage,
+    RateLimit,
+    UniqueArguments,
+)
+
+__all__ = [
+    "explore",
+    "explotest_record",
+    "set_enabled",
+    "set_storage",
+    "set_compression",
+    "set_rerun_isolation",
+    "set_rerun_budget",
+    "set_max_overhead",
+    "Backpressure",
+    "configure_pipeline",
+    "flush",
+    "AllOf",
+    "Always",
+    "CircuitBreaker",
+    "FirstN",
+    "OverheadBudget",
+    "Percentage",
+    "RateLimit",
+    "UniqueArguments",
+]
+
+# the pipeline pulls in dill and the reconstructors, so only import it when it is used
+_pipeline_attributes = ("Backpressure", "configure_pipeline", "flush")
+
+
+def __getattr__(name: str) -> Any:
+    if name in _pipeline_attributes:
+        from . import pipeline
 
-__all__ = ["explore", "explotest_record"]
+        return getattr(pipeline, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
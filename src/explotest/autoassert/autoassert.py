@@ -7,13 +7,15 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any
 
-import dill
-
+from explotest import serializer
+from explotest.autoassert.determinism import Outcome
 from explotest.autoassert.test_runner import ExecutionResult
 from explotest.meta_fixture import MetaFixture
 from explotest.reconstructors.argument_reconstructor import ArgumentReconstructor
 from explotest.reconstructors.pickle_reconstructor import PickleReconstructor
 
+_UNSET = object()
+
 
 class AssertionToGenerate(Enum):
     NULL = 0
@@ -47,11 +49,16 @@ class AssertionGenerator:
     assertion_to_generate: AssertionToGenerate | None = None
     type_data: str | None = None
 
-    def determine_assertion(self, er: ExecutionResult) -> None:
+    def determine_assertion(self, er: ExecutionResult, value: Any = _UNSET) -> None:
         """
         :param er: Result of two runs of the function-under-test
+        :param value: The value the assertion will be generated for, if not er.result_from_run_one.
+        Whether it can be reconstructed or pickled is checked on this value, so the work can be reused
+        (see capture_cache) when generating the assertion.
         :return: Strongest kind of assertion to generate
         """
+        if value is _UNSET:
+            value = er.result_from_run_one
         if er.result_from_run_one is None and er.result_from_run_two is None:
             print("Both results were None, generating NULL assertion")
             self.assertion_to_generate = AssertionToGenerate.NULL
@@ -59,12 +66,12 @@ class AssertionGenerator:
 
         if er.result_from_run_one == er.result_from_run_two:
             print("Objects are equivalent")
-            if ArgumentReconstructor.is_reconstructible(er.result_from_run_one):
+            if ArgumentReconstructor.is_reconstructible(value):
                 print("ARRable")
                 self.assertion_to_generate = AssertionToGenerate.ARR
             else:
                 try:
-                    dill.dumps(er.result_from_run_one)  # try to serialize...
+                    serializer.pickled(value)  # try to serialize...
                     # success if we reach this block
                     print("Serializable")
                     self.assertion_to_generate = AssertionToGenerate.PICKLE
@@ -98,6 +105,23 @@ class AssertionGenerator:
             # other is not none. there's no meaningful assertion to generate between two objects of *different* types.
             self.assertion_to_generate = AssertionToGenerate.NONE
 
+    def assume(self, outcome: Outcome, value: Any) -> None:
+        """
+        Same as determine_assertion, for runs that are known to compare as outcome (see determinism)
+        instead of having been run.
+        :param value: The value the assertion will be generated for
+        """
+        match outcome:
+            case Outcome.EQUAL:
+                self.determine_assertion(ExecutionResult(value, value))
+            case Outcome.SAME_LENGTH if getattr(value, "__len__", False):
+                self.assertion_to_generate = AssertionToGenerate.LENGTH
+            case Outcome.SAME_LENGTH | Outcome.SAME_TYPE:
+                self.assertion_to_generate = AssertionToGenerate.TYPE
+                self.type_data = type(value).__name__
+            case Outcome.DIVERGENT:
+                self.assertion_to_generate = AssertionToGenerate.NONE
+
     def generate_assertion(
         self,
         value: Any,
@@ -0,0 +1,79 @@
+"""
+Determinism profiles: what the reruns of a function-under-test (see test_runner.run_fut_twice) have shown so far,
+so that a function whose reruns keep ending the same way is not rerun on every capture.
+"""
+
+from collections.abc import Sized
+from enum import Enum
+from types import CodeType
+from typing import Any, Optional
+
+from explotest import config
+from explotest.autoassert.test_runner import ExecutionResult
+
+# past the threshold, a rerun checks the outcome at most this many captures apart
+MAX_CHECK_INTERVAL = 1024
+
+
+class Outcome(Enum):
+    """How the return values of two runs compare, from strongest to weakest (see AssertionGenerator)."""
+
+    EQUAL = 1
+    SAME_LENGTH = 2
+    SAME_TYPE = 3
+    DIVERGENT = 4
+
+
+def outcome_of(er: ExecutionResult) -> Outcome:
+    one, two = er.result_from_run_one, er.result_from_run_two
+    if (one is None and two is None) or one == two:
+        return Outcome.EQUAL
+    if type(one) is not type(two):
+        return Outcome.DIVERGENT
+    if isinstance(one, Sized) and isinstance(two, Sized) and len(one) == len(two):
+        return Outcome.SAME_LENGTH
+    return Outcome.SAME_TYPE
+
+
+class DeterminismProfile:
+    """
+    Outcomes of the reruns of one function-under-test. Once config.determinism_threshold reruns in a row have ended
+    with the same outcome, captures reuse it instead of rerunning, except for a check every so often, twice as rarely
+    after each check that agrees. An outcome that disagrees, or a change to the code of the function, starts over.
+    """
+
+    def __init__(self):
+        # code of the function the outcomes are for
+        self.code: Optional[CodeType] = None
+        self.outcome: Optional[Outcome] = None  # outcome of the last rerun
+        self.streak = 0  # reruns in a row that ended with outcome
+        self.interval = 1  # captures between checks
+        self.skipped = 0  # captures since the last rerun
+
+    def predict(self, func: Any) -> Optional[Outcome]:
+        """
+        :param func: The function-under-test, about to be captured
+        :return: The outcome its reruns would end with, or None if they should run.
+        """
+        code = getattr(func, "__code__", None)
+        if code is not self.code:
+            # e.g., the function was redefined: what its old code did says nothing about the new one
+            self.__init__()
+            self.code = code
+        threshold = config.determinism_threshold
+        if threshold <= 0 or self.streak < threshold or self.skipped >= self.interval:
+            return None
+        self.skipped += 1
+        return self.outcome
+
+    def record(self, outcome: Outcome) -> None:
+        """Record the outcome of the reruns of a capture for which predict returned None."""
+        if outcome is self.outcome:
+            self.streak += 1
+            if self.streak > config.determinism_threshold:
+                self.interval = min(2 * self.interval, MAX_CHECK_INTERVAL)
+        else:
+            self.outcome = outcome
+            self.streak = 1
+            self.interval = 1
+        self.skipped = 0
@@ -0,0 +1,663 @@
+"""
+Static analysis of the source of a function-under-test: whether it only computes its return value from its arguments,
+or also does I/O (files, printing, the clock, random numbers, the environment, sockets, ...) or mutates its arguments
+or globals, so that the capture pipeline knows whether rerunning it says anything, and whether it is safe to.
+
+The analysis errs on the side of UNKNOWN: a function is only PURE if every call in it is to a function of the program
+that is PURE too, or to a builtin or library function known not to depend on anything but its arguments. It does not
+follow the methods called on values (e.g., arguments): only those known to be pure (e.g., str.join), to mutate them
+(e.g., append) or to do I/O (e.g., read) are allowed, and any other makes it UNKNOWN.
+"""
+
+import ast
+import builtins
+import dataclasses
+import enum
+import inspect
+import os
+import sys
+import textwrap
+import types
+import warnings
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from explotest import module_globals
+
+# functions referred to by a function are analyzed this many calls deep
+MAX_DEPTH = 8
+
+# names, qualified by module, that do I/O or depend on the state of the outside world: a reference to one of them
+# (or to one of their attributes) makes a function I/O-touching
+IO_NAMES = (
+    "open",
+    "print",
+    "input",
+    "breakpoint",
+    "exec",
+    "eval",
+    "__import__",
+    "io",
+    "_io",
+    "time",
+    "random",
+    "secrets",
+    "socket",
+    "ssl",
+    "select",
+    "selectors",
+    "subprocess",
+    "shutil",
+    "tempfile",
+    "glob",
+    "logging",
+    "sqlite3",
+    "urllib",
+    "http",
+    "requests",
+    "pathlib",
+    "sys.stdin",
+    "sys.stdout",
+    "sys.stderr",
+    "os.environ",
+    "os.getenv",
+    "os.putenv",
+    "os.unsetenv",
+    "os.system",
+    "os.popen",
+    "os.open",
+    "os.read",
+    "os.write",
+    "os.remove",
+    "os.unlink",
+    "os.rename",
+    "os.replace",
+    "os.mkdir",
+    "os.makedirs",
+    "os.rmdir",
+    "os.removedirs",
+    "os.listdir",
+    "os.scandir",
+    "os.walk",
+    "os.stat",
+    "os.getcwd",
+    "os.chdir",
+    "os.urandom",
+    "os.getpid",
+    "os.kill",
+    "os.path.exists",
+    "os.path.isfile",
+    "os.path.isdir",
+    "os.path.getsize",
+    "os.path.getmtime",
+    "datetime.datetime.now",
+    "datetime.datetime.today",
+    "datetime.datetime.utcnow",
+    "datetime.date.today",
+    "uuid.uuid1",
+    "uuid.uuid4",
+    "numpy.random",
+)
+
+# names, qualified by module, of the library functions and classes that only depend on their arguments; those in
+# IO_NAMES are not, e.g., datetime.datetime.now
+PURE_NAMES = (
+    "math",
+    "cmath",
+    "operator",
+    "string",
+    "re",
+    "json",
+    "copy",
+    "bisect",
+    "statistics",
+    "decimal",
+    "fractions",
+    "numbers",
+    "collections",
+    "dataclasses",
+    "enum",
+    "typing",
+    "itertools",
+    "functools",
+    "textwrap",
+    "unicodedata",
+    "base64",
+    "binascii",
+    "hashlib",
+    "struct",
+    "datetime",
+    "zoneinfo",
+    "uuid.UUID",
+    "os.path",
+    "posixpath",
+    "ntpath",
+    "numpy",
+)
+
+# builtins that only depend on their arguments (but, e.g., not next, which advances an iterator, nor id)
+PURE_BUILTINS = frozenset(
+    {
+        "abs",
+        "all",
+        "any",
+        "ascii",
+        "bin",
+        "bool",
+        "bytearray",
+        "bytes",
+        "callable",
+        "chr",
+        "complex",
+        "dict",
+        "divmod",
+        "enumerate",
+        "filter",
+        "float",
+        "format",
+        "frozenset",
+        "getattr",
+        "hasattr",
+        "hash",
+        "hex",
+        "int",
+        "isinstance",
+        "issubclass",
+        "iter",
+        "len",
+        "list",
+        "map",
+        "max",
+        "min",
+        "object",
+        "oct",
+        "ord",
+        "pow",
+        "range",
+        "repr",
+        "reversed",
+        "round",
+        "set",
+        "slice",
+        "sorted",
+        "str",
+        "sum",
+        "super",
+        "tuple",
+        "type",
+        "zip",
+    }
+)
+
+# methods that only depend on the object they are called on and their arguments, whatever it is
+PURE_METHODS = frozenset(
+    {
+        "get",
+        "items",
+        "keys",
+        "values",
+        "copy",
+        "count",
+        "index",
+        "join",
+        "split",
+        "rsplit",
+        "splitlines",
+        "strip",
+        "lstrip",
+        "rstrip",
+        "lower",
+        "upper",
+        "casefold",
+        "title",
+        "capitalize",
+        "swapcase",
+        "startswith",
+        "endswith",
+        "replace",
+        "format",
+        "find",
+        "rfind",
+        "partition",
+        "rpartition",
+        "encode",
+        "decode",
+        "isdigit",
+        "isalpha",
+        "isalnum",
+        "isspace",
+        "islower",
+        "isupper",
+        "isnumeric",
+        "zfill",
+        "ljust",
+        "rjust",
+        "center",
+        "removeprefix",
+        "removesuffix",
+        "union",
+        "intersection",
+        "difference",
+        "symmetric_difference",
+        "issubset",
+        "issuperset",
+        "isdisjoint",
+        "bit_length",
+        "is_integer",
+        "conjugate",
+        "most_common",
+    }
+)
+
+# methods that do I/O or depend on the state of the outside world, whatever they are called on
+IO_METHODS = frozenset(
+    {
+        "read",
+        "readline",
+        "readlines",
+        "write",
+        "writelines",
+        "flush",
+        "recv",
+        "send",
+        "sendall",
+        "read_text",
+        "read_bytes",
+        "write_text",
+        "write_bytes",
+        "random",
+        "randint",
+        "randrange",
+        "choice",
+        "choices",
+        "shuffle",
+        "sample",
+        "uniform",
+        "gauss",
+        "now",
+        "today",
+        "utcnow",
+        "sleep",
+    }
+)
+
+# methods that mutate the object they are called on
+MUTATING_METHODS = frozenset(
+    {
+        "append",
+        "extend",
+        "insert",
+        "remove",
+        "pop",
+        "popitem",
+        "clear",
+        "sort",
+        "reverse",
+        "update",
+        "setdefault",
+        "add",
+        "discard",
+        "difference_update",
+        "intersection_update",
+        "symmetric_difference_update",
+        "appendleft",
+        "extendleft",
+        "popleft",
+        "rotate",
+        "__setitem__",
+        "__delitem__",
+    }
+)
+
+
+class Purity(enum.Enum):
+    """What a function does besides returning a value, from least to most."""
+
+    PURE = 1
+    MUTATES_ARGUMENTS = 2
+    MUTATES_GLOBALS = 3
+    IO = 4
+    UNKNOWN = 5  # e.g., its source is not available
+
+
+@dataclass(frozen=True)
+class Analysis:
+    purity: Purity
+    # the I/O it touches, e.g., "open", "time.time" or ".read" (a method)
+    io: frozenset[str] = frozenset()
+    # names of the globals it rebinds or mutates
+    globals_written: frozenset[str] = frozenset()
+    # names of the parameters it mutates
+    arguments_written: frozenset[str] = frozenset()
+    # the calls it could not tell anything about, e.g., ".next_value" (a method) or "next"
+    unresolved: frozenset[str] = frozenset()
+
+
+UNKNOWN = Analysis(Purity.UNKNOWN)
+
+# analysis of each function-under-test analyzed so far, by code object
+_analyses: dict[types.CodeType, Analysis] = {}
+
+
+def analyze(func: Any) -> Analysis:
+    """The analysis of func (computed once per code object), or UNKNOWN if it cannot be analyzed."""
+    try:
+        func = inspect.unwrap(func)
+        code = getattr(func, "__code__", None)
+    except Exception:
+        # e.g., a cycle of __wrapped__ attributes
+        return UNKNOWN
+    if not isinstance(code, types.CodeType):
+        return UNKNOWN
+    if code not in _analyses:
+        try:
+            _analyses[code] = _analyze(func, {code}, 0) or UNKNOWN
+        except Exception:
+            # the analysis must never fail a capture, e.g., on source it does not expect
+            _analyses[code] = UNKNOWN
+    return _analyses[code]
+
+
+def _parse(
+    func: types.FunctionType,
+) -> Optional[ast.FunctionDef | ast.AsyncFunctionDef]:
+    try:
+        source = textwrap.dedent(inspect.getsource(func))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", SyntaxWarning)
+            tree = ast.parse(source)
+    except (OSError, TypeError, SyntaxError, ValueError):
+        # e.g., a function defined in the interpreter, or a lambda in the middle of an expression
+        return None
+    node = tree.body[0] if tree.body else None
+    if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return None
+    return node
+
+
+def _root(node: ast.expr) -> tuple[Optional[str], list[str]]:
+    """For the expression a.b.c, return ("a", ["b", "c"]); the root is None if it is not a name."""
+    attributes: list[str] = []
+    while isinstance(node, (ast.Attribute, ast.Subscript)):
+        if isinstance(node, ast.Attribute):
+            attributes.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None, []
+    return node.id, attributes[::-1]
+
+
+def _qualified_name(name: str, value: Any, is_builtin: bool) -> Optional[str]:
+    """The name of value qualified by its module, e.g., "time.time" for from time import time."""
+    if is_builtin:
+        return name
+    owner = getattr(value, "__self__", None)
+    if owner is not None and not isinstance(owner, types.ModuleType):
+        # a bound method, e.g., from random import random (a method of an instance of random.Random)
+        cls = owner if isinstance(owner, type) else type(owner)
+        method = getattr(value, "__name__", None)
+        if method is None:
+            return None
+        return f"{cls.__module__}.{cls.__qualname__}.{method}"
+    if value is os.environ:
+        return "os.environ"
+    for stream in ("stdin", "stdout", "stderr"):
+        if value is getattr(sys, stream, None) or value is getattr(
+            sys, f"__{stream}__", None
+        ):
+            return f"sys.{stream}"
+    if isinstance(value, types.ModuleType):
+        return value.__name__
+    module = getattr(value, "__module__", None)
+    qualname = getattr(value, "__qualname__", None)
+    if isinstance(module, str) and isinstance(qualname, str):
+        return qualname if module == "builtins" else f"{module}.{qualname}"
+    return None
+
+
+def _matches(qualified: str, names: tuple[str, ...]) -> bool:
+    return any(qualified == n or qualified.startswith(n + ".") for n in names)
+
+
+def _is_io(qualified: str) -> bool:
+    return _matches(qualified, IO_NAMES)
+
+
+def _chain(node: ast.expr) -> Optional[list[str]]:
+    """For the expression a.b.c, return ["a", "b", "c"], or None if it is not made of names only."""
+    attributes: list[str] = []
+    while isinstance(node, ast.Attribute):
+        attributes.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    return [node.id, *attributes[::-1]]
+
+
+def _program_function(value: Any) -> Optional[types.FunctionType]:
+    """The function of the program's own modules that calling value runs, if any (e.g., the __init__ of a class)."""
+    if isinstance(value, type):
+        value = vars(value).get("__init__")
+    value = inspect.unwrap(value) if callable(value) else value
+    if not isinstance(value, types.FunctionType):
+        return None
+    file = value.__code__.co_filename
+    if file.startswith("<"):
+        # e.g., <frozen posixpath>, or a function written by dataclasses
+        return None
+    if (
+        value.__module__ is not None and value.__module__.split(".")[0] == "explotest"
+    ) or module_globals.is_library_file(file):
+        return None
+    return value
+
+
+def _init_is_pure(cls: type) -> Optional[bool]:
+    """
+    Whether creating an instance of cls only depends on the arguments, as far as its first __init__ in its MRO shows:
+    None if that is one of the program's own, which is to be analyzed instead.
+    """
+    for c in cls.__mro__:
+        if "__init__" not in vars(c):
+            continue
+        if c.__module__ == "builtins":
+            # e.g., object, or Exception
+            return True
+        params = getattr(c, "__dataclass_params__", None)
+        if dataclasses.is_dataclass(c) and params is not None and params.init:
+            # written by dataclasses, from the fields
+            return True
+        if _program_function(c) is not None:
+            return None
+        return False
+    return True
+
+
+def _analyze(
+    func: types.FunctionType, seen: set[types.CodeType], depth: int
+) -> Optional[Analysis]:
+    node = _parse(func)
+    if node is None:
+        return None
+
+    parameters = {a.arg for a in ast.walk(node.args) if isinstance(a, ast.arg)}
+    # what the function runs: not its decorators, nor its annotations
+    body = ast.Module(body=node.body, type_ignores=[])
+    declared_global = {
+        name
+        for n in ast.walk(body)
+        if isinstance(n, (ast.Global, ast.Nonlocal))
+        for name in n.names
+    }
+    local = (
+        parameters
+        | {a.arg for a in ast.walk(body) if isinstance(a, ast.arg)}
+        | {
+            n.id
+            for n in ast.walk(body)
+            if isinstance(n, ast.Name) and isinstance(n.ctx, (ast.Store, ast.Del))
+        }
+    ) - declared_global
+
+    closure = {}
+    if func.__closure__:
+        for name, cell in zip(func.__code__.co_freevars, func.__closure__):
+            try:
+                closure[name] = cell.cell_contents
+            except ValueError:
+                pass
+
+    io: set[str] = set()
+    globals_written: set[str] = set()
+    arguments_written: set[str] = set()
+    unresolved: set[str] = set()
+
+    def written(target: ast.expr) -> None:
+        """Record that target is rebound or mutated."""
+        name, _ = _root(target)
+        if name is None:
+            return
+        if isinstance(target, ast.Name):
+            if name in declared_global:
+                globals_written.add(name)
+        elif name in parameters and name not in declared_global:
+            arguments_written.add(name)
+        elif name not in local:
+            globals_written.add(name)
+
+    def lookup(name: str) -> Optional[tuple[Any, bool]]:
+        """The value name refers to in func, and whether it is a builtin, or None if it is not bound."""
+        if name in closure:
+            return closure[name], False
+        if name in func.__globals__:
+            return func.__globals__[name], False
+        if hasattr(builtins, name):
+            return getattr(builtins, name), True
+        return None
+
+    def method_called(method: str) -> None:
+        """Record a call to a method of a value, which is only known by the name of the method."""
+        if method not in PURE_METHODS | MUTATING_METHODS | IO_METHODS:
+            unresolved.add(f".{method}")
+
+    def called(callee: ast.expr) -> None:
+        """Record a call to callee."""
+        chain = _chain(callee)
+        if chain is None or chain[0] in local:
+            if isinstance(callee, ast.Attribute):
+                # e.g., a method of an argument, or of the value returned by a call
+                method_called(callee.attr)
+            else:
+                # e.g., an argument, a local function or an element of a dict
+                unresolved.add(ast.unparse(callee))
+            return
+        name, *attributes = chain
+        found = lookup(name)
+        if found is None:
+            unresolved.add(name)
+            return
+        value, is_builtin = found
+        if is_builtin and not attributes:
+            exception = isinstance(value, type) and issubclass(value, BaseException)
+            if name not in PURE_BUILTINS and not exception and not _is_io(name):
+                unresolved.add(name)
+            return
+        # look the callee up through modules and classes only: the methods of other objects are only known by name
+        for attribute in attributes:
+            if not isinstance(value, (types.ModuleType, type)):
+                method_called(attributes[-1])
+                return
+            value = getattr(value, attribute, None)
+        if _program_function(value) is not None:
+            # analyzed with the other functions it refers to, below
+            return
+        if isinstance(value, type) and _init_is_pure(value):
+            return
+        root = _qualified_name(name, found[0], is_builtin)
+        qualified = ".".join([root, *attributes]) if root is not None else None
+        if qualified is None or not (
+            _is_io(qualified) or _matches(qualified, PURE_NAMES)
+        ):
+            unresolved.add(qualified or ".".join(chain))
+
+    # attribute chains are resolved whole (e.g., os.path.join), not from each of their parts
+    inner = {id(n.value) for n in ast.walk(body) if isinstance(n, ast.Attribute)}
+    callees: list[Any] = []
+
+    for n in ast.walk(body):
+        match n:
+            case ast.Assign(targets=targets) | ast.Delete(targets=targets):
+                for target in targets:
+                    for t in (
+                        target.elts
+                        if isinstance(target, (ast.Tuple, ast.List))
+                        else [target]
+                    ):
+                        written(t)
+            case ast.AugAssign(target=target) | ast.AnnAssign(target=target):
+                written(target)
+            case ast.Call(func=callee):
+                if isinstance(callee, ast.Attribute):
+                    if callee.attr in IO_METHODS:
+                        io.add(f".{callee.attr}")
+                    if callee.attr in MUTATING_METHODS:
+                        written(callee)
+                called(callee)
+            case ast.Name() | ast.Attribute() if id(n) not in inner and isinstance(
+                n.ctx, ast.Load
+            ):
+                name, attributes = _root(n)
+                if name is None or name in local:
+                    continue
+                found = lookup(name)
+                if found is None:
+                    continue
+                value, is_builtin = found
+                qualified = _qualified_name(name, value, is_builtin)
+                if qualified is not None and _is_io(".".join([qualified, *attributes])):
+                    io.add(".".join([qualified, *attributes]))
+                if not attributes:
+                    callees.append(value)
+                elif isinstance(value, (types.ModuleType, type)):
+                    # e.g., module.function, or Class.staticmethod
+                    for attribute in attributes:
+                        value = getattr(value, attribute, None)
+                    callees.append(value)
+
+    for callee in callees:
+        program_function = _program_function(callee)
+        if program_function is None or program_function.__code__ in seen:
+            continue
+        if depth >= MAX_DEPTH:
+            unresolved.add(program_function.__qualname__)
+            continue
+        seen.add(program_function.__code__)
+        analysis = _analyses.get(program_function.__code__) or _analyze(
+            program_function, seen, depth + 1
+        )
+        if analysis is None:
+            # e.g., its source is not available
+            unresolved.add(program_function.__qualname__)
+            continue
+        # what a callee does to its own arguments is not known to concern ours
+        io |= analysis.io
+        globals_written |= analysis.globals_written
+        unresolved |= analysis.unresolved
+
+    if io:
+        purity = Purity.IO
+    elif globals_written:
+        purity = Purity.MUTATES_GLOBALS
+    elif arguments_written:
+        purity = Purity.MUTATES_ARGUMENTS
+    elif unresolved:
+        purity = Purity.UNKNOWN
+    else:
+        purity = Purity.PURE
+    return Analysis(
+        purity,
+        frozenset(io),
+        frozenset(globals_written),
+        frozenset(arguments_written),
+        frozenset(unresolved),
+    )
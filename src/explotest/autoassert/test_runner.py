@@ -1,9 +1,15 @@
 import os
+import signal
 import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 
-import dill
+from explotest import config, serializer
+from explotest.helpers import thread_state
 
 
 @dataclass(frozen=True)
@@ -12,25 +18,173 @@ class ExecutionResult:
     result_from_run_two: Any
 
 
-def run_fut_twice(func, args, kwargs) -> ExecutionResult | None:
+class RerunTimeout(Exception):
+    """The reruns of a function-under-test were cancelled for taking longer than their budget."""
+
+
+class ThreadSilenceableStream:
     """
-    Calls and runs the function-under-test twice to check for non determinism.
-    :return: tuple of the first and second return values
+    Stands in for sys.stdout while the output of some threads is discarded,
+    so that re-running a function on a background thread does not silence the rest of the program.
     """
-    old_stdout = sys.stdout
-    try:
-        # redirect stdout to /dev/null to prevent extra prints from showing up
-        f = open(os.devnull, "w")
-        sys.stdout = f
 
-        os.environ["RUNNING_GENERATED_TEST"] = "true"
+    def __init__(self, stream):
+        self.stream = stream
+        self.silenced_threads: set[int] = set()
 
-        ret1 = func(*args, **kwargs)
-        ret2 = func(*args, **kwargs)
+    def write(self, s: str) -> int:
+        if threading.get_ident() in self.silenced_threads:
+            return len(s)
+        return self.stream.write(s)
 
-        return ExecutionResult(ret1, ret2)
-    except Exception:
-        return None
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+_stdout_lock = threading.Lock()
+_silenceable_stdout: ThreadSilenceableStream | None = None
+
+
+@contextmanager
+def silenced_stdout():
+    """Discard everything the current thread prints inside this block."""
+    global _silenceable_stdout
+    ident = threading.get_ident()
+    with _stdout_lock:
+        if _silenceable_stdout is None:
+            _silenceable_stdout = ThreadSilenceableStream(sys.stdout)
+            sys.stdout = _silenceable_stdout
+        _silenceable_stdout.silenced_threads.add(ident)
+    try:
+        yield
     finally:
-        sys.stdout = old_stdout
-        os.environ.pop("RUNNING_GENERATED_TEST", None)
+        with _stdout_lock:
+            _silenceable_stdout.silenced_threads.discard(ident)
+            if not _silenceable_stdout.silenced_threads:
+                if sys.stdout is _silenceable_stdout:
+                    sys.stdout = _silenceable_stdout.stream
+                _silenceable_stdout = None
+
+
+def _fork_rerun(func, args, kwargs, out) -> int:
+    """
+    Run func in a child process, which writes its serialized return value to the file out
+    and exits with status 0 (or 1 if func raised, or its return value could not be serialized).
+    :return: The pid of the child.
+    """
+    pid = os.fork()
+    if pid != 0:
+        return pid
+    status = 1
+    try:
+        # the child never returns to the caller: its output, side effects and exit handlers stay out of the program
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        sys.stdout = sys.stderr = open(devnull, "w")
+        thread_state.rerunning = True
+        out.write(serializer.dumps(func(*args, **kwargs)))
+        out.flush()
+        status = 0
+    finally:
+        os._exit(status)
+
+
+def _wait(pid: int, deadline: float) -> Optional[int]:
+    """
+    Wait for the child pid to exit, until deadline (on the time.monotonic clock), and kill it then.
+    :return: Its wait status, or None if it was killed.
+    """
+    delay = 0.001
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return status
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            return None
+        # poll often for short runs, without spinning for long ones
+        time.sleep(min(delay, remaining))
+        delay = min(2 * delay, 0.05)
+
+
+def run_fut_twice_forked(
+    func, args, kwargs, budget: Optional[float] = None
+) -> ExecutionResult | None:
+    """
+    Same as run_fut_twice, but both runs happen at the same time, each in a forked (copy-on-write) child process,
+    so that they cannot change the state of the program. Their return values come back serialized.
+    Children still running budget seconds (or config.fork_rerun_timeout) after they started are killed.
+    """
+    import dill
+
+    if budget is None:
+        budget = config.fork_rerun_timeout
+    deadline = time.monotonic() + budget
+    with tempfile.TemporaryFile() as out1, tempfile.TemporaryFile() as out2:
+        pids = [_fork_rerun(func, args, kwargs, out) for out in (out1, out2)]
+        statuses = [_wait(pid, deadline) for pid in pids]
+        exit_codes = [
+            os.waitstatus_to_exitcode(status)
+            for status in statuses
+            if status is not None
+        ]
+        if len(exit_codes) < len(statuses):
+            raise RerunTimeout
+        if any(exit_codes):
+            return None
+        out1.seek(0)
+        out2.seek(0)
+        try:
+            return ExecutionResult(dill.load(out1), dill.load(out2))
+        except Exception:
+            return None
+
+
+def isolates_reruns() -> bool:
+    """
+    True iff reruns happen in child processes (see run_fut_twice_forked), where their side effects stay.
+    Not while the program runs other threads (e.g., the background pipeline): a child could wait forever for a lock
+    that one of them held when it forked, so reruns happen on the capturing thread then.
+    """
+    return (
+        config.rerun_isolation == "fork"
+        and hasattr(os, "fork")
+        and threading.active_count() == 1
+    )
+
+
+def run_fut_twice(
+    func, args, kwargs, budget: Optional[float] = None
+) -> ExecutionResult | None:
+    """
+    Calls and runs the function-under-test twice to check for non determinism.
+    :param budget: At most how many seconds the runs may take. A run on this thread cannot be interrupted: the second
+    one is cancelled if the first took more than half of it. Forked runs (see isolates_reruns) are killed at the limit.
+    :return: tuple of the first and second return values
+    :raise RerunTimeout: If the runs were cancelled.
+    """
+    if isolates_reruns():
+        return run_fut_twice_forked(func, args, kwargs, budget)
+
+    # prevent extra prints from showing up, and stop decorated functions called by func from generating tests
+    with silenced_stdout():
+        was_rerunning = getattr(thread_state, "rerunning", False)
+        thread_state.rerunning = True
+        try:
+            start = time.perf_counter()
+            ret1 = func(*args, **kwargs)
+            if budget is not None and 2 * (time.perf_counter() - start) > budget:
+                # the second run would most likely end past the budget
+                raise RerunTimeout
+            ret2 = func(*args, **kwargs)
+
+            return ExecutionResult(ret1, ret2)
+        except RerunTimeout:
+            raise
+        except Exception:
+            return None
+        finally:
+            thread_state.rerunning = was_rerunning
@@ -0,0 +1,66 @@
+"""
+Memo of the expensive per-value work done while capturing a call (serializing, checking reconstructibility),
+keyed by object identity.
+
+While a call is captured, the same value may be serialized or traversed several times: e.g., once to decide which
+assertion to generate and once more to save it. Within a scope(), each is done at most once per value.
+Values must not change inside a scope, so scopes must not span a call of the function-under-test.
+"""
+
+import contextlib
+from typing import Any, Callable, Iterator
+
+from .helpers import thread_state
+
+
+@contextlib.contextmanager
+def scope() -> Iterator[None]:
+    """Memoize the work done on this thread until the end of the block. Nested scopes share the outer memo."""
+    if getattr(thread_state, "capture_cache", None) is not None:
+        yield
+        return
+    thread_state.capture_cache = {}
+    try:
+        yield
+    finally:
+        thread_state.capture_cache = None
+
+
+def lookup(kind: str, obj: Any) -> Any:
+    """The memoized result of kind for obj, or None if there is none."""
+    cache = getattr(thread_state, "capture_cache", None)
+    if cache is None:
+        return None
+    entry = cache.get((kind, id(obj)))
+    return entry[1] if entry is not None else None
+
+
+def memoize[T](kind: str, obj: Any, compute: Callable[[], T]) -> T:
+    """
+    :param kind: What is computed, e.g., "pickle"
+    :param compute: Computes the result of kind for obj; exceptions are not memoized
+    :return: The result of compute(), memoized for obj if inside a scope.
+    """
+    cache = getattr(thread_state, "capture_cache", None)
+    if cache is None:
+        return compute()
+    key = (kind, id(obj))
+    entry = cache.get(key)
+    if entry is None:
+        # keep obj alive, so that its id is not reused by another value during the scope
+        entry = cache[key] = (obj, compute())
+    return entry[1]
+
+
+def shared[T](kind: str, factory: Callable[[], T]) -> T:
+    """
+    One factory() per scope (and a new one on every call outside scopes),
+    for memos that are keyed by object identity themselves.
+    """
+    cache = getattr(thread_state, "capture_cache", None)
+    if cache is None:
+        return factory()
+    key = (kind, None)
+    if key not in cache:
+        cache[key] = (None, factory())
+    return cache[key][1]
@@ -0,0 +1,211 @@
+import ast
+import inspect
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, Self
+
+from .autoassert.determinism import DeterminismProfile
+from .helpers import Mode, sanitize_name
+from .reconstructors.abstract_reconstructor import AbstractReconstructor
+from .reconstructors.argument_reconstructor import ArgumentReconstructor
+from .reconstructors.buffer_reconstructor import BufferReconstructor
+from .reconstructors.pickle_reconstructor import PickleReconstructor
+from .test_builder import make_imports
+
+binder_t = Callable[[tuple[Any, ...], dict[str, Any]], dict[str, Any]]
+
+
+def make_default_filter(
+    signature: inspect.Signature,
+) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    """
+    Precompile a function that leaves out of bound arguments (see make_binder) those that are their parameter's
+    default object itself, so that the test lets the function-under-test apply its own default.
+    A default is kept if a later argument must be passed by position (e.g., before a non-empty *args).
+    """
+    parameters = signature.parameters
+    defaults = {
+        p.name: p.default for p in parameters.values() if p.default is not p.empty
+    }
+
+    if all(
+        p.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD for p in parameters.values()
+    ):
+        # the arguments after a missing one are passed by keyword (see TestBuilder.build_act_phase)
+
+        def omit_simple(bound: dict[str, Any]) -> dict[str, Any]:
+            return {
+                name: argument
+                for name, argument in bound.items()
+                if name not in defaults or argument is not defaults[name]
+            }
+
+        return omit_simple
+
+    def omit(bound: dict[str, Any]) -> dict[str, Any]:
+        has_starargs = any(
+            p.kind == inspect.Parameter.VAR_POSITIONAL and bound.get(p.name)
+            for p in parameters.values()
+        )
+
+        def by_position(p: inspect.Parameter) -> bool:
+            return p.kind == inspect.Parameter.POSITIONAL_ONLY or (
+                p.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD and has_starargs
+            )
+
+        kept: dict[str, Any] = {}
+        # whether a later argument is passed by position
+        positional_after = has_starargs
+        for name in reversed(bound):
+            argument = bound[name]
+            p = parameters[name]
+            if (
+                name in defaults
+                and argument is defaults[name]
+                and not (by_position(p) and positional_after)
+            ):
+                continue
+            kept[name] = argument
+            positional_after = positional_after or by_position(p)
+        return dict(reversed(kept.items()))
+
+    return omit
+
+
+def make_binder(signature: inspect.Signature, skip_defaults: bool = False) -> binder_t:
+    """
+    Precompile a function that binds (args, kwargs) to the parameters of signature,
+    filling in defaults. Equivalent to signature.bind(...) followed by apply_defaults().
+    :param skip_defaults: Leave out the arguments that are their parameter's default instead (see make_default_filter).
+    """
+    if skip_defaults:
+        bind = make_binder(signature)
+        omit = make_default_filter(signature)
+        return lambda args, kwargs: omit(bind(args, kwargs))
+
+    def slow_bind(args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
+        bound_args = signature.bind(*args, **kwargs)
+        bound_args.apply_defaults()
+        return dict(bound_args.arguments)
+
+    parameters = signature.parameters.values()
+    if any(p.kind != inspect.Parameter.POSITIONAL_OR_KEYWORD for p in parameters):
+        # *args, **kwargs, keyword-only and positional-only parameters are rare enough
+        # that inspect's own binding is good enough for them
+        return slow_bind
+
+    names = tuple(signature.parameters)
+    defaults = {p.name: p.default for p in parameters if p.default is not p.empty}
+    arity = len(names)
+
+    def fast_bind(args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
+        if len(args) == arity and not kwargs:
+            return dict(zip(names, args))
+        if len(args) > arity:
+            return slow_bind(args, kwargs)
+
+        bound = dict(zip(names, args))
+        n_positional = len(args)
+        used_kwargs = 0
+        for name in names[n_positional:]:
+            if name in kwargs:
+                bound[name] = kwargs[name]
+                used_kwargs += 1
+            elif name in defaults:
+                bound[name] = defaults[name]
+            else:
+                # missing argument, let inspect raise the appropriate TypeError
+                return slow_bind(args, kwargs)
+
+        if used_kwargs != len(kwargs):
+            # unexpected or duplicated keyword argument
+            return slow_bind(args, kwargs)
+        return bound
+
+    return fast_bind
+
+
+@dataclass
+class CapturePlan:
+    """
+    Everything about a function-under-test that ExploTest needs to capture a call to it
+    and that does not change between calls. Built once per decorated function.
+    """
+
+    fut_name: str  # qualified name of the function-under-test
+    fut_path: Path  # source file of the function-under-test
+    signature: inspect.Signature
+    bind: binder_t  # (args, kwargs) -> {parameter: argument}, defaults applied (or left out, see make_binder)
+    mode: Mode
+    imports: list[ast.Import | ast.ImportFrom]  # imports of the generated test file
+    output_dir: Path  # where generated tests are written
+    # at most how many seconds the reruns of the function-under-test may take, if not config.rerun_budget
+    rerun_budget: Optional[float] = None
+    # what the reruns of the function-under-test have shown so far
+    determinism: DeterminismProfile = field(
+        default_factory=DeterminismProfile, repr=False
+    )
+    _reconstructor: Optional[AbstractReconstructor] = field(default=None, repr=False)
+
+    @classmethod
+    def from_function(
+        cls,
+        func: Callable,
+        mode: str,
+        skip_defaults: bool = False,
+        rerun_budget: Optional[float] = None,
+    ) -> Self:
+        fut_name = func.__qualname__
+        source = inspect.getsourcefile(func)
+
+        if source is None:
+            raise FileNotFoundError(
+                f"[ERROR]: ExploTest cannot find the source file of the function {fut_name}."
+            )
+        fut_path = Path(source)
+
+        parsed_mode = Mode.from_string(mode)
+
+        if not parsed_mode:
+            raise KeyError("[ERROR]: Please enter a valid mode ('p' or 'a').")
+
+        signature = inspect.signature(func)
+        package_name = getattr(sys.modules[func.__module__], "__package__", None)
+
+        return cls(
+            fut_name=fut_name,
+            fut_path=fut_path,
+            signature=signature,
+            bind=make_binder(signature, skip_defaults),
+            mode=parsed_mode,
+            imports=make_imports(fut_path, package_name),
+            output_dir=fut_path.parent,
+            rerun_budget=rerun_budget,
+        )
+
+    @property
+    def reconstructor(self) -> AbstractReconstructor:
+        """The reconstructor for this plan's mode, created (with its pickled/ directory) on first use."""
+        if self._reconstructor is None:
+            match self.mode:
+                case Mode.PICKLE:
+                    self._reconstructor = BufferReconstructor(
+                        self.fut_path, PickleReconstructor
+                    )
+                case Mode.ARR:
+                    self._reconstructor = ArgumentReconstructor(
+                        self.fut_path, BufferReconstructor
+                    )
+                case _:
+                    assert False
+        return self._reconstructor
+
+    def __getstate__(self) -> dict[str, Any]:
+        # dill pickles functions defined in __main__ by value, closure (and so this plan) included;
+        # leave out the reconstructor, which holds locks and open stores, and is recreated on first use anyway
+        return {**self.__dict__, "_reconstructor": None}
+
+    def test_path(self, depth: int) -> Path:
+        """Path of the generated test for the depth-th call of the function-under-test."""
+        return self.output_dir / f"test_{sanitize_name(self.fut_name)}_{depth}.py"
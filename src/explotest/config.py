@@ -0,0 +1,139 @@
+"""
+Process-wide ExploTest settings.
+"""
+
+import os
+from typing import Literal, Optional
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off", "")
+
+
+# when False, @explore returns the decorated function itself, so it costs nothing at call time.
+# Must be set before the modules containing decorated functions are imported.
+enabled: bool = _env_flag("EXPLOTEST_ENABLED", True)
+
+
+def set_enabled(value: bool) -> None:
+    """Turn ExploTest on or off for functions decorated from now on."""
+    global enabled
+    enabled = value
+
+
+# where pickled payloads go: "files" (one file per distinct payload) or "archive" (one SQLite file per directory)
+storage: str = os.getenv("EXPLOTEST_STORAGE", "files")
+
+
+def set_storage(kind: Literal["files", "archive"]) -> None:
+    """Choose how pickled payloads are stored from now on."""
+    global storage
+    storage = kind
+
+
+# compression of large payloads: None, "gzip", "lzma" or "zstd" (if available)
+compression: Optional[str] = os.getenv("EXPLOTEST_COMPRESSION") or None
+# payloads of up to this many bytes are kept in memory and never compressed;
+# larger ones are streamed to disk, compressed if compression is set
+compression_threshold: int = int(os.getenv("EXPLOTEST_COMPRESSION_THRESHOLD", 1 << 20))
+
+
+def set_compression(
+    codec: Optional[Literal["gzip", "lzma", "zstd"]], threshold: Optional[int] = None
+) -> None:
+    """Choose how large payloads are compressed from now on, and what counts as large."""
+    global compression, compression_threshold
+    compression = codec
+    if threshold is not None:
+        compression_threshold = threshold
+
+
+# contiguous buffers (NumPy arrays, bytearray, array.array, memoryview) larger than this many bytes
+# are saved as raw files that generated tests map into memory instead of unpickling
+buffer_threshold: int = int(os.getenv("EXPLOTEST_BUFFER_THRESHOLD", 1 << 20))
+
+# lists, tuples and sets of at least this many numbers, strings or bytes (all of the same type) are saved to a file
+# instead of being written out element by element in generated tests
+compact_threshold: int = int(os.getenv("EXPLOTEST_COMPACT_THRESHOLD", 1000))
+
+# generated tests with at least this many fixtures (e.g., for large object graphs in ARR mode) get one fixture per
+# argument, which builds the objects in local variables, instead of one fixture per object (see meta_fixture)
+inline_threshold: int = int(os.getenv("EXPLOTEST_INLINE_THRESHOLD", 100))
+
+# when True, arguments bound to a global of the program's own modules (e.g., a configuration singleton) are referred to
+# as module.name in generated tests instead of being copied (see module_globals); a test gets the value that importing
+# the module gives the global, so this is only right for globals the program does not change after that
+by_reference: bool = _env_flag("EXPLOTEST_BY_REFERENCE", False)
+
+# how the function-under-test is re-run to check that it is deterministic: "inline" (on the capturing thread, one run
+# after the other) or "fork" (concurrently, in forked child processes, so that the side effects of the reruns stay
+# there; only where os.fork exists, inline elsewhere)
+rerun_isolation: str = os.getenv("EXPLOTEST_RERUN_ISOLATION", "inline")
+
+# forked reruns still running this many seconds after they started are killed, unless a rerun budget sets another limit
+fork_rerun_timeout: float = float(os.getenv("EXPLOTEST_FORK_RERUN_TIMEOUT", 60))
+
+
+def set_rerun_isolation(kind: Literal["inline", "fork"]) -> None:
+    """Choose how the function-under-test is re-run from now on."""
+    global rerun_isolation
+    rerun_isolation = kind
+
+
+# once this many captures of a function in a row have had reruns that compare the same way (e.g., equal return values),
+# its captures reuse that instead of rerunning it, except for occasional checks (see autoassert.determinism); 0 means
+# always rerun
+determinism_threshold: int = int(os.getenv("EXPLOTEST_DETERMINISM_THRESHOLD", 20))
+
+# when False, functions that the static analysis of their source (see autoassert.purity) finds to do I/O or to mutate
+# their arguments or globals are not re-run on the capturing process (they are with rerun_isolation "fork"): their
+# tests only get an assertion on the type of their return value
+rerun_side_effects: bool = _env_flag("EXPLOTEST_RERUN_SIDE_EFFECTS", True)
+
+# when True, functions that the static analysis of their source finds to be pure, and that return plain values, are not
+# re-run: their tests assert that the return value is equal
+skip_pure_reruns: bool = _env_flag("EXPLOTEST_SKIP_PURE_RERUNS", False)
+
+# at most how many seconds the reruns of a function-under-test may take, unless its @explore sets its own: reruns that
+# would take longer, judging by the captured call, are skipped, and reruns that do are cancelled (see
+# pipeline.CaptureJob.run); None means no limit
+rerun_budget: Optional[float] = (
+    float(os.environ["EXPLOTEST_RERUN_BUDGET"])
+    if os.getenv("EXPLOTEST_RERUN_BUDGET")
+    else None
+)
+
+
+def set_rerun_budget(seconds: Optional[float]) -> None:
+    """Limit the time the reruns of each function-under-test take from now on (None for no limit)."""
+    global rerun_budget
+    rerun_budget = seconds
+
+
+# at most what percentage of the time a function-under-test runs ExploTest may add to its calls, on average: calls are
+# captured at the rate that keeps to it (see sampling.OverheadBudget); None means no limit. Read when functions are
+# decorated.
+max_overhead: Optional[float] = (
+    float(os.environ["EXPLOTEST_MAX_OVERHEAD"])
+    if os.getenv("EXPLOTEST_MAX_OVERHEAD")
+    else None
+)
+
+
+def set_max_overhead(percent: Optional[float]) -> None:
+    """Limit the time ExploTest adds to the calls of the functions decorated from now on (None for no limit)."""
+    global max_overhead
+    max_overhead = percent
+
+
+# the calls of a function-under-test are not captured for a while once this many captures in a row have failed, or
+# have added more than max_capture_latency seconds (if set) to their call (see sampling.CircuitBreaker); 0 means never
+max_capture_failures: int = int(os.getenv("EXPLOTEST_MAX_CAPTURE_FAILURES", 5))
+max_capture_latency: Optional[float] = (
+    float(os.environ["EXPLOTEST_MAX_CAPTURE_LATENCY"])
+    if os.getenv("EXPLOTEST_MAX_CAPTURE_LATENCY")
+    else None
+)
@@ -1,24 +1,13 @@
-import ast
 import functools
-import inspect
-import sys
-from pathlib import Path
+import time
 from typing import Any, Callable
 from typing import Literal
 
-import dill
-
-from .autoassert import test_runner
-from .autoassert.autoassert import (
-    AssertionGenerator,
-)
-from .helpers import Mode, sanitize_name, is_running_under_test
-from .reconstructors.argument_reconstructor import ArgumentReconstructor
-from .reconstructors.pickle_reconstructor import PickleReconstructor
-from .test_builder import TestBuilder
+from . import config
+from .helpers import is_running_under_test
+from .sampling import AllOf, CapturePolicy, CircuitBreaker, OverheadBudget
 
 record = False
-dill.settings["recurse"] = True
 
 
 def explotest_record():
@@ -26,18 +15,55 @@ def explotest_record():
     record = True
 
 
+def _governor(policy: CapturePolicy | None) -> CapturePolicy | None:
+    """policy, behind the limits on the cost of capturing that every function-under-test gets (see config)."""
+    policies = []
+    if config.max_capture_failures > 0:
+        policies.append(
+            CircuitBreaker(config.max_capture_failures, config.max_capture_latency)
+        )
+    if config.max_overhead is not None:
+        policies.append(OverheadBudget(config.max_overhead))
+    if policy is not None:
+        # last, so that calls refused by the limits do not count against it (e.g., FirstN)
+        policies.append(policy)
+    if not policies:
+        return None
+    return policies[0] if len(policies) == 1 else AllOf(*policies)
+
+
+def _report(func: Callable, e: Exception) -> None:
+    print(
+        f"ExploTest failed creating a unit test for the function {func.__qualname__}: {e!r}"
+    )
+
+
 def explore(
     func: Callable | None = None,
     *,
     mode: Literal["p", "a"] = "p",
     explicit_record: bool = False,
+    policy: CapturePolicy | None = None,
+    background: bool = False,
+    skip_defaults: bool = False,
+    rerun_budget: float | None = None,
 ) -> Callable:
     """Add the @explore annotation to a function to recreate its arguments at runtime.
     See the docs for an explanation of the optional arguments.
     """
 
     def _explore(_func):
+        if not config.enabled:
+            # leave the function untouched, with no wrapper frame
+            return _func
+
+        # only import the machinery (and dill) when something is actually explored
+        from .capture_plan import CapturePlan
+        from .pipeline import CaptureJob, get_pipeline
+
         counter = 0
+        plan: CapturePlan | None = None
+        governor = _governor(policy)
 
         # preserve docstrings, etc. of original fn
         @functools.wraps(_func)
@@ -50,81 +76,67 @@ def explore(
             if is_running_under_test():
                 return _func(*args, **kwargs)
 
+            # decide whether to capture before doing any work for this call
+            if governor is not None and not governor.should_capture(args, kwargs):
+                if not governor.timed:
+                    return _func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return _func(*args, **kwargs)
+                finally:
+                    governor.record(time.perf_counter() - start, None)
+
             nonlocal counter
             counter += 1
 
             # fix depth at current recursion depth (otherwise all counters will be at the last one)
             depth = counter
 
-            fut_name = _func.__qualname__
-            source = inspect.getsourcefile(_func)
-
-            if source is None:
-                raise FileNotFoundError(
-                    f"[ERROR]: ExploTest cannot find the source file of the function {fut_name}."
-                )
-            fut_path = Path(source)
-
-            # grab formal signature of func
-            fut_signature = inspect.signature(_func)
-            # bind it to given args and kwargs
-            bound_args = fut_signature.bind(*args, **kwargs)
-            # fill in default arguments, if needed
-            bound_args.apply_defaults()
-
-            parsed_mode = Mode.from_string(mode)
-
-            if not parsed_mode:
-                raise KeyError("[ERROR]: Please enter a valid mode ('p' or 'a').")
-
-            match parsed_mode:
-                case Mode.PICKLE:
-                    reconstructor = PickleReconstructor(fut_path)
-                case Mode.ARR:
-                    reconstructor = ArgumentReconstructor(fut_path, PickleReconstructor)
-                case _:
-                    assert False
-
-            bound_args = {**dict(bound_args.arguments)}
-            test_builder = TestBuilder(
-                fut_path,
-                fut_name,
-                bound_args,
-            )
-
-            test_builder.build_imports(
-                getattr(sys.modules[_func.__module__], "__package__", None)
-            ).build_fixtures(reconstructor).build_act_phase(fut_signature)
-            test_builder.build_mocks({}, reconstructor)
+            # capturing fails open: whatever goes wrong, the function still runs and returns as usual
+            start = time.perf_counter()
+            job: CaptureJob | None
+            try:
+                # everything that does not depend on the arguments is only computed on the first call
+                nonlocal plan
+                if plan is None:
+                    plan = CapturePlan.from_function(
+                        _func, mode, skip_defaults, rerun_budget
+                    )
+
+                job = CaptureJob(plan, _func, args, kwargs, depth, policy=governor)
+                if background:
+                    # only copy the arguments now; they are saved on the worker thread
+                    job.snapshot()
+                else:
+                    job.arrange()
+            except Exception as e:
+                _report(_func, e)
+                if governor is not None:
+                    governor.record_outcome(True)
+                job = None
+            overhead = time.perf_counter() - start
 
             # this has to be below where we save the arguments to avoid mutation affecting the saved
             # arguments
+            start = time.perf_counter()
             res: Any = _func(*args, **kwargs)
-
-            if explicit_record and not record:
-                return res
-
-            execution_result = test_runner.run_fut_twice(_func, args, kwargs)
-            # add assertions
-            if execution_result:
-                assertion_generator = AssertionGenerator()
-                assertion_generator.determine_assertion(execution_result)
-                assertion_result = assertion_generator.generate_assertion(res, fut_path)
-                test_builder.build_assertions(assertion_result)
-
-            meta_test = test_builder.get_meta_test()
-
-            # write test to a file
-            if meta_test:
-                with open(
-                    f"{fut_path.parent}/test_{sanitize_name(fut_name)}_{depth}.py",
-                    "w",
-                ) as f:
-                    f.write(ast.unparse(meta_test.make_test()))
-            else:
-                print(
-                    f"ExploTest failed creating a unit test for the function {fut_name}."
-                )
+            runtime = time.perf_counter() - start
+
+            if job is not None and not (explicit_record and not record):
+                job.duration = runtime
+                start = time.perf_counter()
+                try:
+                    if background:
+                        get_pipeline().submit(job.snapshot_result(res))
+                    else:
+                        job.result = res
+                        job.run()
+                except Exception as e:
+                    # job.run has told the governor
+                    _report(_func, e)
+                overhead += time.perf_counter() - start
+            if governor is not None:
+                governor.record(runtime, overhead)
             return res
 
         return wrapper
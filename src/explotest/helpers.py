@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 import uuid
 from collections.abc import Iterable
 from enum import Enum
@@ -28,6 +29,10 @@ class Mode(Enum):
 
 collection_t = list | set | dict | tuple
 primitive_t = int | float | complex | str | bool | None
+# the exact types of primitives and collections: instances of subclasses (e.g., IntEnum members or namedtuples)
+# cannot be written as literals
+PRIMITIVE_TYPES = frozenset({int, float, complex, str, bool, type(None)})
+COLLECTION_TYPES = frozenset({list, set, dict, tuple})
 
 
 def is_lib_file(filepath: str) -> bool:
@@ -43,16 +48,24 @@ def sanitize_name(name: str) -> str:
 
 
 def flatten(x):
-    if isinstance(x, Iterable):
-        return [a for i in x for a in flatten(i)]
-    else:
-        return [x]
+    """The non-iterable items of arbitrarily nested iterables, in order (strings and bytes are items)."""
+    result = []
+    stack = [iter([x])]
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, Iterable) and not isinstance(item, (str, bytes)):
+                stack.append(iter(item))
+                break
+            result.append(item)
+        else:
+            stack.pop()
+    return result
 
 
 def is_primitive(x: Any) -> bool:
     """
     True iff x is a primitive type (int, float, str, bool),
-    or a collection of primitive types.
+    or a collection of primitive types (but not of a subclass of one of these types).
     """
 
     def is_collection_of_primitive(cox: collection_t) -> bool:
@@ -61,18 +74,26 @@ def is_primitive(x: Any) -> bool:
             return all(is_primitive(k) and is_primitive(v) for k, v in cox.items())
         return all(is_primitive(item) for item in cox)
 
-    if isinstance(x, collection_t):
+    if type(x) in COLLECTION_TYPES:
         return is_collection_of_primitive(x)
 
-    return isinstance(x, primitive_t)
+    return type(x) in PRIMITIVE_TYPES
 
 
 def is_collection(x: Any) -> bool:
     return isinstance(x, collection_t)
 
 
+# per-thread state, e.g., whether this thread is re-running a function-under-test
+thread_state = threading.local()
+
+
 def is_running_under_test():
-    """Returns True iff the program-under-test is a test program."""
+    """Returns True iff the program-under-test is a test program, or is being re-run by ExploTest."""
     # the pytest in sys.modules part is needed if the file containing the FUT has some code not wrapped in an
     # if __name__ == "__main__" block as it will be executed
-    return os.getenv("RUNNING_GENERATED_TEST") == "true" or "pytest" in sys.modules
+    return (
+        os.getenv("RUNNING_GENERATED_TEST") == "true"
+        or "pytest" in sys.modules
+        or getattr(thread_state, "rerunning", False)
+    )
@@ -1,8 +1,8 @@
 import ast
-from dataclasses import dataclass
-from typing import Self
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Self
 
-from .helpers import flatten
+from . import config
 
 
 @dataclass(frozen=True)
@@ -15,41 +15,331 @@ class MetaFixture:
     parameter: str  # parameter that this fixture generates
     body: list[ast.stmt]  # body of the fixture
     ret: ast.Return | ast.Yield  # return value of the fixture
+    imports: list[ast.Import | ast.ImportFrom] = field(
+        default_factory=list
+    )  # imports the body needs in the test file
 
-    def make_fixture(self) -> list[ast.FunctionDef]:
-        return self._make_fixture(set())
+    @classmethod
+    def alias(cls, parameter: str, fixture: Self) -> Self:
+        """A fixture for parameter that generates the very object that fixture generates."""
+        return cls(
+            [fixture],
+            parameter,
+            [],
+            ast.Return(
+                value=ast.Name(id=f"generate_{fixture.parameter}", ctx=ast.Load())
+            ),
+        )
 
-    def _make_fixture(self, seen) -> list[ast.FunctionDef]:
+    def make_fixture(self) -> list[ast.FunctionDef]:
         """
-        Concretize this abstract fixture into a PyTest Fixture.
+        Concretize this abstract fixture into PyTest Fixtures.
 
-        :return: This MetaFixture as an AST and its dependencies.
+        :return: This MetaFixture as an AST, followed by its dependencies, each before its own dependencies.
         """
+        return make_fixtures([self])
+
+    def required_imports(self) -> list[ast.Import | ast.ImportFrom]:
+        """Imports needed by this fixture and all of its (transitive) dependencies."""
+        return required_imports([self])
+
+    def topological_order(self) -> list["MetaFixture"]:
+        """This fixture and its (transitive) dependencies (see topological_order)."""
+        return topological_order([self])
+
+    def _make_function(self) -> ast.FunctionDef:
+        """Concretize this abstract fixture (alone) into a PyTest Fixture."""
 
         # adds the @pytest.fixture decorator
         pytest_deco = ast.Attribute(
             value=ast.Name(id="pytest", ctx=ast.Load()), attr="fixture", ctx=ast.Load()
         )
 
-        if self.parameter in seen:
-            return []
-        seen.add(self.parameter)
+        # creates a new function definition with name generate_{parameter}
+        return ast.fix_missing_locations(
+            ast.FunctionDef(
+                name=f"generate_{self.parameter}",
+                args=ast.arguments(
+                    args=[
+                        # an object may be needed more than once (e.g., in two attributes)
+                        ast.arg(arg=f"generate_{parameter}")
+                        for parameter in dict.fromkeys(
+                            dependency.parameter for dependency in self.depends
+                        )
+                    ]
+                ),
+                body=self.body + [self.ret],
+                decorator_list=[pytest_deco],
+            )
+        )
 
-        dependency_fixtures = [dep._make_fixture(seen) for dep in self.depends]
 
-        # creates a new function definition with name generate_{parameter}
-        return [
-            ast.fix_missing_locations(
-                ast.FunctionDef(
-                    name=f"generate_{self.parameter}",
-                    args=ast.arguments(
-                        args=[
-                            ast.arg(arg=f"generate_{dependency.parameter}")
-                            for dependency in self.depends
-                        ]
+def topological_order(fixtures: list[MetaFixture]) -> list[MetaFixture]:
+    """
+    The fixtures and their (transitive) dependencies, once per parameter, each after all of its dependencies,
+    so that dependencies shared by several fixtures are only generated once.
+    The dependencies are walked with an explicit stack rather than recursion, so their depth is only bounded
+    by memory. A dependency on a fixture that is still being walked (i.e., a cycle) is skipped.
+    """
+    return _walk(fixtures)[0]
+
+
+def _walk(fixtures: list[MetaFixture]) -> tuple[list[MetaFixture], bool]:
+    """The topological order of the fixtures (see topological_order), and whether their dependencies have cycles."""
+    order = []
+    visited = set()
+    done = set()
+    cyclic = False
+    # walked last to first, so that the reverse order lists the fixtures and dependencies as they are declared
+    for root in reversed(fixtures):
+        if root.parameter in visited:
+            continue
+        visited.add(root.parameter)
+        stack = [(root, reversed(root.depends))]
+        while stack:
+            fixture, dependencies = stack[-1]
+            for dependency in dependencies:
+                if dependency.parameter not in visited:
+                    visited.add(dependency.parameter)
+                    stack.append((dependency, reversed(dependency.depends)))
+                    break
+                if dependency.parameter not in done:
+                    cyclic = True
+            else:
+                stack.pop()
+                order.append(fixture)
+                done.add(fixture.parameter)
+    return order, cyclic
+
+
+def make_fixtures(fixtures: list[MetaFixture]) -> list[ast.FunctionDef]:
+    """
+    Concretize the fixtures and all of their dependencies into PyTest Fixtures, generating each once.
+    Large or cyclic graphs of fixtures are concretized into builder fixtures (see _make_builders),
+    and others into one PyTest Fixture per MetaFixture.
+
+    :return: The fixtures as ASTs, in order, each before its own dependencies.
+    """
+    order, cyclic = _walk(fixtures)
+    if cyclic or len(order) >= config.inline_threshold:
+        return _make_builders(fixtures, order)
+    return [fixture._make_function() for fixture in reversed(order)]
+
+
+def _components(order: list[MetaFixture]) -> list[list[MetaFixture]]:
+    """
+    The strongly connected components of the fixtures (i.e., the cycles, or single fixtures), each after all of the
+    components it depends on. Tarjan's algorithm, with an explicit stack rather than recursion.
+
+    :param order: The topological order of the fixtures (see topological_order)
+    """
+    by_parameter = {fixture.parameter: fixture for fixture in order}
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    stack: list[MetaFixture] = []
+    on_stack: set[str] = set()
+    components: list[list[MetaFixture]] = []
+
+    def visit(fixture: MetaFixture) -> tuple[MetaFixture, Iterator[MetaFixture]]:
+        index[fixture.parameter] = low[fixture.parameter] = len(index)
+        stack.append(fixture)
+        on_stack.add(fixture.parameter)
+        return fixture, (by_parameter[d.parameter] for d in fixture.depends)
+
+    for root in order:
+        if root.parameter in index:
+            continue
+        walk = [visit(root)]
+        while walk:
+            fixture, dependencies = walk[-1]
+            for dependency in dependencies:
+                if dependency.parameter not in index:
+                    walk.append(visit(dependency))
+                    break
+                if dependency.parameter in on_stack:
+                    low[fixture.parameter] = min(
+                        low[fixture.parameter], index[dependency.parameter]
+                    )
+            else:
+                walk.pop()
+                if walk:
+                    parent = walk[-1][0].parameter
+                    low[parent] = min(low[parent], low[fixture.parameter])
+                if low[fixture.parameter] == index[fixture.parameter]:
+                    component = []
+                    while not component or component[-1] is not fixture:
+                        component.append(stack.pop())
+                        on_stack.discard(component[-1].parameter)
+                    components.append(component)
+    return components
+
+
+def _make_builders(
+    fixtures: list[MetaFixture], order: list[MetaFixture]
+) -> list[ast.FunctionDef]:
+    """
+    Concretize the fixtures into as few PyTest Fixtures as possible: one per fixture, which builds the dependencies
+    that only it needs in local variables, and one per dependency that several of them share.
+    pytest resolves each fixture separately, so this is much faster to set up for large graphs.
+    Inside a builder, statements that use a fixture before it is built (i.e., on a cycle) are deferred until it is,
+    so objects that refer to each other can be rebuilt. A cycle is always built by a single builder: if other fixtures
+    need more than one of its objects (e.g., two arguments that refer to each other), it returns them all in a dict,
+    and each of them gets a fixture that takes it from there.
+
+    :param order: The topological order of the fixtures (see topological_order)
+    """
+    parents: dict[str, list[str]] = {fixture.parameter: [] for fixture in order}
+    for fixture in order:
+        for dependency in fixture.depends:
+            parents[dependency.parameter].append(fixture.parameter)
+
+    components = _components(order)
+    component_of = {
+        fixture.parameter: i
+        for i, component in enumerate(components)
+        for fixture in component
+    }
+    # the builder (a component) of each component, assigned to dependents before their dependencies
+    roots = {fixture.parameter for fixture in fixtures}
+    builder_of_component: dict[int, int] = {}
+    for i in reversed(range(len(components))):
+        builders = {
+            builder_of_component[component_of[p]]
+            for fixture in components[i]
+            for p in parents[fixture.parameter]
+            if component_of[p] != i
+        }
+        if (
+            any(fixture.parameter in roots for fixture in components[i])
+            or len(builders) != 1
+        ):
+            builder_of_component[i] = i
+        else:
+            builder_of_component[i] = builders.pop()
+    builder_of = {p: builder_of_component[component_of[p]] for p in parents}
+
+    members: dict[int, list[MetaFixture]] = {}
+    for fixture in order:
+        members.setdefault(builder_of[fixture.parameter], []).append(fixture)
+
+    # adds the @pytest.fixture decorator
+    pytest_deco = ast.Attribute(
+        value=ast.Name(id="pytest", ctx=ast.Load()), attr="fixture", ctx=ast.Load()
+    )
+
+    def function(
+        name: str, args: Iterable[str], body: list[ast.stmt], value: ast.expr
+    ) -> ast.FunctionDef:
+        return ast.fix_missing_locations(
+            ast.FunctionDef(
+                name=f"generate_{name}",
+                args=ast.arguments(args=[ast.arg(arg=f"generate_{p}") for p in args]),
+                body=body + [ast.Return(value=value)],
+                decorator_list=[pytest_deco],
+            )
+        )
+
+    result = []
+    for fixture in reversed(order):
+        builder = builder_of[fixture.parameter]
+        if builder not in members:
+            continue
+        group = members.pop(builder)
+
+        # the objects of the builder that are arguments or that other builders need
+        exposed = [
+            member.parameter
+            for member in group
+            if member.parameter in roots
+            or any(builder_of[p] != builder for p in parents[member.parameter])
+        ]
+        # fixtures built by other builders are requested from pytest
+        requested = dict.fromkeys(
+            dependency.parameter
+            for member in group
+            for dependency in member.depends
+            if builder_of[dependency.parameter] != builder
+        )
+        built = set(requested)
+        deferred: dict[str, list[ast.stmt]] = {}
+        body: list[ast.stmt] = []
+
+        def add(stmt: ast.stmt) -> None:
+            missing = [
+                name.id.removeprefix("generate_")
+                for name in ast.walk(stmt)
+                if isinstance(name, ast.Name)
+                and name.id.removeprefix("generate_") in parents
+                and name.id.removeprefix("generate_") not in built
+            ]
+            if missing and isinstance(stmt, ast.Expr):
+                # e.g., setattr(clone, 'attribute', generate_x): wait for x
+                deferred.setdefault(missing[0], []).append(stmt)
+            else:
+                body.append(stmt)
+
+        for member in group:
+            for stmt in member.body:
+                add(stmt)
+            body.append(
+                ast.Assign(
+                    targets=[
+                        ast.Name(id=f"generate_{member.parameter}", ctx=ast.Store())
+                    ],
+                    value=member.ret.value or ast.Constant(value=None),
+                )
+            )
+            built.add(member.parameter)
+            for stmt in deferred.pop(member.parameter, []):
+                add(stmt)
+        # waiting for fixtures that are never built here: left for pytest to report
+        body.extend(stmt for stmts in deferred.values() for stmt in stmts)
+
+        if len(exposed) == 1:
+            (parameter,) = exposed
+            result.append(
+                function(
+                    parameter,
+                    requested,
+                    body,
+                    ast.Name(id=f"generate_{parameter}", ctx=ast.Load()),
+                )
+            )
+            continue
+
+        # a cycle that several fixtures need objects of: built once, by a fixture named after none of them
+        cycle = f"{exposed[0]}_cycle"
+        while cycle in parents:
+            cycle += "_"
+        for parameter in exposed:
+            result.append(
+                function(
+                    parameter,
+                    [cycle],
+                    [],
+                    ast.Subscript(
+                        value=ast.Name(id=f"generate_{cycle}", ctx=ast.Load()),
+                        slice=ast.Constant(value=parameter),
+                        ctx=ast.Load(),
                     ),
-                    body=self.body + [self.ret],
-                    decorator_list=[pytest_deco],
                 )
             )
-        ] + flatten(dependency_fixtures)
+        result.append(
+            function(
+                cycle,
+                requested,
+                body,
+                ast.Dict(
+                    keys=[ast.Constant(value=p) for p in exposed],
+                    values=[
+                        ast.Name(id=f"generate_{p}", ctx=ast.Load()) for p in exposed
+                    ],
+                ),
+            )
+        )
+    return result
+
+
+def required_imports(fixtures: list[MetaFixture]) -> list[ast.Import | ast.ImportFrom]:
+    """Imports needed by the fixtures and all of their (transitive) dependencies."""
+    return [i for fixture in topological_order(fixtures) for i in fixture.imports]
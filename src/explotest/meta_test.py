@@ -1,7 +1,7 @@
 import ast
 
 from .helpers import sanitize_name
-from .meta_fixture import MetaFixture
+from .meta_fixture import MetaFixture, make_fixtures, required_imports
 
 
 class MetaTest:
@@ -23,16 +23,28 @@ class MetaTest:
     def make_test(self) -> ast.Module:
         """
         Concretize this abstract test into a PyTest unit test.
+        Fixtures that are shared by several direct fixtures (e.g., an object reachable from two arguments)
+        are generated once.
         """
         return ast.fix_missing_locations(
             ast.Module(
-                body=self.imports
+                body=self._make_imports()
                 + ([self.mock] if self.mock else [])
-                + [fixture.make_fixture() for fixture in self.direct_fixtures]
+                + make_fixtures(self.direct_fixtures)
                 + [self._make_main_function()]
             )
         )
 
+    def _make_imports(self) -> list[ast.Import | ast.ImportFrom]:
+        """The imports of the test file, followed by any extra imports the fixtures need (without duplicates)."""
+        result = list(self.imports)
+        seen = {ast.dump(i) for i in result}
+        for i in required_imports(self.direct_fixtures):
+            if (key := ast.dump(i)) not in seen:
+                seen.add(key)
+                result.append(i)
+        return result
+
     @staticmethod
     def _prepend_generate(s: str):
         return f"generate_{s}"
@@ -0,0 +1,239 @@
+"""
+Index of the objects bound to the globals of the program's own modules, e.g., a configuration singleton,
+a registry or a loaded model, so that generated tests refer to them as module.name instead of copying them.
+
+Only the modules of the program (outside the standard library and site-packages) are indexed, and only the globals
+that importing them binds, e.g., not those set in an if __name__ == "__main__" block: a test gets these by importing
+the module, with the values the module gives them when it is imported. Immutable builtin values (numbers, strings,
+tuples, ...) are not indexed: the interpreter may share them between unrelated uses, so their identity says nothing
+about where they come from.
+"""
+
+import ast
+import contextlib
+import functools
+import sys
+import sysconfig
+import types
+import warnings
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from . import capture_cache, config
+from .helpers import PRIMITIVE_TYPES, thread_state
+
+# directories of the standard library and of installed packages
+_LIBRARY_PATHS = tuple(
+    {
+        str(Path(sysconfig.get_path(name)).resolve())
+        for name in ("stdlib", "platstdlib", "purelib", "platlib")
+    }
+)
+
+# index used outside of capture_cache scopes, and the number of loaded modules when it was built
+_index: tuple[int, dict[int, list[tuple[str, str]]]] = (0, {})
+
+
+@functools.cache
+def is_library_file(file: str) -> bool:
+    """True iff file is part of the standard library or of an installed package."""
+    return str(Path(file).resolve()).startswith(_LIBRARY_PATHS)
+
+
+def _is_main_guard(test: ast.expr) -> bool:
+    """True iff test is __name__ == "__main__"."""
+    return (
+        isinstance(test, ast.Compare)
+        and isinstance(test.left, ast.Name)
+        and test.left.id == "__name__"
+        and any(
+            isinstance(c, ast.Constant) and c.value == "__main__"
+            for c in test.comparators
+        )
+    )
+
+
+@functools.cache
+def _import_time_names(file: str) -> frozenset[str]:
+    """
+    The globals that the module in file binds when it is imported: those bound by its top-level statements,
+    except in an if __name__ == "__main__" block, and not rebound by its functions (global statements).
+    """
+    try:
+        with warnings.catch_warnings():
+            # e.g., invalid escape sequences, already reported when the module was imported
+            warnings.simplefilter("ignore", SyntaxWarning)
+            tree = ast.parse(Path(file).read_text(encoding="utf-8"))
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError):
+        return frozenset()
+    bound: set[str] = set()
+    statements: list[ast.stmt] = list(tree.body)
+    while statements:
+        statement = statements.pop()
+        match statement:
+            case ast.If(test=test) if _is_main_guard(test):
+                statements.extend(statement.orelse)
+            case ast.If() | ast.Try() | ast.With() | ast.For() | ast.While():
+                for field in ("body", "orelse", "finalbody", "handlers"):
+                    statements.extend(getattr(statement, field, []))
+            case ast.ExceptHandler():
+                statements.extend(statement.body)
+            case ast.FunctionDef() | ast.AsyncFunctionDef() | ast.ClassDef():
+                bound.add(statement.name)
+            case ast.Import() | ast.ImportFrom():
+                bound.update(
+                    (a.asname or a.name).split(".")[0] for a in statement.names
+                )
+            case ast.Assign() | ast.AnnAssign() | ast.AugAssign():
+                targets = (
+                    statement.targets
+                    if isinstance(statement, ast.Assign)
+                    else [statement.target]
+                )
+                bound.update(
+                    n.id
+                    for t in targets
+                    for n in ast.walk(t)
+                    if isinstance(n, ast.Name)
+                )
+    rebound = {
+        name
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Global)
+        for name in node.names
+    }
+    return frozenset(bound - rebound)
+
+
+def _stable_names(module_name: str, module: Any) -> frozenset[str]:
+    """The globals of module that importing it again binds, or none if it is not one of the program's modules."""
+    file = getattr(module, "__file__", None)
+    if (
+        not isinstance(file, str)
+        or not file.endswith(".py")
+        or module_name.split(".")[0] == "explotest"
+        or is_library_file(file)
+    ):
+        return frozenset()
+    return _import_time_names(file)
+
+
+# immutable values, which the interpreter may share between unrelated uses (e.g., small ints or the empty tuple)
+_SHAREABLE_TYPES = PRIMITIVE_TYPES | {bytes, tuple, frozenset}
+
+
+def _build() -> dict[int, list[tuple[str, str]]]:
+    """Map the id of each object bound to a global of a program module to the (module, name) pairs bound to it."""
+    index: dict[int, list[tuple[str, str]]] = {}
+    main = sys.modules.get("__main__")
+    for module_name, module in list(sys.modules.items()):
+        # e.g., __mp_main__ (see multiprocessing), which a test cannot import either
+        if module is main and module_name != "__main__":
+            continue
+        names = _stable_names(module_name, module)
+        if not names:
+            continue
+        for name, value in list(vars(module).items()):
+            if (
+                name not in names
+                or name.startswith("__")
+                or isinstance(value, types.ModuleType)
+                or type(value) in _SHAREABLE_TYPES
+            ):
+                continue
+            index.setdefault(id(value), []).append((module_name, name))
+    return index
+
+
+def _current_index() -> dict[int, list[tuple[str, str]]]:
+    # globals may be rebound between calls, so a new index is built for each captured call
+    if getattr(thread_state, "capture_cache", None) is not None:
+        return capture_cache.shared("module globals", _build)
+    global _index
+    if _index[0] != len(sys.modules):
+        _index = (len(sys.modules), _build())
+    return _index[1]
+
+
+@contextlib.contextmanager
+def capturing(fut_module: str) -> Iterator[None]:
+    """
+    Inside this block, values are saved for a test of a function of fut_module (its name, as imported by the test):
+    if that is the module run as __main__, its globals are found too (see find).
+    """
+    previous = getattr(thread_state, "fut_module", None)
+    thread_state.fut_module = fut_module
+    try:
+        yield
+    finally:
+        thread_state.fut_module = previous
+
+
+def capturing_module() -> Optional[str]:
+    """The module set by capturing on this thread, or None outside of capturing."""
+    return getattr(thread_state, "fut_module", None)
+
+
+def importable_name(
+    module_name: str, fut_module: Optional[str] = None
+) -> Optional[str]:
+    """
+    The name a test imports module_name by: that of the function-under-test for __main__ (if it is run as __main__),
+    or None if the test cannot import it.
+    """
+    if module_name != "__main__":
+        return module_name
+    if fut_module is None:
+        fut_module = getattr(thread_state, "fut_module", None)
+    main_file = getattr(sys.modules.get("__main__"), "__file__", None)
+    if main_file is None or Path(main_file).stem != fut_module:
+        return None
+    return fut_module
+
+
+def find(obj: Any, fut_module: Optional[str] = None) -> Optional[tuple[str, str]]:
+    """
+    :param fut_module: Name of the module of the function-under-test, as imported by the test
+    (by default, the one set by capturing).
+    :return: (module, name) such that module.name is obj, or None if obj is not bound to a global that a test can
+    import. Globals of the module of the function-under-test and public names are preferred.
+    """
+    if not config.by_reference:
+        return None
+    if fut_module is None:
+        fut_module = getattr(thread_state, "fut_module", None)
+    candidates = _current_index().get(id(obj))
+    if not candidates:
+        return None
+    found = [
+        (module_name, name)
+        for module_name, name in candidates
+        # the global may have been rebound since the index was built
+        if getattr(sys.modules.get(module_name), name, None) is obj
+        and importable_name(module_name, fut_module) is not None
+    ]
+    if not found:
+        return None
+    return min(
+        found,
+        key=lambda c: (
+            c[0] != "__main__" and c[0] != fut_module,
+            c[1].startswith("_"),
+            len(c[0]),
+            c,
+        ),
+    )
+
+
+def deepcopy_memo() -> dict[int, Any]:
+    """A memo for copy.deepcopy that keeps the objects bound to globals (see find) rather than copying them."""
+    if not config.by_reference:
+        return {}
+    memo: dict[int, Any] = {}
+    for key, candidates in list(_current_index().items()):
+        for module_name, name in candidates:
+            value = getattr(sys.modules.get(module_name), name, None)
+            if id(value) == key and importable_name(module_name) is not None:
+                memo[key] = value
+                break
+    return memo
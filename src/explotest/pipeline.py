@@ -0,0 +1,313 @@
+"""
+Turning a captured call into a unit test, either on the caller's thread or on a background worker.
+"""
+
+import ast
+import atexit
+import copy
+import threading
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Optional, Self
+
+from . import capture_cache, config, module_globals
+from .autoassert import determinism, purity, test_runner
+from .autoassert.autoassert import AssertionGenerator
+from .capture_plan import CapturePlan
+from .helpers import is_primitive
+from .sampling import CapturePolicy
+from .test_builder import TestBuilder
+
+# without a rerun budget, forked reruns still running this many times as long as the captured call took are killed
+FORK_BUDGET_FACTOR = 10
+# ... but they get at least this many seconds, since a fast call may well be slower to rerun in a new process
+MIN_FORK_BUDGET = 1.0
+
+
+@dataclass
+class CaptureJob:
+    """A single call of a function-under-test to generate a unit test for."""
+
+    plan: CapturePlan
+    func: Callable
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+    depth: int  # used to name the generated test file
+    result: Any = None  # return value of the call
+    duration: Optional[float] = None  # seconds the call took
+    test_builder: Optional[TestBuilder] = None  # set once the arguments are saved
+    # told whether the test could be written (see CapturePolicy.record_outcome)
+    policy: Optional[CapturePolicy] = None
+
+    def arrange(self) -> Self:
+        """Save the arguments of the call (the arrange phase of the test)."""
+        plan = self.plan
+        self.test_builder = TestBuilder(
+            plan.fut_path,
+            plan.fut_name,
+            plan.bind(self.args, self.kwargs),
+        )
+        with capture_cache.scope(), module_globals.capturing(plan.fut_path.stem):
+            self.test_builder.use_imports(plan.imports).build_fixtures(
+                plan.reconstructor
+            ).build_act_phase(plan.signature)
+            self.test_builder.build_mocks({}, plan.reconstructor)
+        return self
+
+    def _memo(self) -> dict[int, Any]:
+        # globals are referred to by name in the test (see module_globals), so they are not copied
+        with module_globals.capturing(self.plan.fut_path.stem):
+            return module_globals.deepcopy_memo()
+
+    def snapshot(self) -> Self:
+        """
+        Replace the arguments by deep copies so that the call may mutate them before they are saved.
+        If they cannot be copied, save them right away instead.
+        """
+        try:
+            self.args, self.kwargs = copy.deepcopy(
+                (self.args, self.kwargs), self._memo()
+            )
+        except Exception:
+            self.arrange()
+        return self
+
+    def snapshot_result(self, result: Any) -> Self:
+        """Keep a deep copy of the return value of the call, or the value itself if it cannot be copied."""
+        try:
+            self.result = copy.deepcopy(result, self._memo())
+        except Exception:
+            self.result = result
+        return self
+
+    def rerun_budget(self) -> Optional[float]:
+        """At most how many seconds the reruns of the function-under-test may take, or None for no limit."""
+        if self.plan.rerun_budget is not None:
+            return self.plan.rerun_budget
+        if config.rerun_budget is not None:
+            return config.rerun_budget
+        if self.duration is not None and test_runner.isolates_reruns():
+            # forked children are killed at the deadline, so they are given one scaled to the call
+            return min(
+                max(FORK_BUDGET_FACTOR * self.duration, MIN_FORK_BUDGET),
+                config.fork_rerun_timeout,
+            )
+        return None
+
+    def fits_budget(self) -> bool:
+        """False iff the reruns would most likely take longer than their budget, judging by how long the call took."""
+        budget = self.rerun_budget()
+        if budget is None or self.duration is None:
+            return True
+        # forked reruns run at the same time
+        runs = 1 if test_runner.isolates_reruns() else 2
+        return runs * self.duration <= budget
+
+    def predict(self) -> Optional[determinism.Outcome]:
+        """
+        The outcome the reruns of the function-under-test would end with, from what its source does (see
+        autoassert.purity), or None if it must be rerun to know.
+        """
+        avoids_side_effects = (
+            not config.rerun_side_effects and not test_runner.isolates_reruns()
+        )
+        if not config.skip_pure_reruns and not avoids_side_effects:
+            # the analysis would not change anything
+            return None
+        analysis = purity.analyze(self.func)
+        if (
+            config.skip_pure_reruns
+            and analysis.purity is purity.Purity.PURE
+            and is_primitive(self.result)
+        ):
+            # a pure function returns equal values for the same arguments (other objects than plain values may
+            # compare by identity, so that reruns would tell apart)
+            return determinism.Outcome.EQUAL
+        if avoids_side_effects and analysis.purity not in (
+            purity.Purity.PURE,
+            purity.Purity.UNKNOWN,
+        ):
+            # rerunning it would repeat its side effects: only the type of its result is checked
+            return determinism.Outcome.SAME_TYPE
+        return None
+
+    def run(self) -> None:
+        """Generate assertions for the result of the call and write the unit test."""
+        try:
+            self._run()
+        except Exception:
+            if self.policy is not None:
+                self.policy.record_outcome(True)
+            raise
+        if self.policy is not None:
+            self.policy.record_outcome(False)
+
+    def _run(self) -> None:
+        if self.test_builder is None:
+            self.arrange()
+        assert self.test_builder is not None
+
+        # functions whose reruns have always compared the same way are not rerun every time
+        profile = self.plan.determinism
+        execution_result = None
+        outcome = self.predict() or profile.predict(self.func)
+        if outcome is None and not self.fits_budget():
+            # only the type of the one result there is is checked
+            outcome = determinism.Outcome.SAME_TYPE
+        elif outcome is None:
+            try:
+                execution_result = test_runner.run_fut_twice(
+                    self.func, self.args, self.kwargs, self.rerun_budget()
+                )
+            except test_runner.RerunTimeout:
+                outcome = determinism.Outcome.SAME_TYPE
+            else:
+                if execution_result:
+                    profile.record(determinism.outcome_of(execution_result))
+        # add assertions
+        if execution_result or outcome is not None:
+            # the result is checked and then saved: serialize and traverse it once
+            with (
+                capture_cache.scope(),
+                module_globals.capturing(self.plan.fut_path.stem),
+            ):
+                assertion_generator = AssertionGenerator()
+                if execution_result:
+                    assertion_generator.determine_assertion(
+                        execution_result, self.result
+                    )
+                elif outcome is not None:
+                    assertion_generator.assume(outcome, self.result)
+                assertion_result = assertion_generator.generate_assertion(
+                    self.result, self.plan.fut_path
+                )
+            self.test_builder.build_assertions(assertion_result)
+
+        meta_test = self.test_builder.get_meta_test()
+
+        # write test to a file
+        if meta_test:
+            with open(self.plan.test_path(self.depth), "w") as f:
+                f.write(ast.unparse(meta_test.make_test()))
+        else:
+            print(
+                f"ExploTest failed creating a unit test for the function {self.plan.fut_name}."
+            )
+
+
+class Backpressure(Enum):
+    """What to do when a job is submitted to a full pipeline."""
+
+    BLOCK = 1  # wait for the worker to make room
+    DROP_NEWEST = 2  # discard the submitted job
+    DROP_OLDEST = 3  # discard the oldest queued job to make room
+
+
+class CapturePipeline:
+    """Bounded queue of capture jobs, processed in order by a single background thread."""
+
+    def __init__(
+        self, maxsize: int = 1024, backpressure: Backpressure = Backpressure.BLOCK
+    ):
+        if maxsize < 1:
+            raise ValueError("[ERROR]: maxsize must be positive.")
+        self.maxsize = maxsize
+        self.backpressure = backpressure
+        self.jobs: deque[CaptureJob] = deque()
+        self.unfinished = 0  # queued jobs plus the job being processed
+        self.dropped = 0
+        self.condition = threading.Condition()
+        self.worker: Optional[threading.Thread] = None
+
+    def submit(self, job: CaptureJob) -> bool:
+        """
+        Queue job for processing.
+        :return: False iff job was dropped because the queue was full.
+        """
+        with self.condition:
+            if self.worker is None:
+                self.worker = threading.Thread(
+                    target=self._work, name="explotest-worker", daemon=True
+                )
+                self.worker.start()
+
+            while len(self.jobs) >= self.maxsize:
+                match self.backpressure:
+                    case Backpressure.BLOCK:
+                        self.condition.wait()
+                    case Backpressure.DROP_NEWEST:
+                        self.dropped += 1
+                        return False
+                    case Backpressure.DROP_OLDEST:
+                        self.jobs.popleft()
+                        self.unfinished -= 1
+                        self.dropped += 1
+
+            self.jobs.append(job)
+            self.unfinished += 1
+            self.condition.notify_all()
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every submitted job has been processed.
+        :return: False iff the timeout expired first.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.unfinished == 0, timeout)
+
+    def _work(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: len(self.jobs) > 0)
+                job = self.jobs.popleft()
+                # wake up blocked submitters
+                self.condition.notify_all()
+            try:
+                job.run()
+            except Exception as e:
+                print(
+                    f"ExploTest failed creating a unit test for the function {job.plan.fut_name}: {e!r}"
+                )
+            finally:
+                with self.condition:
+                    self.unfinished -= 1
+                    self.condition.notify_all()
+
+
+_pipeline: Optional[CapturePipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline() -> CapturePipeline:
+    """The pipeline used by @explore(background=True), created on first use."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = CapturePipeline()
+            # don't lose queued tests when the program exits
+            atexit.register(flush)
+        return _pipeline
+
+
+def configure_pipeline(
+    maxsize: int = 1024, backpressure: Backpressure = Backpressure.BLOCK
+) -> None:
+    """Set the queue size and backpressure of the background pipeline. Pending jobs are flushed first."""
+    global _pipeline
+    flush()
+    with _pipeline_lock:
+        if _pipeline is None:
+            atexit.register(flush)
+        _pipeline = CapturePipeline(maxsize, backpressure)
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """
+    Wait until all unit tests queued by @explore(background=True) have been written.
+    :return: False iff the timeout expired first.
+    """
+    if _pipeline is None:
+        return True
+    return _pipeline.flush(timeout)
@@ -1,10 +1,18 @@
+import array
 import ast
+import hashlib
 import os
 from abc import ABC
 from pathlib import Path
 from typing import Any, Optional, cast
 
+from .. import config
 from ..meta_fixture import MetaFixture
+from ..storage import get_store, store_sidecar
+from .type_handlers import ExpressionWriter
+
+# typecodes of the arrays that large collections of numbers are packed into
+PACKED_TYPECODES = {int: "q", float: "d"}
 
 
 class AbstractReconstructor(ABC):
@@ -53,3 +61,105 @@ class AbstractReconstructor(ABC):
         )
 
         return MetaFixture([], parameter, [generated_ast], ret)
+
+    def _make_value_fixture(
+        self, parameter: str, argument: Any
+    ) -> Optional[MetaFixture]:
+        """
+        Helper to build a value in one constructor expression, e.g., a date or a dataclass (see type_handlers),
+        instead of saving it to a file.
+        :return: The MetaFixture, or None if argument has no such expression.
+        """
+        writer = ExpressionWriter(self.file_path.stem)
+        value = writer.expression(argument)
+        if value is None:
+            return None
+        assign = ast.Assign(
+            targets=[ast.Name(id=parameter, ctx=ast.Store())], value=value
+        )
+        ret = ast.Return(value=ast.Name(id=parameter, ctx=ast.Load()))
+        return MetaFixture(
+            [],
+            parameter,
+            [ast.fix_missing_locations(assign)],
+            ast.fix_missing_locations(ret),
+            writer.imports,
+        )
+
+    def _make_compact_fixture(
+        self, parameter: str, argument: Any
+    ) -> Optional[MetaFixture]:
+        """
+        Helper to save a large homogeneous collection of numbers, strings or bytes to a file that is loaded
+        in one call, instead of spelling out every element in the test.
+        Numbers are packed into an array.array; strings and bytes are pickled.
+        :return: The MetaFixture, or None if argument is small or not homogeneous.
+        """
+        if (
+            type(argument) not in (list, tuple, set, frozenset)
+            or len(argument) < config.compact_threshold
+        ):
+            return None
+        element_types = set(map(type, argument))
+        if len(element_types) != 1:
+            return None
+        (element_type,) = element_types
+        directory = Path(f"{self.file_path.parent}/pickled")
+
+        value: Optional[ast.expr] = None
+        body: list[ast.stmt] = []
+        imports: list[ast.Import | ast.ImportFrom] = []
+        if element_type in PACKED_TYPECODES:
+            try:
+                packed = array.array(PACKED_TYPECODES[element_type], argument)
+            except OverflowError:
+                # ints too large for 64 bits are pickled instead
+                packed = None
+            if packed is not None:
+                h = hashlib.blake2b(packed.typecode.encode(), digest_size=16)
+                h.update(packed)
+                path = store_sidecar(directory / f"{h.hexdigest()}.bin", packed.tofile)
+                # E.g., x = explotest.runtime.read_array(path, 'd').tolist()
+                value = ast.Call(
+                    func=ast.Attribute(
+                        value=ast.Call(
+                            func=ast.parse(
+                                "explotest.runtime.read_array", mode="eval"
+                            ).body,
+                            args=[
+                                ast.Constant(value=str(path)),
+                                ast.Constant(value=packed.typecode),
+                            ],
+                        ),
+                        attr="tolist",
+                        ctx=ast.Load(),
+                    ),
+                )
+                if type(argument) is not list:
+                    value = ast.Call(
+                        func=ast.Name(id=type(argument).__name__, ctx=ast.Load()),
+                        args=[value],
+                    )
+                body = [
+                    ast.Assign(
+                        targets=[ast.Name(id=parameter, ctx=ast.Store())], value=value
+                    )
+                ]
+                imports = [ast.Import(names=[ast.alias(name="explotest.runtime")])]
+
+        if value is None:
+            if element_type not in (int, str, bytes):
+                return None
+            store = get_store(directory)
+            key = store.dump(argument)
+            body = store.make_load(parameter, key)
+            imports = store.make_load_imports(key)
+
+        ret = ast.Return(value=ast.Name(id=parameter, ctx=ast.Load()))
+        return MetaFixture(
+            [],
+            parameter,
+            [ast.fix_missing_locations(stmt) for stmt in body],
+            ast.fix_missing_locations(ret),
+            imports,
+        )
@@ -1,15 +1,29 @@
 import ast
+import functools
 import inspect
-from collections import deque
-from typing import override, Any, Optional, cast
-
-from ..helpers import is_primitive, collection_t, random_id, is_collection
+import itertools
+import struct
+from dataclasses import dataclass
+from typing import override, Any, Generator, Iterator, Optional, cast
+
+from .. import capture_cache, config
+from ..helpers import (
+    COLLECTION_TYPES,
+    PRIMITIVE_TYPES,
+    collection_t,
+    random_id,
+    is_collection,
+)
 from ..meta_fixture import MetaFixture
 from ..reconstructors.abstract_reconstructor import AbstractReconstructor
+from ..reconstructors.buffer_reconstructor import is_buffer
+from ..reconstructors.type_handlers import ExpressionWriter
 
 
 class LazyProxy:
-    def __init__(self):
+    def __init__(self, parameter: str):
+        # known before the fixture is built, to refer to it from the fixtures that depend on it
+        self.parameter = parameter
         self._real = None
 
     def set_real(self, obj):
@@ -19,69 +33,351 @@ class LazyProxy:
         return getattr(self._real, name)
 
 
-def get_next_attrs(o: Any) -> list[Any]:
+POINTER_SIZE = struct.calcsize("P")
+
+
+@functools.cache
+def is_settable(t: type) -> bool:
+    """
+    True iff instances of t are entirely described by their attributes, so that they can be rebuilt
+    by t.__new__(t) and setattr: t has no custom __new__, and no state hidden in C fields.
+    """
+    slots = sum(
+        inspect.ismemberdescriptor(value)
+        for base in t.__mro__
+        for value in vars(base).values()
+    )
+    return (
+        t.__new__ is object.__new__
+        and t.__basicsize__ == object.__basicsize__ + slots * POINTER_SIZE
+    )
+
+
+def is_opaque(o: Any) -> bool:
+    """True iff o is neither a primitive nor a collection, and cannot be rebuilt by setting its attributes."""
+    t = type(o)
+    return t not in PRIMITIVE_TYPES and t not in COLLECTION_TYPES and not is_settable(t)
+
+
+@dataclass(frozen=True)
+class ClassLayout:
     """
-    Returns all the data-only attributes of the current node.
+    Where the data attributes of the instances of a class are, computed once per class
+    so that reading the attributes of an instance does not inspect its class again.
     """
 
-    # taken from inspect.getmembers(Foo()) on empty class Foo
-    builtins = [
-        "__dict__",
-        "__doc__",
-        "__firstlineno__",
-        "__module__",
-        "__static_attributes__",
-        "__weakref__",
-    ]
-
-    attributes = inspect.getmembers(o, predicate=lambda x: not callable(x))
-    attributes = list(filter(lambda x: x[0] not in builtins, attributes))
-    # filter out properties
-    # type(obj) is the class obj is defined from
-    # x[0] is the name of the variable
-    attributes = list(
-        filter(
-            lambda x: not isinstance(getattr(type(o), x[0], None), property),
-            attributes,
+    # non-callable class-level data, possibly shadowed by instances
+    class_attributes: tuple[str, ...]
+    # fields declared by __slots__
+    slots: tuple[str, ...]
+    # properties and other data descriptors, which are computed, not stored
+    excluded: frozenset[str]
+    # whether instances have a __dict__
+    has_dict: bool
+
+    @classmethod
+    def of(cls, t: type) -> "ClassLayout":
+        layout = _layouts.get(t)
+        if layout is None:
+            layout = _layouts[t] = cls._compute(t)
+        return layout
+
+    @classmethod
+    def _compute(cls, t: type) -> "ClassLayout":
+        class_attributes, slots, excluded = [], [], set()
+        seen = set()
+        for base in t.__mro__:
+            for name, value in vars(base).items():
+                # the first class in the MRO defining name wins
+                if name in seen:
+                    continue
+                seen.add(name)
+                if name.startswith("__") and name.endswith("__"):
+                    # interpreter machinery, e.g., __module__ or __dataclass_fields__
+                    continue
+                if inspect.ismemberdescriptor(value):
+                    slots.append(name)
+                elif hasattr(type(value), "__set__") or hasattr(
+                    type(value), "__delete__"
+                ):
+                    excluded.add(name)
+                elif (
+                    not hasattr(type(value), "__get__")
+                    and not callable(value)
+                    and not is_opaque(value)
+                ):
+                    # opaque class-level data (e.g., abc's _abc_impl) is class machinery, not instance state
+                    class_attributes.append(name)
+        return cls(
+            tuple(class_attributes),
+            tuple(slots),
+            frozenset(excluded),
+            t.__dictoffset__ != 0,
         )
+
+
+_layouts: dict[type, ClassLayout] = {}
+
+
+def get_next_attrs(o: Any) -> list[tuple[str, Any]]:
+    """
+    Returns all the data-only attributes of the current node, sorted by name.
+    """
+    layout = ClassLayout.of(type(o))
+    attributes = {}
+    for name in layout.class_attributes:
+        attributes[name] = getattr(o, name)
+    for name in layout.slots:
+        try:
+            attributes[name] = getattr(o, name)
+        except AttributeError:
+            # slot was never assigned
+            pass
+    if layout.has_dict:
+        for name, value in vars(o).items():
+            if name not in layout.excluded:
+                attributes[name] = value
+    return sorted(
+        ((name, value) for name, value in attributes.items() if not callable(value)),
+        key=lambda kv: kv[0],
     )
-    return attributes
+
+
+def is_bad(o: Any) -> bool:
+    """True iff o cannot be reconstructed by setting attributes."""
+    results = {
+        "ismodule": inspect.ismodule(o),
+        "isclass": inspect.isclass(o),
+        "ismethod": inspect.ismethod(o),
+        "isfunction": inspect.isfunction(o),
+        "isgenerator": inspect.isgenerator(o),
+        "isgeneratorfunction": inspect.isgeneratorfunction(o),
+        "iscoroutine": inspect.iscoroutine(o),
+        "iscoroutinefunction": inspect.iscoroutinefunction(o),
+        "isawaitable": inspect.isawaitable(o),
+        "isasyncgen": inspect.isasyncgen(o),
+        "istraceback": inspect.istraceback(o),
+        "isframe": inspect.isframe(o),
+        "isbuiltin": inspect.isbuiltin(o),
+        "ismethodwrapper": inspect.ismethodwrapper(o),
+        "isgetsetdescriptor": inspect.isgetsetdescriptor(o),
+        "ismemberdescriptor": inspect.ismemberdescriptor(o),
+        # raw buffers are left to the backup, which saves them whole
+        "isbuffer": is_buffer(o),
+    }
+    return any(results.values())
+
+
+class ObjectGraph:
+    """
+    The graph of objects reachable through attributes, walked once and keyed by identity (never by __eq__).
+    Each object is classified as reconstructible or not in a single linear pass,
+    and its attributes are kept so that building its fixture does not read them again.
+    """
+
+    def __init__(self):
+        self.verdicts: dict[int, bool] = {}
+        self.attributes_of: dict[int, list[tuple[str, Any]]] = {}
+        self.primitive_collections: dict[int, bool] = {}
+        # objects are keyed by id, so they must outlive the graph
+        self.keep_alive: list[Any] = []
+
+    def is_reconstructible(self, obj: Any) -> bool:
+        """True iff no object reachable from obj through attributes is bad or opaque (see is_bad and is_opaque)."""
+        if id(obj) not in self.verdicts:
+            self._classify(obj)
+        return self.verdicts[id(obj)]
+
+    def is_primitive(self, obj: Any) -> bool:
+        """Same as helpers.is_primitive, but each collection is only checked once, however deeply it is nested."""
+        if type(obj) not in COLLECTION_TYPES:
+            return type(obj) in PRIMITIVE_TYPES
+        if id(obj) not in self.primitive_collections:
+            self._check_primitive(obj)
+        return self.primitive_collections[id(obj)]
+
+    def _check_primitive(self, root: collection_t) -> None:
+        """Check whether the collections nested in root are primitive, without recursion."""
+
+        def enter(collection: collection_t) -> Iterator[Any]:
+            self.keep_alive.append(collection)
+            # a collection containing itself is not primitive
+            self.primitive_collections[id(collection)] = False
+            if isinstance(collection, dict):
+                return itertools.chain.from_iterable(collection.items())
+            return iter(collection)
+
+        frames = [(root, enter(root))]
+        while frames:
+            collection, items = frames[-1]
+            for item in items:
+                if (
+                    type(item) in COLLECTION_TYPES
+                    and id(item) not in self.primitive_collections
+                ):
+                    frames.append((item, enter(item)))
+                    break
+                if not self.is_primitive(item):
+                    # neither are the collections it is nested in, which stay False
+                    return
+            else:
+                self.primitive_collections[id(collection)] = True
+                frames.pop()
+
+    def attributes(self, obj: Any) -> list[tuple[str, Any]]:
+        """The (name, value) data attributes of obj."""
+        if id(obj) not in self.attributes_of:
+            self.keep_alive.append(obj)
+            self.attributes_of[id(obj)] = get_next_attrs(obj)
+        return self.attributes_of[id(obj)]
+
+    def _classify(self, root: Any) -> None:
+        """
+        Tarjan's strongly connected components algorithm, without recursion:
+        objects on a cycle are reconstructible together or not at all.
+        """
+        index: dict[int, int] = {}
+        low: dict[int, int] = {}
+        good: dict[int, bool] = {}  # not bad, and no bad object reachable so far
+        component: list[Any] = []
+        on_component: set[int] = set()
+
+        def enter(node: Any) -> Iterator[Any]:
+            i = id(node)
+            index[i] = low[i] = len(index)
+            component.append(node)
+            on_component.add(i)
+            if is_bad(node) or is_opaque(node):
+                good[i] = False
+                return iter(())
+            good[i] = True
+            # fixes infinite cycling due to int pooling w/ check to is_primitive
+            # primitives are trivially reconstructible
+            return (v for _, v in self.attributes(node) if not self.is_primitive(v))
+
+        frames = [(root, enter(root))]
+        while frames:
+            node, children = frames[-1]
+            i = id(node)
+            for child in children:
+                j = id(child)
+                if j in self.verdicts:
+                    good[i] = good[i] and self.verdicts[j]
+                elif j not in index:
+                    frames.append((child, enter(child)))
+                    break
+                else:
+                    # on the current cycle, the component is judged as a whole
+                    low[i] = min(low[i], index[j])
+            else:
+                frames.pop()
+                if low[i] == index[i]:
+                    members = []
+                    while True:
+                        member = component.pop()
+                        on_component.discard(id(member))
+                        members.append(member)
+                        if member is node:
+                            break
+                    verdict = all(good[id(m)] for m in members)
+                    for m in members:
+                        self.verdicts[id(m)] = verdict
+                    self.keep_alive.extend(members)
+                if frames:
+                    parent = id(frames[-1][0])
+                    low[parent] = min(low[parent], low[i])
+                    if i in self.verdicts:
+                        good[parent] = good[parent] and self.verdicts[i]
+
+
+def object_graph() -> ObjectGraph:
+    """The object graph of the current capture_cache.scope(), or a new one outside scopes."""
+    return capture_cache.shared("object graph", ObjectGraph)
+
+
+# Builds the fixture of one argument: yields the (parameter, argument) pairs whose fixtures it needs,
+# is sent each of these fixtures (or None if ExploTest fails) in turn, and returns its own fixture.
+FixtureBuilder = Generator[
+    tuple[str, Any], Optional[MetaFixture], Optional[MetaFixture]
+]
+
+# longer names of nested fixtures are shortened, so that names do not grow with the depth of the argument
+MAX_NAME_LENGTH = 64
 
 
 class ArgumentReconstructor(AbstractReconstructor):
 
     @override
     def make_fixture(self, parameter, argument):
-        return self._make_fixture(parameter, argument, [])
-
-    def _make_fixture(self, parameter, argument, seen_args: list[tuple[Any, Any]]):
+        # share one object graph between all the nested fixtures
+        with capture_cache.scope():
+            fixture = self._build(parameter, argument)
+        if fixture is not None and fixture.parameter != parameter:
+            # the argument was already generated, e.g., as part of another argument
+            return MetaFixture.alias(parameter, fixture)
+        return fixture
+
+    def _build(self, parameter: str, argument: Any) -> Optional[MetaFixture]:
+        """
+        Build the fixture of argument and of everything it needs with an explicit stack of builders
+        rather than recursion, so that the depth of the argument is only bounded by memory.
+        """
+        # shared by all the arguments of a call (see CaptureJob.arrange), so that each object is generated once
+        seen_args = capture_cache.shared("argument fixtures", dict)
+        stack = [self._make_fixture(parameter, argument, seen_args)]
+        result = None
+        while stack:
+            try:
+                parameter, argument = stack[-1].send(result)
+            except StopIteration as done:
+                stack.pop()
+                result = done.value
+            else:
+                stack.append(self._make_fixture(parameter, argument, seen_args))
+                result = None
+        return result
+
+    def _make_fixture(
+        self,
+        parameter,
+        argument,
+        seen_args: dict[int, tuple[Any, LazyProxy | MetaFixture]],
+    ) -> FixtureBuilder:
         """
         :param parameter: The parameter (as a string) to create the MetaFixture for
         :param argument: Runtime value of the argument
-        :param seen_args: Keeps track of seen arguments to avoid cycles
+        :param seen_args: Fixtures of seen arguments, by id, to avoid cycles
         :return: The MetaFixture needed to recreate the argument, or None if ExploTest fails.
         """
 
-        if is_primitive(argument):
-            return super()._make_primitive_fixture(parameter, argument)
-
-        # argument exists in mapping
-        for k, v in seen_args:
-            if k == argument:
-                return v
-
-        if self.is_reconstructible(argument):
-            placeholder = LazyProxy()
-            seen_args.append((argument, placeholder))
-            reconstructed = self._reconstruct_object_instance(
-                parameter, argument, seen_args
+        if object_graph().is_primitive(argument):
+            return self._make_compact_fixture(
+                parameter, argument
+            ) or super()._make_primitive_fixture(parameter, argument)
+
+        # argument exists in mapping (a LazyProxy stands in for a fixture that is still being built)
+        if id(argument) in seen_args:
+            return cast(MetaFixture, seen_args[id(argument)][1])
+
+        # values with a constructor expression (e.g., dates or dataclasses) are built in one call
+        if (fixture := self._make_value_fixture(parameter, argument)) is not None:
+            seen_args[id(argument)] = (argument, fixture)
+            return fixture
+
+        # reconstruct as much as possible: only the parts that cannot be (e.g., a lock or an open file)
+        # are handed to the backup, one by one, rather than the whole argument
+        if not is_bad(argument) and not is_opaque(argument):
+            placeholder = LazyProxy(parameter)
+            seen_args[id(argument)] = (argument, placeholder)
+            reconstructed = yield from self._reconstruct_object_instance(
+                parameter, argument
             )
             placeholder.set_real(reconstructed)
             return reconstructed
 
         if self.backup_reconstructor:
-            placeholder = LazyProxy()
-            seen_args.append((argument, placeholder))
+            placeholder = LazyProxy(parameter)
+            seen_args[id(argument)] = (argument, placeholder)
             reconstructed = self.backup_reconstructor.make_fixture(parameter, argument)
             placeholder.set_real(reconstructed)
             return reconstructed
@@ -89,8 +385,8 @@ class ArgumentReconstructor(AbstractReconstructor):
         return None
 
     def _reconstruct_collection(
-        self, parameter: str, collection: collection_t, seen_args
-    ) -> Optional[MetaFixture]:
+        self, parameter: str, collection: collection_t
+    ) -> FixtureBuilder:
         """
         Given a parameter and a collection, attempt to recreate the collection.
         :param parameter:
@@ -107,34 +403,44 @@ class ArgumentReconstructor(AbstractReconstructor):
         def generate_elt_name(t: str) -> str:
             return f"{t}_{random_id()}"
 
-        def elt_to_ast(obj) -> Optional[ast.AST]:
-            if is_primitive(obj):
-                return ast.Constant(value=obj)
+        graph = object_graph()
+        writer = ExpressionWriter(self.file_path.stem)
+
+        def elt_to_ast(obj) -> Generator[tuple[str, Any], Any, Optional[ast.expr]]:
+            if graph.is_primitive(obj):
+                if not is_collection(obj):
+                    return ast.Constant(value=obj)
+                rename = generate_elt_name(obj.__class__.__name__)
+                new_fixture = self._make_compact_fixture(rename, obj)
+                if new_fixture is None:
+                    return ast.Constant(value=obj)
+            elif (value := writer.inline(obj)) is not None:
+                return value
             else:
                 rename = generate_elt_name(obj.__class__.__name__)
-                new_fixture = self._make_fixture(rename, obj, seen_args)
+                new_fixture = yield rename, obj
                 if new_fixture is None:
                     return None
-                deps.append(new_fixture)
-                return ast.Name(id=f"generate_{rename}", ctx=ast.Load())
+            deps.append(new_fixture)
+            # an object seen before keeps the name it was first generated with
+            return ast.Name(id=f"generate_{new_fixture.parameter}", ctx=ast.Load())
 
         if isinstance(collection, dict):
-            d = {
-                elt_to_ast(key): elt_to_ast(value) for key, value in collection.items()
-            }
+            keys, values = [], []
+            for key, value in collection.items():
+                keys.append((yield from elt_to_ast(key)))
+                values.append((yield from elt_to_ast(value)))
 
-            if any(v is None for v in d.values()):
+            if any(v is None for v in keys + values):
                 return None
 
-            assert all(v is not None for v in d.values())
-
             _clone = cast(
                 ast.AST,
                 ast.Assign(
                     targets=[ast.Name(id=f"clone_{parameter}", ctx=ast.Store())],
                     value=ast.Dict(
-                        keys=list(d.keys()),
-                        values=list(d.values()),  # type: ignore
+                        keys=keys,  # type: ignore
+                        values=values,  # type: ignore
                     ),
                 ),
             )
@@ -149,12 +455,12 @@ class ArgumentReconstructor(AbstractReconstructor):
             else:
                 assert False  # unreachable
 
-            collection_asts = list(map(elt_to_ast, collection))
+            collection_asts = []
+            for elt in collection:
+                collection_asts.append((yield from elt_to_ast(elt)))
             if any(v is None for v in collection_asts):
                 return None
 
-            assert all(v is not None for v in collection_asts)
-
             _clone = cast(
                 ast.AST,
                 ast.Assign(
@@ -172,15 +478,11 @@ class ArgumentReconstructor(AbstractReconstructor):
         ret = ast.fix_missing_locations(
             ast.Return(value=ast.Name(id=f"clone_{parameter}", ctx=ast.Load()))
         )
-        return MetaFixture(deps, parameter, meta_fixture_body, ret)
+        return MetaFixture(deps, parameter, meta_fixture_body, ret, writer.imports)
 
-    def _reconstruct_object_instance(
-        self, parameter: str, obj: Any, seen_args
-    ) -> Optional[MetaFixture]:
+    def _reconstruct_object_instance(self, parameter: str, obj: Any) -> FixtureBuilder:
         """Return an MetaFixture representation of a clone of obj by setting attributes equal to obj."""
 
-        attributes = get_next_attrs(obj)
-
         ptf_body: list[ast.AST] = []
         deps: list[MetaFixture] = []
 
@@ -190,7 +492,9 @@ class ArgumentReconstructor(AbstractReconstructor):
         clone_name = f"clone_{parameter}"
 
         if is_collection(obj):
-            return self._reconstruct_collection(parameter, obj, seen_args)
+            return (yield from self._reconstruct_collection(parameter, obj))
+
+        attributes = object_graph().attributes(obj)
 
         module_name = self.file_path.stem
 
@@ -215,8 +519,14 @@ class ArgumentReconstructor(AbstractReconstructor):
         _clone = ast.fix_missing_locations(_clone)
 
         ptf_body.append(_clone)
+        graph = object_graph()
+        writer = ExpressionWriter(module_name)
         for attribute_name, attribute_value in attributes:
-            if is_primitive(attribute_value):
+            # large collections get a fixture of their own, which may load them from a file
+            if graph.is_primitive(attribute_value) and not (
+                is_collection(attribute_value)
+                and len(attribute_value) >= config.compact_threshold
+            ):
                 _setattr = ast.Expr(
                     value=ast.Call(
                         func=ast.Name(id="setattr", ctx=ast.Load()),
@@ -227,13 +537,26 @@ class ArgumentReconstructor(AbstractReconstructor):
                         ],
                     )
                 )
+            elif (value := writer.inline(attribute_value)) is not None:
+                # e.g., a date: built in place rather than by a fixture of its own
+                _setattr = ast.Expr(
+                    value=ast.Call(
+                        func=ast.Name(id="setattr", ctx=ast.Load()),
+                        args=[
+                            ast.Name(id=clone_name, ctx=ast.Load()),
+                            ast.Name(id=f"'{attribute_name}'", ctx=ast.Load()),
+                            value,
+                        ],
+                    )
+                )
             else:
                 uniquified_name = (
                     f"{parameter}_{attribute_name}"  # needed to avoid name collisions
                 )
-                new_fixture = self._make_fixture(
-                    uniquified_name, attribute_value, seen_args
-                )
+                if len(uniquified_name) > MAX_NAME_LENGTH:
+                    # unique too: the attribute is alive (and so is its id) until the fixture is built
+                    uniquified_name = f"{attribute_name}_{id(attribute_value):x}"
+                new_fixture = yield uniquified_name, attribute_value
                 if new_fixture is None:
                     return None
                 deps.append(new_fixture)
@@ -243,7 +566,9 @@ class ArgumentReconstructor(AbstractReconstructor):
                         args=[
                             ast.Name(id=clone_name, ctx=ast.Load()),
                             ast.Name(id=f"'{attribute_name}'", ctx=ast.Load()),
-                            ast.Name(id=f"generate_{uniquified_name}", ctx=ast.Load()),
+                            ast.Name(
+                                id=f"generate_{new_fixture.parameter}", ctx=ast.Load()
+                            ),
                         ],
                     )
                 )
@@ -253,62 +578,14 @@ class ArgumentReconstructor(AbstractReconstructor):
         ret = ast.fix_missing_locations(
             ast.Return(value=ast.Name(id=f"clone_{parameter}", ctx=ast.Load()))
         )
-        return MetaFixture(deps, parameter, cast(list[ast.stmt], ptf_body), ret)
+        return MetaFixture(
+            deps, parameter, cast(list[ast.stmt], ptf_body), ret, writer.imports
+        )
 
     @staticmethod
     def is_reconstructible(obj: Any) -> bool:
-        """True iff object is an instance of a user-defined class."""
-
-        def is_bad(o: Any) -> bool:
-            results = {
-                "ismodule": inspect.ismodule(o),
-                "isclass": inspect.isclass(o),
-                "ismethod": inspect.ismethod(o),
-                "isfunction": inspect.isfunction(o),
-                "isgenerator": inspect.isgenerator(o),
-                "isgeneratorfunction": inspect.isgeneratorfunction(o),
-                "iscoroutine": inspect.iscoroutine(o),
-                "iscoroutinefunction": inspect.iscoroutinefunction(o),
-                "isawaitable": inspect.isawaitable(o),
-                "isasyncgen": inspect.isasyncgen(o),
-                "istraceback": inspect.istraceback(o),
-                "isframe": inspect.isframe(o),
-                "isbuiltin": inspect.isbuiltin(o),
-                "ismethodwrapper": inspect.ismethodwrapper(o),
-                "isgetsetdescriptor": inspect.isgetsetdescriptor(o),
-                "ismemberdescriptor": inspect.ismemberdescriptor(o),
-            }
-            return any(results.values())
-
-        def in_that_uses_is(o: Any, lst: list[Any]):
-            """
-            We want to check reference equality for fields, not actual equality as they might have custom implementations
-            of `__eq__`.
-            """
-            return any([o is i for i in lst])
-
-        if is_bad(obj):
-            return False
-
-        visited: list[Any] = []
-
-        q: deque[Any] = deque()
-        q.append(obj)
-
-        while len(q) != 0:
-            current_obj = q.popleft()
-            visited.append(current_obj)
-            # no need to explore current node as we have already explored it with is_bad
-            for next_attr in [kv[1] for kv in get_next_attrs(current_obj)]:
-                # fixes infinite cycling due to int pooling w/ check to is_primitive
-                # https://stackoverflow.com/questions/6101379/what-happens-behind-the-scenes-when-python-adds-small-ints
-                # primitives are trivially reconstructible
-                if not in_that_uses_is(next_attr, visited) and not is_primitive(
-                    next_attr
-                ):
-                    visited.append(next_attr)
-                    if is_bad(next_attr):
-                        is_bad(next_attr)
-                        return False
-                    q.append(next_attr)
-        return True
+        """
+        True iff object is an instance of a user-defined class.
+        Inside a capture_cache.scope(), each object graph is walked at most once.
+        """
+        return object_graph().is_reconstructible(obj)
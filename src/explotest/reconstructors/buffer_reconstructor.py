@@ -0,0 +1,147 @@
+import array
+import ast
+import hashlib
+import sys
+from pathlib import Path
+from typing import Any, Optional, override
+
+from .. import config
+from ..meta_fixture import MetaFixture
+from ..reconstructors.abstract_reconstructor import AbstractReconstructor
+from ..reconstructors.pickle_reconstructor import PickleReconstructor
+from ..storage import store_sidecar
+
+# formats memoryview.cast can map a raw file back to
+CASTABLE_FORMATS = frozenset("bBhHiIlLqQnNfd?ce")
+
+
+def _ndarray_type() -> Optional[type]:
+    # only look for NumPy if the program-under-test has imported it
+    numpy = sys.modules.get("numpy")
+    return numpy.ndarray if numpy is not None else None
+
+
+def is_buffer(x: Any) -> bool:
+    """True iff x is a buffer that can be saved as a raw file: a NumPy array (without Python objects inside, in any
+    layout), a bytearray, an array.array or a contiguous memoryview."""
+    t = type(x)
+    if t is bytearray or t is array.array:
+        return True
+    if t is memoryview:
+        return x.contiguous and x.format in CASTABLE_FORMATS
+    return t is _ndarray_type() and not x.dtype.hasobject
+
+
+def _order(ndarray: Any) -> str:
+    """The order numpy.save writes ndarray in: "F" for arrays only contiguous in Fortran order (e.g., a.T), else "C"."""
+    return "F" if ndarray.flags.f_contiguous and not ndarray.flags.c_contiguous else "C"
+
+
+def _call(func: ast.expr, *args: Any, **kwargs: Any) -> ast.Call:
+    return ast.Call(
+        func=func,
+        args=[ast.Constant(value=a) for a in args],
+        keywords=[
+            ast.keyword(arg=k, value=ast.Constant(value=v)) for k, v in kwargs.items()
+        ],
+    )
+
+
+def _attribute(dotted: str) -> ast.expr:
+    return ast.parse(dotted, mode="eval").body
+
+
+class BufferReconstructor(AbstractReconstructor):
+    """
+    Saves large contiguous buffers as raw sidecar files (.npy for NumPy arrays) that generated tests map
+    into memory copy-on-write, so setting up a test neither unpickles nor duplicates the buffer.
+    Everything else is handed to the backup reconstructor.
+    """
+
+    def __init__(
+        self,
+        file_path: Path,
+        backup_reconstructor: type[AbstractReconstructor] | None = PickleReconstructor,
+    ):
+        super().__init__(file_path, backup_reconstructor)
+        self.directory = Path(f"{self.file_path.parent}/pickled")
+
+    @override
+    def make_fixture(self, parameter, argument):
+        if (
+            is_buffer(argument)
+            and memoryview(argument).nbytes > config.buffer_threshold
+        ):
+            return self._make_buffer_fixture(parameter, argument)
+        if self.backup_reconstructor:
+            return self.backup_reconstructor.make_fixture(parameter, argument)
+        return None
+
+    def _make_buffer_fixture(self, parameter: str, buffer: Any) -> MetaFixture:
+        data = memoryview(buffer)
+        if type(buffer) is _ndarray_type():
+            # pages are shared with the file until written to, and writes never reach the file,
+            # so this is safe even if the function-under-test mutates its argument
+            path = self._store(
+                buffer, ".npy", f"{buffer.dtype.str}{buffer.shape}{_order(buffer)}"
+            )
+            loader = _call(_attribute("numpy.load"), str(path), mmap_mode="c")
+            imports: list[ast.Import | ast.ImportFrom] = [
+                ast.Import(names=[ast.alias(name="numpy")])
+            ]
+        else:
+            imports = [ast.Import(names=[ast.alias(name="explotest.runtime")])]
+            match buffer:
+                case memoryview():
+                    path = self._store(buffer, ".bin", f"{data.format}{data.shape}")
+                    loader = _call(
+                        _attribute("explotest.runtime.map_memoryview"),
+                        str(path),
+                        data.format,
+                        data.shape,
+                    )
+                case bytearray():
+                    # a bytearray owns its memory, so it has to be read (once, without unpickling)
+                    path = self._store(buffer, ".bin", "")
+                    loader = _call(
+                        _attribute("explotest.runtime.read_bytearray"), str(path)
+                    )
+                case array.array():
+                    path = self._store(buffer, ".bin", buffer.typecode)
+                    loader = _call(
+                        _attribute("explotest.runtime.read_array"),
+                        str(path),
+                        buffer.typecode,
+                    )
+                case _:
+                    assert False  # unreachable
+
+        generated_ast = ast.fix_missing_locations(
+            ast.Assign(targets=[ast.Name(id=parameter, ctx=ast.Store())], value=loader)
+        )
+        ret = ast.fix_missing_locations(
+            ast.Return(value=ast.Name(id=parameter, ctx=ast.Load()))
+        )
+        return MetaFixture([], parameter, [generated_ast], ret, imports)
+
+    def _store(self, buffer: Any, suffix: str, layout: str) -> Path:
+        """Write buffer to a file named after its content and layout."""
+        if suffix == ".npy":
+            # the bytes numpy.save writes, which are contiguous even if the array is not (e.g., a[:, ::2])
+            data = memoryview(buffer.ravel(order=_order(buffer))).cast("B")
+        elif isinstance(buffer, array.array):
+            data = memoryview(buffer.tobytes())
+        else:
+            data = memoryview(buffer).cast("B")
+        h = hashlib.blake2b(layout.encode(), digest_size=16)
+        h.update(data)
+
+        def write(f):
+            if suffix == ".npy":
+                import numpy
+
+                numpy.save(f, buffer, allow_pickle=False)
+            else:
+                f.write(data)
+
+        return store_sidecar(self.directory / f"{h.hexdigest()}{suffix}", write)
@@ -1,82 +1,53 @@
 import ast
-from typing import override, cast
+from pathlib import Path
+from typing import override
 
-import dill
-
-from ..helpers import is_primitive, random_id
+from ..helpers import is_primitive
 from ..meta_fixture import MetaFixture
 from ..reconstructors.abstract_reconstructor import AbstractReconstructor
+from ..storage import get_store
 
 
 class PickleReconstructor(AbstractReconstructor):
+    def __init__(
+        self,
+        file_path: Path,
+        backup_reconstructor: type[AbstractReconstructor] | None = None,
+    ):
+        super().__init__(file_path, backup_reconstructor)
+        # pickles are content-addressed, so the same object captured many times is stored once
+        self.store = get_store(Path(f"{self.file_path.parent}/pickled"))
+
     @override
     def make_fixture(self, parameter, argument):
         if is_primitive(argument):
-            return super()._make_primitive_fixture(parameter, argument)
+            return self._make_compact_fixture(
+                parameter, argument
+            ) or super()._make_primitive_fixture(parameter, argument)
 
-        # create a unique ID for the pickled object
-        pickled_id = random_id()
+        # values with a constructor expression need no file
+        if (fixture := self._make_value_fixture(parameter, argument)) is not None:
+            return fixture
 
-        # write the pickled object to file
-        pickled_path = f"{self.file_path.parent}/pickled/{parameter}_{pickled_id}.pkl"
+        # write the pickled object to the store
         try:
-            with open(pickled_path, "wb") as f:
-                f.write(dill.dumps(argument))
+            key = self.store.dump(argument)
         except TypeError:
             print(
                 f"[ERROR]: Cannot pickle argument '{parameter}' of type {type(argument).__name__}"
             )
             return None
 
-        # create the fixture to generate the parameter
-        generated_ast = cast(
-            ast.AST,
-            # corresponds to with open(pickled_path, "rb") as f:
-            ast.With(
-                items=[
-                    ast.withitem(
-                        context_expr=ast.Call(
-                            func=ast.Name(id="open", ctx=ast.Load()),
-                            args=[
-                                ast.Constant(value=pickled_path),
-                                ast.Constant(value="rb"),
-                            ],
-                            keywords=[],
-                        ),
-                        optional_vars=ast.Name(id="f", ctx=ast.Store()),
-                    )
-                ],
-                body=[
-                    # corresponds to parameter = dill.loads(f.read())
-                    ast.Assign(
-                        targets=[ast.Name(id=parameter, ctx=ast.Store())],
-                        value=ast.Call(
-                            func=ast.Attribute(
-                                value=ast.Name(id="dill", ctx=ast.Load()),
-                                attr="loads",
-                                ctx=ast.Load(),
-                            ),
-                            args=[
-                                ast.Call(
-                                    func=ast.Attribute(
-                                        value=ast.Name(id="f", ctx=ast.Load()),
-                                        attr="read",
-                                        ctx=ast.Load(),
-                                    ),
-                                    args=[],
-                                    keywords=[],
-                                )
-                            ],
-                            keywords=[],
-                        ),
-                    )
-                ],
-            ),
-        )
-        generated_ast = ast.fix_missing_locations(generated_ast)
+        # create the fixture to load the parameter
+        generated_ast = [
+            ast.fix_missing_locations(stmt)
+            for stmt in self.store.make_load(parameter, key)
+        ]
 
         ret = ast.fix_missing_locations(
             ast.Return(value=ast.Name(id=parameter, ctx=ast.Load()))
         )
 
-        return MetaFixture([], parameter, [generated_ast], ret)
+        return MetaFixture(
+            [], parameter, generated_ast, ret, self.store.make_load_imports(key)
+        )
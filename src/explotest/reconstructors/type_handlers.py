@@ -0,0 +1,375 @@
+"""
+Constructor expressions for values of common types, e.g., fut.Point(x=1, y=2), datetime.date(2024, 1, 31) or b'...',
+so that generated tests build these values in one expression, instead of unpickling them from a file
+or setting their attributes one by one.
+
+Values bound to a global of the program (see module_globals) are referred to by name instead.
+Otherwise, handlers are looked up by the exact type of a value, then by family (e.g., all dataclasses);
+more can be added with register and register_family.
+"""
+
+import ast
+import dataclasses
+import datetime
+import decimal
+import enum
+import fractions
+import inspect
+import pathlib
+import sys
+import uuid
+import zoneinfo
+from typing import Any, Callable, Iterable, Optional
+
+from .. import capture_cache, config, module_globals
+from ..helpers import is_collection
+
+# bytes longer than this are left to the other reconstructors rather than written out in the test
+MAX_BYTES_LENGTH = 1 << 12
+
+# values nested deeper than this inside an expression (e.g., tuples of tuples) are left to the other reconstructors,
+# which do not recurse: writing the expression, and later unparsing it, would
+MAX_NESTING = 100
+
+
+class ExpressionWriter:
+    """Writes the expressions that rebuild values, and collects the imports they need."""
+
+    def __init__(self, fut_module: str):
+        """:param fut_module: Name of the module of the function-under-test, as imported by the test."""
+        self.fut_module = fut_module
+        self.imports: list[ast.Import | ast.ImportFrom] = []
+        # True while writing a value that is part of another expression: it is then built once per occurrence,
+        # so it must not be mutable, or objects shared in the original would not be in the test
+        self.inlined = False
+        # the values being written, each inside the previous one
+        self.path: list[Any] = []
+
+    def expression(self, value: Any) -> Optional[ast.expr]:
+        """The expression that rebuilds value, or None if there is none."""
+        # imported here, as the argument reconstructor writes its values with this module
+        from .argument_reconstructor import object_graph
+
+        # checks each collection once, without recursion, however deeply collections are nested
+        if object_graph().is_primitive(value):
+            if is_collection(value) and len(value) >= config.compact_threshold:
+                # left to _make_compact_fixture
+                return None
+            return ast.Constant(value=value)
+        if id(value) in _too_deep():
+            return None
+        if (reference := self.reference(value)) is not None:
+            return reference
+        handler = handler_for(type(value))
+        return handler(value, self) if handler is not None else None
+
+    def inline(self, value: Any) -> Optional[ast.expr]:
+        """Same as expression, for a value written inside another expression (see inlined)."""
+        if len(self.path) >= MAX_NESTING:
+            # so are the values it is nested in: not trying them again keeps deep nesting linear
+            _too_deep().update((id(v), v) for v in self.path)
+            return None
+        inlined, self.inlined = self.inlined, True
+        self.path.append(value)
+        try:
+            return self.expression(value)
+        finally:
+            self.inlined = inlined
+            self.path.pop()
+
+    def inline_all(self, values: Iterable[Any]) -> Optional[list[ast.expr]]:
+        """Same as inline, for each of the values, or None if any cannot be written."""
+        expressions = []
+        for value in values:
+            expression = self.inline(value)
+            if expression is None:
+                return None
+            expressions.append(expression)
+        return expressions
+
+    def module(self, name: str) -> ast.expr:
+        """A reference to the module name, which the test imports."""
+        if not any(
+            isinstance(i, ast.Import) and i.names[0].name == name for i in self.imports
+        ):
+            self.imports.append(ast.Import(names=[ast.alias(name=name)]))
+        return ast.parse(name, mode="eval").body
+
+    def reference(self, value: Any) -> Optional[ast.expr]:
+        """A reference to the module global that value is bound to (see module_globals), or None if there is none."""
+        found = module_globals.find(value, self.fut_module)
+        if found is None:
+            return None
+        module_name, name = found
+        if module_name in ("__main__", self.fut_module):
+            module = ast.Name(id=self.fut_module, ctx=ast.Load())
+        else:
+            module = self.module(module_name)
+        return ast.Attribute(value=module, attr=name, ctx=ast.Load())
+
+    def qualified(self, cls: type) -> Optional[ast.expr]:
+        """A reference to cls, or None if it cannot be imported by name (e.g., it is defined in a function)."""
+        target: Any = sys.modules.get(cls.__module__)
+        for part in cls.__qualname__.split("."):
+            target = getattr(target, part, None)
+        if target is not cls:
+            return None
+        if cls.__module__ == "builtins":
+            return ast.parse(cls.__qualname__, mode="eval").body
+        if cls.__module__ in ("__main__", self.fut_module):
+            module = ast.Name(id=self.fut_module, ctx=ast.Load())
+        else:
+            module = self.module(cls.__module__)
+        result = module
+        for part in cls.__qualname__.split("."):
+            result = ast.Attribute(value=result, attr=part, ctx=ast.Load())
+        return result
+
+    def call(
+        self, func: Optional[ast.expr], *args: Any, **kwargs: Any
+    ) -> Optional[ast.expr]:
+        """The expression func(*args, **kwargs), where args and kwargs are values, or None if any cannot be written."""
+        if func is None:
+            return None
+        arguments = self.inline_all(args)
+        values = self.inline_all(kwargs.values())
+        if arguments is None or values is None:
+            return None
+        return ast.Call(
+            func=func,
+            args=arguments,
+            keywords=[ast.keyword(arg=k, value=v) for k, v in zip(kwargs, values)],
+        )
+
+
+def _too_deep() -> dict[int, Any]:
+    """The values, by id, found to be nested deeper than MAX_NESTING in the current capture_cache.scope()."""
+    return capture_cache.shared("values too deep for expressions", dict)
+
+
+# returns the expression that rebuilds a value, or None if it cannot
+Handler = Callable[[Any, ExpressionWriter], Optional[ast.expr]]
+
+_handlers: dict[type, Handler] = {}
+_families: list[tuple[Callable[[type], bool], Handler]] = []
+# handler of each type seen so far
+_handler_of: dict[type, Optional[Handler]] = {}
+
+
+def register(t: type, handler: Handler) -> None:
+    """Rebuild the instances of t (but not of its subclasses) with handler."""
+    _handlers[t] = handler
+    _handler_of.clear()
+
+
+def register_family(applies: Callable[[type], bool], handler: Handler) -> None:
+    """Rebuild the instances of the types t for which applies(t) with handler, unless t has a handler of its own."""
+    _families.append((applies, handler))
+    _handler_of.clear()
+
+
+def handler_for(t: type) -> Optional[Handler]:
+    if t not in _handler_of:
+        handler = _handlers.get(t)
+        if handler is None:
+            handler = next((h for applies, h in _families if applies(t)), None)
+        _handler_of[t] = handler
+    return _handler_of[t]
+
+
+def _bytes(value: bytes, writer: ExpressionWriter) -> Optional[ast.expr]:
+    return ast.Constant(value=value) if len(value) <= MAX_BYTES_LENGTH else None
+
+
+def _tuple(value: tuple, writer: ExpressionWriter) -> Optional[ast.expr]:
+    elements = writer.inline_all(value)
+    if elements is None:
+        return None
+    return ast.Tuple(elts=elements, ctx=ast.Load())
+
+
+def _frozenset(value: frozenset, writer: ExpressionWriter) -> Optional[ast.expr]:
+    if not value:
+        return writer.call(writer.qualified(frozenset))
+    func = writer.qualified(frozenset)
+    elements = writer.inline_all(value)
+    if func is None or elements is None:
+        return None
+    return ast.Call(func=func, args=[ast.Set(elts=elements)], keywords=[])
+
+
+def _range(value: range, writer: ExpressionWriter) -> Optional[ast.expr]:
+    return writer.call(writer.qualified(range), value.start, value.stop, value.step)
+
+
+def _date(value: datetime.date, writer: ExpressionWriter) -> Optional[ast.expr]:
+    return writer.call(
+        writer.qualified(datetime.date), value.year, value.month, value.day
+    )
+
+
+def _datetime(value: datetime.datetime, writer: ExpressionWriter) -> Optional[ast.expr]:
+    kwargs: dict[str, Any] = {"tzinfo": value.tzinfo} if value.tzinfo else {}
+    if value.fold:
+        kwargs["fold"] = value.fold
+    return writer.call(
+        writer.qualified(datetime.datetime),
+        value.year,
+        value.month,
+        value.day,
+        value.hour,
+        value.minute,
+        value.second,
+        value.microsecond,
+        **kwargs,
+    )
+
+
+def _time(value: datetime.time, writer: ExpressionWriter) -> Optional[ast.expr]:
+    kwargs: dict[str, Any] = {"tzinfo": value.tzinfo} if value.tzinfo else {}
+    if value.fold:
+        kwargs["fold"] = value.fold
+    return writer.call(
+        writer.qualified(datetime.time),
+        value.hour,
+        value.minute,
+        value.second,
+        value.microsecond,
+        **kwargs,
+    )
+
+
+def _timedelta(
+    value: datetime.timedelta, writer: ExpressionWriter
+) -> Optional[ast.expr]:
+    return writer.call(
+        writer.qualified(datetime.timedelta),
+        days=value.days,
+        seconds=value.seconds,
+        microseconds=value.microseconds,
+    )
+
+
+def _timezone(value: datetime.timezone, writer: ExpressionWriter) -> Optional[ast.expr]:
+    if value is datetime.timezone.utc:
+        utc = writer.qualified(datetime.timezone)
+        return utc and ast.Attribute(value=utc, attr="utc", ctx=ast.Load())
+    offset = value.utcoffset(None)
+    if value.tzname(None) == datetime.timezone(offset).tzname(None):
+        return writer.call(writer.qualified(datetime.timezone), offset)
+    return writer.call(writer.qualified(datetime.timezone), offset, value.tzname(None))
+
+
+def _zoneinfo(value: zoneinfo.ZoneInfo, writer: ExpressionWriter) -> Optional[ast.expr]:
+    # zones read from a file have no key
+    if value.key is None:
+        return None
+    return writer.call(writer.qualified(zoneinfo.ZoneInfo), value.key)
+
+
+def _decimal(value: decimal.Decimal, writer: ExpressionWriter) -> Optional[ast.expr]:
+    # from a string, which is exact
+    return writer.call(writer.qualified(decimal.Decimal), str(value))
+
+
+def _fraction(
+    value: fractions.Fraction, writer: ExpressionWriter
+) -> Optional[ast.expr]:
+    return writer.call(
+        writer.qualified(fractions.Fraction), value.numerator, value.denominator
+    )
+
+
+def _uuid(value: uuid.UUID, writer: ExpressionWriter) -> Optional[ast.expr]:
+    return writer.call(writer.qualified(uuid.UUID), str(value))
+
+
+def _path(value: pathlib.PurePath, writer: ExpressionWriter) -> Optional[ast.expr]:
+    # the classes are defined in a private module, but exported by pathlib
+    cls = ast.Attribute(
+        value=writer.module("pathlib"), attr=type(value).__name__, ctx=ast.Load()
+    )
+    return writer.call(cls, str(value))
+
+
+def _is_enum(t: type) -> bool:
+    return issubclass(t, enum.Enum)
+
+
+def _enum(value: enum.Enum, writer: ExpressionWriter) -> Optional[ast.expr]:
+    cls = writer.qualified(type(value))
+    if cls is None:
+        return None
+    if value.name is not None and getattr(type(value), value.name, None) is value:
+        return ast.Attribute(value=cls, attr=value.name, ctx=ast.Load())
+    # e.g., a combination of flags
+    return writer.call(cls, value.value)
+
+
+def _is_namedtuple(t: type) -> bool:
+    if not issubclass(t, tuple) or not hasattr(t, "_fields"):
+        return False
+    # the fields are the arguments of the constructor, unless a subclass overrides it
+    for base in t.__mro__:
+        if "_fields" in vars(base):
+            return True
+        if "__new__" in vars(base):
+            return False
+    return False
+
+
+def _namedtuple(value: tuple, writer: ExpressionWriter) -> Optional[ast.expr]:
+    fields = type(value)._fields  # type: ignore[attr-defined]
+    return writer.call(writer.qualified(type(value)), **dict(zip(fields, value)))
+
+
+def _is_dataclass(t: type) -> bool:
+    if not dataclasses.is_dataclass(t) or hasattr(t, "__post_init__"):
+        return False
+    # the fields are the arguments of the constructor, unless __init__ is written by hand or takes InitVars
+    fields = dataclasses.fields(t)
+    try:
+        parameters = list(inspect.signature(t).parameters)
+    except (TypeError, ValueError):
+        return False
+    return all(f.init for f in fields) and parameters == [f.name for f in fields]
+
+
+def _dataclass(value: Any, writer: ExpressionWriter) -> Optional[ast.expr]:
+    params = type(value).__dataclass_params__  # type: ignore[attr-defined]
+    if writer.inlined and not params.frozen:
+        return None
+    fields = dataclasses.fields(value)
+    # attributes that are not fields cannot be passed to the constructor
+    if hasattr(value, "__dict__") and len(vars(value)) != len(fields):
+        return None
+    return writer.call(
+        writer.qualified(type(value)),
+        **{f.name: getattr(value, f.name) for f in fields},
+    )
+
+
+for _t, _handler in [
+    (bytes, _bytes),
+    (tuple, _tuple),
+    (frozenset, _frozenset),
+    (range, _range),
+    (datetime.date, _date),
+    (datetime.datetime, _datetime),
+    (datetime.time, _time),
+    (datetime.timedelta, _timedelta),
+    (datetime.timezone, _timezone),
+    (zoneinfo.ZoneInfo, _zoneinfo),
+    (decimal.Decimal, _decimal),
+    (fractions.Fraction, _fraction),
+    (uuid.UUID, _uuid),
+    (pathlib.PurePosixPath, _path),
+    (pathlib.PureWindowsPath, _path),
+    (pathlib.PosixPath, _path),
+    (pathlib.WindowsPath, _path),
+]:
+    register(_t, _handler)
+
+register_family(_is_enum, _enum)
+register_family(_is_namedtuple, _namedtuple)
+register_family(_is_dataclass, _dataclass)
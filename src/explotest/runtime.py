@@ -0,0 +1,104 @@
+"""
+Helpers used by generated tests (not by the code that generates them).
+"""
+
+import array
+import functools
+import importlib
+import io
+import mmap
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, cast
+
+import dill
+
+# modules providing open() for the codecs of storage.CODECS
+CODEC_MODULES = {
+    "gzip": ("gzip",),
+    "lzma": ("lzma",),
+    "zstd": ("compression.zstd", "zstandard"),
+}
+
+
+@functools.cache
+def _open_archive(path: str) -> sqlite3.Connection:
+    """Read-only connection to an archive, shared by all the fixtures of a test session."""
+    uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+@functools.cache
+def _codec_open(codec: str):
+    for module in CODEC_MODULES[codec]:
+        try:
+            return importlib.import_module(module).open
+        except ImportError:
+            continue
+    raise ImportError(f"[ERROR]: No module available to decompress {codec}.")
+
+
+class _BlobReader(io.RawIOBase):
+    """Adapts an sqlite3.Blob to a raw stream, so that it can be buffered and read incrementally."""
+
+    def __init__(self, blob: sqlite3.Blob):
+        self.blob = blob
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.blob.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def load_blob(path: str, key: str) -> Any:
+    """Load the payload stored under key in the archive at path (see storage.ArchiveStore)."""
+    connection = _open_archive(path)
+    row = connection.execute(
+        "SELECT rowid, codec FROM blobs WHERE key = ?", (key,)
+    ).fetchone()
+    if row is None:
+        raise KeyError(f"[ERROR]: No payload {key} in {path}.")
+    rowid, codec = row
+
+    # stream the payload instead of reading it into memory at once
+    with connection.blobopen("blobs", "payload", rowid, readonly=True) as blob:
+        f = io.BufferedReader(_BlobReader(blob))
+        if codec is not None:
+            f = _codec_open(codec)(f, "rb")
+        with f:
+            return dill.load(f)
+
+
+def map_memoryview(path: str, fmt: str, shape: tuple[int, ...]) -> memoryview:
+    """
+    Map the raw buffer at path into memory, copy-on-write, as a memoryview of the given format and shape.
+    Pages are only read when accessed, and writes never reach the file.
+    """
+    # one of buffer_reconstructor.CASTABLE_FORMATS, which the stubs of memoryview.cast spell out as literals
+    view_format = cast(Any, fmt)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map empty files
+            return memoryview(b"").cast(view_format, shape)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    return memoryview(mapped).cast(view_format, shape)
+
+
+def read_bytearray(path: str) -> bytearray:
+    """Read the raw buffer at path into a new bytearray, without intermediate copies."""
+    with open(path, "rb") as f:
+        buffer = bytearray(os.fstat(f.fileno()).st_size)
+        f.readinto(buffer)
+    return buffer
+
+
+def read_array(path: str, typecode: str) -> array.array:
+    """Read the raw buffer at path into a new array.array of the given typecode."""
+    result = array.array(typecode)
+    with open(path, "rb") as f:
+        result.fromfile(f, os.fstat(f.fileno()).st_size // result.itemsize)
+    return result
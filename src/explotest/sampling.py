@@ -0,0 +1,257 @@
+"""
+Capture policies decide, before any work is done, whether a call to a function-under-test is recorded.
+"""
+
+import hashlib
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Any, Hashable, Optional, override
+
+
+class CapturePolicy(ABC):
+    """
+    Superclass for all capture policies.
+    Policies are consulted on every call, so should_capture must be cheap.
+    """
+
+    # whether record needs the runtime of the calls that are not captured, which are otherwise not timed
+    timed: bool = False
+
+    @abstractmethod
+    def should_capture(self, args: tuple[Any, ...], kwargs: dict[str, Any]) -> bool:
+        """
+        :param args: Positional arguments of the call
+        :param kwargs: Keyword arguments of the call
+        :return: True iff a unit test should be generated for this call.
+        """
+        ...
+
+    def record(self, runtime: float, overhead: Optional[float]) -> None:
+        """
+        Called after each call the policy was consulted on (but for calls that are not captured, only if timed).
+        :param runtime: Seconds the function-under-test ran
+        :param overhead: Seconds capturing the call added to it, on the caller's thread, or None if it was not captured
+        """
+
+    def record_outcome(self, failed: bool) -> None:
+        """Called once a captured call has been turned into a test, or has failed to (e.g., on the background thread)."""
+
+
+class Always(CapturePolicy):
+    """Capture every call (the default)."""
+
+    @override
+    def should_capture(self, args, kwargs):
+        return True
+
+
+class Percentage(CapturePolicy):
+    """Capture each call with probability percent / 100."""
+
+    def __init__(self, percent: float):
+        if not 0 <= percent <= 100:
+            raise ValueError("[ERROR]: percent must be between 0 and 100.")
+        self.rate = percent / 100
+
+    @override
+    def should_capture(self, args, kwargs):
+        return random.random() < self.rate
+
+
+class FirstN(CapturePolicy):
+    """Capture only the first n calls."""
+
+    def __init__(self, n: int):
+        self.remaining = n
+
+    @override
+    def should_capture(self, args, kwargs):
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class RateLimit(CapturePolicy):
+    """Capture at most per_second calls in any one-second window."""
+
+    def __init__(self, per_second: int):
+        self.per_second = per_second
+        self.window_start = 0.0
+        self.captured_in_window = 0
+
+    @override
+    def should_capture(self, args, kwargs):
+        now = time.monotonic()
+        if now - self.window_start >= 1:
+            self.window_start = now
+            self.captured_in_window = 0
+        if self.captured_in_window >= self.per_second:
+            return False
+        self.captured_in_window += 1
+        return True
+
+
+def fingerprint(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Hashable:
+    """
+    A key that tells the arguments of a call apart.
+    Hashable arguments are keyed by type and value (so that, e.g., 1, 1.0 and True are distinct although they are
+    equal); otherwise we fall back on a digest of their repr.
+    Note that instances of classes without __hash__/__eq__ compare by identity.
+    The key holds hashable arguments themselves, rather than their hash, so that distinct arguments never collide.
+    """
+    key = (
+        tuple((type(a), a) for a in args),
+        tuple(sorted((k, type(v), v) for k, v in kwargs.items())),
+    )
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+
+class UniqueArguments(CapturePolicy):
+    """
+    Capture one call per distinct argument fingerprint.
+    Only the maxsize fingerprints seen most recently are remembered (they may hold the arguments themselves), so a
+    call whose arguments were last seen before them is captured again.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        # fingerprints, from the least to the most recently seen
+        self.seen: OrderedDict[Hashable, None] = OrderedDict()
+
+    @override
+    def should_capture(self, args, kwargs):
+        key = fingerprint(args, kwargs)
+        if key in self.seen:
+            self.seen.move_to_end(key)
+            return False
+        self.seen[key] = None
+        if len(self.seen) > self.maxsize:
+            self.seen.popitem(last=False)
+        return True
+
+
+class AllOf(CapturePolicy):
+    """Capture a call iff all the given policies agree; evaluation stops at the first refusal."""
+
+    def __init__(self, *policies: CapturePolicy):
+        self.policies = policies
+        self.timed = any(policy.timed for policy in policies)
+
+    @override
+    def should_capture(self, args, kwargs):
+        return all(policy.should_capture(args, kwargs) for policy in self.policies)
+
+    @override
+    def record(self, runtime, overhead):
+        for policy in self.policies:
+            policy.record(runtime, overhead)
+
+    @override
+    def record_outcome(self, failed):
+        for policy in self.policies:
+            policy.record_outcome(failed)
+
+
+class OverheadBudget(CapturePolicy):
+    """
+    Capture calls at the rate that keeps the time spent capturing them at most percent / 100 of the time the
+    function-under-test runs, on average over the last window calls: the slower captures are compared to the function,
+    the rarer they are.
+    """
+
+    timed = True
+
+    def __init__(self, percent: float, window: int = 100):
+        if percent < 0:
+            raise ValueError("[ERROR]: percent must be positive.")
+        self.share = percent / 100
+        self.runtimes: deque[float] = deque(maxlen=window)
+        self.overheads: deque[float] = deque(maxlen=window)
+        # sums of runtimes and overheads
+        self.runtime = 0.0
+        self.overhead = 0.0
+
+    @override
+    def should_capture(self, args, kwargs):
+        if not self.overheads or self.overhead <= 0:
+            # what capturing costs is not known yet
+            return True
+        # the expected overhead per call, rate * mean overhead, is then the budget
+        mean_runtime = self.runtime / len(self.runtimes)
+        mean_overhead = self.overhead / len(self.overheads)
+        return random.random() < self.share * mean_runtime / mean_overhead
+
+    @override
+    def record(self, runtime, overhead):
+        if len(self.runtimes) == self.runtimes.maxlen:
+            self.runtime -= self.runtimes[0]
+        self.runtimes.append(runtime)
+        self.runtime += runtime
+        if overhead is not None:
+            if len(self.overheads) == self.overheads.maxlen:
+                self.overhead -= self.overheads[0]
+            self.overheads.append(overhead)
+            self.overhead += overhead
+
+
+class CircuitBreaker(CapturePolicy):
+    """
+    Stop capturing calls for cooldown seconds once max_failures captures in a row have failed, or have added more than
+    max_latency seconds to their call. After that, one call is captured to check: if it fails (or is slow) too,
+    capturing stops again for cooldown seconds, otherwise it resumes.
+    """
+
+    def __init__(
+        self,
+        max_failures: int = 5,
+        max_latency: Optional[float] = None,
+        cooldown: float = 60,
+    ):
+        self.max_failures = max_failures
+        self.max_latency = max_latency
+        self.cooldown = cooldown
+        self.failures = 0  # failed captures in a row
+        self.spikes = 0  # slow captures in a row
+        self.open_until = (
+            0.0  # no call is captured before this time (see time.monotonic)
+        )
+
+    @override
+    def should_capture(self, args, kwargs):
+        if max(self.failures, self.spikes) < self.max_failures:
+            return True
+        now = time.monotonic()
+        if now < self.open_until:
+            return False
+        # capture this call to check, and no other one until it is known how it went
+        self.open_until = now + self.cooldown
+        return True
+
+    @override
+    def record(self, runtime, overhead):
+        if overhead is None:
+            return
+        if self.max_latency is not None and overhead > self.max_latency:
+            self.spikes += 1
+            self._trip()
+        else:
+            self.spikes = 0
+
+    @override
+    def record_outcome(self, failed):
+        if failed:
+            self.failures += 1
+            self._trip()
+        else:
+            self.failures = 0
+
+    def _trip(self) -> None:
+        if max(self.failures, self.spikes) >= self.max_failures:
+            self.open_until = time.monotonic() + self.cooldown
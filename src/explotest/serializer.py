@@ -0,0 +1,227 @@
+"""
+Serialization of captured values.
+
+The C pickler is much faster than dill, so values are pickled with it first, and with dill only when needed:
+when pickle fails (lambdas, closures, generators, ...), or when it would save a reference to a class or
+function defined in __main__, which generated tests cannot import (dill saves those by value).
+Types that needed dill once go straight to dill afterwards, and so do containers of a type that needed dill once
+for the same function-under-test module.
+Objects bound to a global of the program, e.g., a configuration singleton that many values refer to,
+are saved as a reference to that global rather than copied into every pickle; so are the classes and functions
+of __main__ while capturing a function of __main__ (see module_globals.capturing), which the test imports.
+Both produce pickles that the dill.load in generated tests reads. The picklers only call back into Python for every
+object (reducer_override) when they may have to save it this way.
+"""
+
+import functools
+import hashlib
+import importlib
+import io
+import operator
+import pickle
+import sys
+import types
+from typing import Any, Optional
+
+from . import capture_cache, config, module_globals
+
+PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+# whether a container can be pickled depends on its elements, not its type
+CONTAINER_TYPES = frozenset({list, tuple, dict, set, frozenset})
+
+# types whose instances pickle failed to serialize
+_dill_types: set[type] = set()
+# (module of the function-under-test, container type) whose values pickle failed to serialize: the values of a
+# function tend to hold the same kinds of elements from one capture to the next
+_dill_containers: set[tuple[str, type]] = set()
+
+
+class NeedsDill(pickle.PicklingError):
+    """Raised while pickling an object that only dill serializes correctly."""
+
+
+def _reduce_module(obj: types.ModuleType) -> Any:
+    """Reduce a module to its import (the module of the function-under-test for __main__), if a test can import it."""
+    name = module_globals.importable_name(obj.__name__)
+    if name is not None and sys.modules.get(obj.__name__) is obj:
+        return importlib.import_module, (name,)
+    return NotImplemented
+
+
+def _by_reference(obj: Any) -> Any:
+    """
+    Reduce objects bound to a global of the program (see module_globals) to module.name,
+    and modules to their import, rather than saving copies of them.
+    """
+    if isinstance(obj, types.ModuleType):
+        return _reduce_module(obj)
+    found = module_globals.find(obj)
+    if found is None:
+        return NotImplemented
+    module_name, name = found
+    return operator.attrgetter(name), (sys.modules[module_name],)
+
+
+def _saved_by_name(obj: Any) -> bool:
+    """True iff pickle saves obj by name already: classes and functions, unless they are defined in __main__."""
+    return (
+        isinstance(obj, (type, types.FunctionType))
+        and getattr(obj, "__module__", None) != "__main__"
+    )
+
+
+class _Pickler(pickle.Pickler):
+    """The C pickler, without a reducer_override: it calls no Python code for the objects it saves by itself."""
+
+
+class _ByReferencePickler(_Pickler):
+    def reducer_override(self, obj):
+        if _saved_by_name(obj):
+            return NotImplemented
+        reduced = _by_reference(obj)
+        if reduced is NotImplemented and isinstance(obj, (type, types.FunctionType)):
+            raise NeedsDill(f"{obj!r} is defined in __main__")
+        return reduced
+
+
+class _MainSniffer:
+    """
+    Passes what a pickler writes on to file, noting whether it names __main__: pickle saves classes and functions
+    by module and name, so it does for those defined in __main__, which generated tests cannot import.
+    """
+
+    def __init__(self, file: Any):
+        self.file = file
+        self.found = False
+        self.tail = b""  # end of the previous write, in case the name is split between two writes
+
+    def write(self, data) -> int:
+        if not self.found and isinstance(data, bytes):
+            self.found = b"__main__" in self.tail + data[:7] or b"__main__" in data
+            self.tail = data[-7:]
+        return self.file.write(data)
+
+
+def _pickle(obj: Any, file: Any) -> bool:
+    """Serialize obj into file with the C pickler; False iff it must be serialized with dill instead."""
+    if config.by_reference:
+        _ByReferencePickler(file, PROTOCOL).dump(obj)
+        return True
+    # checking the output is much cheaper than calling a reducer_override for every object
+    sniffer = _MainSniffer(file)
+    _Pickler(sniffer, PROTOCOL).dump(obj)
+    # the name may also come from a mere string "__main__": dill serializes that correctly too
+    return not sniffer.found
+
+
+@functools.cache
+def _dill_picklers() -> tuple[type, type]:
+    """A dill pickler, and one that also saves the objects bound to globals of the program by reference."""
+    import dill
+
+    save_module = dill.Pickler.dispatch[types.ModuleType]
+
+    def save_importable_module(pickler, obj):
+        # dill saves the modules of the program by value
+        reduced = _reduce_module(obj)
+        if reduced is NotImplemented:
+            save_module(pickler, obj)
+        else:
+            pickler.save_reduce(*reduced, obj=obj)
+
+    class _DillPickler(dill.Pickler):
+        # a type dispatch, rather than a reducer_override, costs nothing for the objects of other types
+        dispatch = type(dill.Pickler.dispatch)(dill.Pickler.dispatch)
+        dispatch[types.ModuleType] = save_importable_module
+
+    class _ByReferenceDillPickler(_DillPickler):
+        def reducer_override(self, obj):
+            if _saved_by_name(obj):
+                return NotImplemented
+            return _by_reference(obj)
+
+    return _DillPickler, _ByReferenceDillPickler
+
+
+def dump(obj: Any, file: Any) -> None:
+    """
+    Serialize obj into file.
+    :param file: A writable file-like object with a reset() method that discards everything written to it,
+    called before falling back on dill.
+    """
+    cls = type(obj)
+    fut_module = module_globals.capturing_module()
+    if cls not in _dill_types and (fut_module, cls) not in _dill_containers:
+        try:
+            if _pickle(obj, file):
+                return
+        except Exception:
+            pass
+        if cls not in CONTAINER_TYPES:
+            _dill_types.add(cls)
+        elif fut_module is not None:
+            _dill_containers.add((fut_module, cls))
+        file.reset()
+
+    pickler, by_reference_pickler = _dill_picklers()
+    if config.by_reference:
+        pickler = by_reference_pickler
+    # recurse: only save the globals a function actually uses, rather than its whole module
+    pickler(file, PROTOCOL, recurse=True).dump(obj)
+
+
+class _BytesWriter(io.BytesIO):
+    def reset(self) -> None:
+        self.seek(0)
+        self.truncate()
+
+
+class _DigestWriter:
+    """Hashes what is written to it like storage.digest_of, and keeps it while it is at most threshold bytes long."""
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.reset()
+
+    def write(self, data) -> int:
+        self.hash.update(data)
+        buffer = self.buffer
+        if buffer is not None:
+            buffer += data
+            if len(buffer) > self.threshold:
+                self.buffer = None
+        return len(data)
+
+    def reset(self) -> None:
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.buffer: Optional[bytearray] = bytearray()
+
+
+def pickled(obj: Any) -> bytes | str:
+    """
+    The payload of obj (see dump), or only its digest if it is larger than config.compression_threshold: large
+    payloads are not kept in memory, so storage.BlobStore.dump streams them by serializing obj again.
+    Inside a capture_cache.scope(), obj is serialized at most once.
+    :raise Exception: If obj cannot be serialized.
+    """
+
+    def serialize() -> bytes | str:
+        f = _DigestWriter(config.compression_threshold)
+        dump(obj, f)
+        return bytes(f.buffer) if f.buffer is not None else f.hash.hexdigest()
+
+    return capture_cache.memoize("pickle", obj, serialize)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj to bytes (see dump). Like pickled, payloads of up to config.compression_threshold are memoized."""
+    payload = capture_cache.lookup("pickle", obj)
+    if isinstance(payload, bytes):
+        return payload
+    f = _BytesWriter()
+    dump(obj, f)
+    payload = f.getvalue()
+    if len(payload) <= config.compression_threshold:
+        capture_cache.memoize("pickle", obj, lambda: payload)
+    return payload
@@ -0,0 +1,448 @@
+"""
+Storage of serialized arguments and return values for generated tests.
+
+A store saves payloads under a content-derived key and knows how to emit the code
+that loads a payload back in a generated fixture. Objects are serialized straight
+into the store: small payloads stay in memory, large ones are streamed (and optionally
+compressed) through a temporary file, so peak memory does not grow with the payload.
+"""
+
+import ast
+import hashlib
+import importlib
+import importlib.util
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Optional, override
+
+from . import capture_cache, config, serializer
+
+COPY_CHUNK_SIZE = 1 << 20
+
+
+def digest_of(payload: bytes) -> str:
+    """Content address of a serialized payload."""
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class Codec:
+    """A compression format whose module provides a gzip.open-like open(file, mode)."""
+
+    name: str
+    suffix: str  # appended to the file name of compressed payloads
+    module: str  # module to import in generated tests
+    write_options: tuple[
+        tuple[str, Any], ...
+    ] = ()  # keyword arguments of open when compressing
+
+    def open(self, file, mode: str):
+        options = dict(self.write_options) if "w" in mode else {}
+        return importlib.import_module(self.module).open(file, mode, **options)
+
+
+def _zstd_module() -> Optional[str]:
+    for module in ("compression.zstd", "zstandard"):
+        try:
+            if importlib.util.find_spec(module) is not None:
+                return module
+        except ModuleNotFoundError:
+            # parent package (compression) does not exist before Python 3.14
+            continue
+    return None
+
+
+CODECS: dict[str, Codec] = {
+    # gzip defaults to its slowest level, which costs a lot of capture time for little gain
+    "gzip": Codec("gzip", ".gz", "gzip", (("compresslevel", 6),)),
+    "lzma": Codec("lzma", ".xz", "lzma"),
+}
+if (zstd_module := _zstd_module()) is not None:
+    CODECS["zstd"] = Codec("zstd", ".zst", zstd_module)
+
+
+def get_codec(name: Optional[str]) -> Optional[Codec]:
+    if name is None:
+        return None
+    if name not in CODECS:
+        raise ValueError(
+            f"[ERROR]: Compression {name!r} is not available, expected one of {list(CODECS)}."
+        )
+    return CODECS[name]
+
+
+class SpillingWriter:
+    """
+    File-like sink for a serializer. Hashes everything written to it, keeps payloads of up to
+    threshold bytes in memory, and streams larger ones to a temporary file, compressed with codec if given.
+    """
+
+    def __init__(self, directory: Path, threshold: int, codec: Optional[Codec]):
+        self.directory = directory
+        self.threshold = threshold
+        self.codec = codec
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.buffer = bytearray()
+        self.tmp_path: Optional[Path] = None
+        self.file: Any = None
+
+    def write(self, data) -> int:
+        self.hash.update(data)
+        if self.file is None:
+            self.buffer += data
+            if len(self.buffer) > self.threshold:
+                self._spill()
+        else:
+            self.file.write(data)
+        return len(data)
+
+    def _spill(self) -> None:
+        self.tmp_path = self.directory / f"{uuid.uuid4().hex}.tmp"
+        self.file = (
+            self.codec.open(self.tmp_path, "wb")
+            if self.codec
+            else open(self.tmp_path, "wb")
+        )
+        self.file.write(self.buffer)
+        self.buffer = bytearray()
+
+    @property
+    def digest(self) -> str:
+        return self.hash.hexdigest()
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+    def discard(self) -> None:
+        self.close()
+        if self.tmp_path is not None:
+            self.tmp_path.unlink(missing_ok=True)
+
+    def reset(self) -> None:
+        """Discard everything written so far and start over."""
+        self.discard()
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.buffer = bytearray()
+        self.tmp_path = None
+        self.file = None
+
+
+class BlobStore(ABC):
+    """
+    Superclass for all stores.
+    """
+
+    # imports needed by the code emitted by make_load
+    load_imports: list[ast.Import | ast.ImportFrom] = []
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        # digests known to be stored (and how they are compressed); these are neither opened nor written again
+        self.known_digests: dict[str, Optional[Codec]] = {}
+        self.lock = threading.Lock()
+
+    def put(self, payload: bytes) -> str:
+        """
+        Store payload, unless an identical payload is already stored.
+        :return: The key of the stored payload.
+        """
+        digest = digest_of(payload)
+        if self._is_stored(digest):
+            return digest
+        self._write(digest, payload)
+        with self.lock:
+            self.known_digests[digest] = None
+        return digest
+
+    def dump(self, obj: Any) -> str:
+        """
+        Serialize obj into the store, unless an identical payload is already stored.
+        Payloads larger than config.compression_threshold are streamed and compressed with config.compression.
+        :return: The key of the stored payload.
+        """
+        # reuse the payload if obj was already serialized during this capture (see serializer.pickled)
+        payload = capture_cache.lookup("pickle", obj)
+        if isinstance(payload, str) and self._is_stored(payload):
+            return payload
+        writer = SpillingWriter(
+            self.directory,
+            config.compression_threshold,
+            get_codec(config.compression),
+        )
+        try:
+            if isinstance(payload, bytes):
+                writer.write(payload)
+            else:
+                serializer.dump(obj, writer)
+            writer.close()
+        except BaseException:
+            writer.discard()
+            raise
+
+        digest = writer.digest
+        if self._is_stored(digest):
+            writer.discard()
+            return digest
+
+        if writer.tmp_path is None:
+            self._write(digest, bytes(writer.buffer))
+            codec = None
+        else:
+            self._write_file(digest, writer.tmp_path, writer.codec)
+            codec = writer.codec
+        with self.lock:
+            self.known_digests[digest] = codec
+        return digest
+
+    def _is_stored(self, digest: str) -> bool:
+        with self.lock:
+            return digest in self.known_digests
+
+    @abstractmethod
+    def _write(self, digest: str, payload: bytes) -> None:
+        """Persist the uncompressed payload under digest, if it is not persisted already."""
+        ...
+
+    @abstractmethod
+    def _write_file(self, digest: str, tmp_path: Path, codec: Optional[Codec]) -> None:
+        """Persist the payload in the temporary file tmp_path under digest, and remove tmp_path."""
+        ...
+
+    @abstractmethod
+    def make_load(self, parameter: str, key: str) -> list[ast.stmt]:
+        """
+        :param parameter: Variable to load the payload into
+        :param key: Key returned by put or dump
+        :return: Statements that load and deserialize the payload into parameter.
+        """
+        ...
+
+    def make_load_imports(self, key: str) -> list[ast.Import | ast.ImportFrom]:
+        """Imports needed by the statements make_load emits for key."""
+        return list(self.load_imports)
+
+
+class ContentAddressedStore(BlobStore):
+    """
+    Stores serialized payloads in a directory, one file per distinct payload, named after its digest.
+    Identical payloads are written once, no matter how many times they are captured.
+    """
+
+    def path_of(self, digest: str, codec: Optional[Codec] = None) -> Path:
+        return self.directory / f"{digest}.pkl{codec.suffix if codec else ''}"
+
+    def _find(self, digest: str) -> tuple[bool, Optional[Codec]]:
+        """Whether a payload is on disk, and how it is compressed."""
+        for codec in (None, *CODECS.values()):
+            if self.path_of(digest, codec).exists():
+                return True, codec
+        return False, None
+
+    @override
+    def _is_stored(self, digest):
+        if super()._is_stored(digest):
+            return True
+        # e.g., written by an earlier run
+        found, codec = self._find(digest)
+        if found:
+            with self.lock:
+                self.known_digests[digest] = codec
+        return found
+
+    @override
+    def _write(self, digest, payload):
+        # write to a temporary file first so that concurrent writers (and readers)
+        # never see a partially written payload
+        tmp_path = self.directory / f"{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path_of(digest))
+
+    @override
+    def _write_file(self, digest, tmp_path, codec):
+        os.replace(tmp_path, self.path_of(digest, codec))
+
+    @override
+    def make_load(self, parameter, key):
+        codec = self._codec_of(key)
+        # corresponds to with open(pickled_path, "rb") as f: (or gzip.open, etc. if compressed)
+        opener: ast.expr = ast.Name(id="open", ctx=ast.Load())
+        if codec is not None:
+            opener = ast.Attribute(
+                value=ast.parse(codec.module, mode="eval").body,
+                attr="open",
+                ctx=ast.Load(),
+            )
+        return [
+            ast.With(
+                items=[
+                    ast.withitem(
+                        context_expr=ast.Call(
+                            func=opener,
+                            args=[
+                                ast.Constant(value=str(self.path_of(key, codec))),
+                                ast.Constant(value="rb"),
+                            ],
+                            keywords=[],
+                        ),
+                        optional_vars=ast.Name(id="f", ctx=ast.Store()),
+                    )
+                ],
+                body=[
+                    # corresponds to parameter = dill.load(f), which streams from the file
+                    ast.Assign(
+                        targets=[ast.Name(id=parameter, ctx=ast.Store())],
+                        value=ast.Call(
+                            func=ast.Attribute(
+                                value=ast.Name(id="dill", ctx=ast.Load()),
+                                attr="load",
+                                ctx=ast.Load(),
+                            ),
+                            args=[ast.Name(id="f", ctx=ast.Load())],
+                            keywords=[],
+                        ),
+                    )
+                ],
+            )
+        ]
+
+    @override
+    def make_load_imports(self, key):
+        codec = self._codec_of(key)
+        if codec is None:
+            return []
+        return [ast.Import(names=[ast.alias(name=codec.module)])]
+
+    def _codec_of(self, key: str) -> Optional[Codec]:
+        with self.lock:
+            return self.known_digests.get(key)
+
+
+ARCHIVE_NAME = "captures.sqlite"
+
+
+class ArchiveStore(BlobStore):
+    """
+    Stores serialized payloads as rows of a single SQLite archive per directory, keyed by digest,
+    instead of one file per payload. Generated fixtures read them through explotest.runtime.
+    """
+
+    load_imports = [ast.Import(names=[ast.alias(name="explotest.runtime")])]
+
+    def __init__(self, directory: Path):
+        super().__init__(directory)
+        self.path = directory / ARCHIVE_NAME
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self.lock:
+            # each put is committed, so make commits cheap
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            # codec is the name of the compression of the payload, or NULL
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS blobs (key TEXT PRIMARY KEY, payload BLOB NOT NULL, codec TEXT)"
+            )
+            self.connection.commit()
+
+    @override
+    def _write(self, digest, payload):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO blobs (key, payload, codec) VALUES (?, ?, NULL)",
+                (digest, payload),
+            )
+            self.connection.commit()
+
+    @override
+    def _write_file(self, digest, tmp_path, codec):
+        try:
+            with self.lock:
+                # reserve the space, then copy the file into it chunk by chunk
+                cursor = self.connection.execute(
+                    "INSERT OR IGNORE INTO blobs (key, payload, codec) VALUES (?, zeroblob(?), ?)",
+                    (digest, tmp_path.stat().st_size, codec.name if codec else None),
+                )
+                # the row just inserted, if the key was new
+                row = cursor.lastrowid if cursor.rowcount == 1 else None
+                if row is not None:
+                    with (
+                        open(tmp_path, "rb") as src,
+                        self.connection.blobopen("blobs", "payload", row) as dst,
+                    ):
+                        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+                self.connection.commit()
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @override
+    def make_load(self, parameter, key):
+        # corresponds to parameter = explotest.runtime.load_blob(archive_path, key)
+        return [
+            ast.Assign(
+                targets=[ast.Name(id=parameter, ctx=ast.Store())],
+                value=ast.Call(
+                    func=ast.Attribute(
+                        value=ast.Attribute(
+                            value=ast.Name(id="explotest", ctx=ast.Load()),
+                            attr="runtime",
+                            ctx=ast.Load(),
+                        ),
+                        attr="load_blob",
+                        ctx=ast.Load(),
+                    ),
+                    args=[ast.Constant(value=str(self.path)), ast.Constant(value=key)],
+                    keywords=[],
+                ),
+            )
+        ]
+
+
+_known_sidecars: set[Path] = set()
+
+
+def store_sidecar(path: Path, write: Callable[[BinaryIO], None]) -> Path:
+    """
+    Write a raw (not pickled) file that generated tests map or read directly, e.g., a large buffer.
+    path should be content-addressed: if it is already on disk, nothing is written.
+    :param write: Writes the content to the given file
+    """
+    if path in _known_sidecars or path.exists():
+        _known_sidecars.add(path)
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.parent / f"{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    _known_sidecars.add(path)
+    return path
+
+
+_store_types: dict[str, type[BlobStore]] = {
+    "files": ContentAddressedStore,
+    "archive": ArchiveStore,
+}
+_stores: dict[tuple[Path, str], BlobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(directory: Path) -> BlobStore:
+    """The store for directory (of the kind set by config.storage), shared by every reconstructor writing there."""
+    kind = config.storage
+    if kind not in _store_types:
+        raise ValueError(
+            f"[ERROR]: Unknown storage {kind!r}, expected one of {list(_store_types)}."
+        )
+    with _stores_lock:
+        if (directory, kind) not in _stores:
+            _stores[(directory, kind)] = _store_types[kind](directory)
+        return _stores[(directory, kind)]
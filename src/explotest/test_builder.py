@@ -4,6 +4,8 @@ from pathlib import Path
 from typing import Optional, Any, Self
 
 from .autoassert.autoassert import AssertionResult
+from .helpers import is_primitive
+from .meta_fixture import MetaFixture
 from .meta_test import MetaTest
 from .reconstructors.abstract_reconstructor import AbstractReconstructor
 
@@ -12,6 +14,42 @@ def is_inside_package(path: Path) -> bool:
     return (path.parent / "__init__.py").exists()
 
 
+def make_imports(
+    fut_path: Path, package_name: Optional[str]
+) -> list[ast.Import | ast.ImportFrom]:
+    """Imports needed by a generated test for a function-under-test defined in fut_path."""
+    imports: list[ast.Import | ast.ImportFrom] = [
+        ast.Import(names=[ast.alias(name="os")]),
+        ast.Import(names=[ast.alias(name="dill")]),
+        ast.Import(names=[ast.alias(name="pytest")]),
+    ]
+
+    # dynamically handle import depending on if inside as a package or running as script
+    if package_name is not None and package_name != "":
+        # running as module
+        imports.append(
+            ast.ImportFrom(
+                module=package_name,
+                names=[ast.alias(name=fut_path.stem)],
+                level=0,
+            )
+        )
+    elif is_inside_package(fut_path):
+        # running as script inside a package
+        imports.append(
+            ast.ImportFrom(
+                module=".",
+                names=[ast.alias(name=fut_path.stem)],
+                level=0,
+            )
+        )
+    else:
+        # running as script
+        imports.append(ast.Import(names=[ast.alias(name=fut_path.stem)]))
+
+    return imports
+
+
 class TestBuilder:
     """Builder for generated unit tests."""
 
@@ -26,46 +64,27 @@ class TestBuilder:
         self.result.fut_parameters = self.parameters
 
     def build_imports(self, package_name: Optional[str]) -> Self:
-        imports: list[ast.Import | ast.ImportFrom] = [
-            ast.Import(names=[ast.alias(name="os")]),
-            ast.Import(names=[ast.alias(name="dill")]),
-            ast.Import(names=[ast.alias(name="pytest")]),
-        ]
-
-        # dynamically handle import depending on if inside as a package or running as script
-        if package_name is not None and package_name != "":
-            # running as module
-            imports.append(
-                ast.ImportFrom(
-                    module=package_name,
-                    names=[ast.alias(name=self.fut_path.stem)],
-                    level=0,
-                )
-            )
-        elif is_inside_package(self.fut_path):
-            # running as script inside a package
-            imports.append(
-                ast.ImportFrom(
-                    module=".",
-                    names=[ast.alias(name=self.fut_path.stem)],
-                    level=0,
-                )
-            )
-        else:
-            # running as script
-            imports.append(ast.Import(names=[ast.alias(name=self.fut_path.stem)]))
+        return self.use_imports(make_imports(self.fut_path, package_name))
 
-        self.result.imports = imports
+    def use_imports(self, imports: list[ast.Import | ast.ImportFrom]) -> Self:
+        """Use precomputed imports (see make_imports) for the test file."""
+        self.result.imports = list(imports)
         return self
 
     def build_fixtures(self, reconstructor: AbstractReconstructor) -> Self:
         fixtures = []
+        # fixtures of the arguments, by id: an object passed twice is generated once, and passed twice by the test
+        generated: dict[int, MetaFixture] = {}
         for parameter, argument in zip(self.parameters, self.arguments):
+            if id(argument) in generated and not is_primitive(argument):
+                fixtures.append(MetaFixture.alias(parameter, generated[id(argument)]))
+                continue
             new_fixtures = reconstructor.make_fixture(parameter, argument)
             if new_fixtures is None:
                 raise ValueError(
                     f"ExploTest failed to generate fixture for {parameter}."
                 )
+            generated[id(argument)] = new_fixtures
             fixtures.append(new_fixtures)
         self.result.direct_fixtures = fixtures
         return self
@@ -81,14 +100,20 @@ class TestBuilder:
         var_positional_param = None
         var_keyword_param = None
         keyword_only_params = set()
+        # parameters may be left out to take their default (see capture_plan.make_binder):
+        # the positional parameters after one of them must then be passed by keyword
+        present = set(self.parameters)
+        after_missing = False
 
         for param_name, param in signature.parameters.items():
             if param.kind == inspect.Parameter.VAR_POSITIONAL:
                 var_positional_param = param_name
             elif param.kind == inspect.Parameter.VAR_KEYWORD:
                 var_keyword_param = param_name
-            elif param.kind == inspect.Parameter.KEYWORD_ONLY:
+            elif param.kind == inspect.Parameter.KEYWORD_ONLY or after_missing:
                 keyword_only_params.add(param_name)
+            elif param_name not in present:
+                after_missing = True
 
         # Separate parameters into positional args, keyword args, *args, and **kwargs
         positional_args = []
@@ -1,12 +1,24 @@
 import abc
 import ast
+import datetime
+import inspect
 import re
+import threading
+import types
+from dataclasses import dataclass
 
+import dill
 import pandas as pd
 import pytest
 from pytest import fixture
 
-from explotest.reconstructors.argument_reconstructor import ArgumentReconstructor
+from explotest import config
+from explotest.reconstructors.argument_reconstructor import (
+    ArgumentReconstructor,
+    ClassLayout,
+    get_next_attrs,
+    is_opaque,
+)
 from explotest.reconstructors.pickle_reconstructor import PickleReconstructor
 
 
@@ -100,7 +112,7 @@ def test_reconstruct_lambda(setup):
 
     assert mf.depends == []
     assert mf.parameter == "f"
-    pattern = r"with open\(..*\) as f:\s+f = dill\.loads\(f\.read\(\)\)"
+    pattern = r"with open\(..*\) as f:\s+f = dill\.load\(f\)"
     assert re.search(pattern, ast.unparse(mf.body[0]))
 
 
@@ -251,3 +263,301 @@ class TestObjectDetection:
     def test_file(self, tmp_path):
         with open(tmp_path / "test.txt", "w") as f:
             assert not is_reconstructible(f)
+
+    def test_bad_object_on_cycle(self):
+        class Node:
+            def __init__(self, next):
+                self.next = next
+                self.f = None
+
+        n1, n2, n3 = Node(None), Node(None), Node(None)
+        n1.next, n2.next, n3.next = n2, n1, n1
+        n2.f = (i for i in range(3))
+
+        # every node reaches the generator
+        assert not is_reconstructible(n3)
+        assert not is_reconstructible(n1) and not is_reconstructible(n2)
+
+    def test_identity_not_equality(self):
+        class Eq:
+            def __eq__(self, other):
+                raise AssertionError("__eq__ should not be called")
+
+            __hash__ = object.__hash__
+
+        class Pair:
+            def __init__(self, a, b):
+                self.a = a
+                self.b = b
+
+        assert is_reconstructible(Pair(Eq(), Eq()))
+
+    def test_long_chain(self):
+        class Node:
+            def __init__(self, next):
+                self.next = next
+
+        head = None
+        for _ in range(5000):
+            head = Node(head)
+
+        # deeper than the recursion limit
+        assert is_reconstructible(head)
+
+
+def test_reconstruct_shared_object_once(setup):
+    class Leaf:
+        pass
+
+    class Pair:
+        def __init__(self, a, b):
+            self.a = a
+            self.b = b
+
+    leaf = Leaf()
+    mf = setup.make_fixture("p", Pair(leaf, leaf))
+
+    assert mf.depends[0] is mf.depends[1]._real
+
+
+def test_reconstruct_deep_chain(setup):
+    class Node:
+        def __init__(self, value, next):
+            self.value = value
+            self.next = next
+
+    head = None
+    for i in range(5_000):
+        head = Node(i, head)
+
+    # far deeper than the recursion limit
+    mf = setup.make_fixture("head", head)
+    fixtures = mf.make_fixture()
+
+    # one fixture builds the whole chain
+    assert len(fixtures) == 1
+    # names do not grow with the depth
+    assert max(len(f.parameter) for f in mf.topological_order()) < 100
+
+    fut = types.SimpleNamespace(Node=Node)
+    clone = run_fixtures(mf, **{setup.file_path.stem: fut})
+    for i in reversed(range(5_000)):
+        assert clone.value == i
+        clone = clone.next
+    assert clone is None
+
+
+class TestClassLayout:
+    def test_slots(self):
+        class Base:
+            __slots__ = ("x",)
+
+        class Point(Base):
+            __slots__ = ("y", "z")
+
+        p = Point()
+        p.x, p.y = 1, 2
+
+        # z is never assigned
+        assert get_next_attrs(p) == [("x", 1), ("y", 2)]
+
+    def test_slots_and_dict(self):
+        class Base:
+            __slots__ = ("x",)
+
+        class Loose(Base):
+            pass
+
+        o = Loose()
+        o.x, o.y = 1, 2
+
+        assert get_next_attrs(o) == [("x", 1), ("y", 2)]
+
+    def test_properties_and_descriptors_are_excluded(self):
+        class Positive:
+            def __get__(self, obj, objtype=None):
+                return 1
+
+            def __set__(self, obj, value):
+                pass
+
+        class Foo:
+            d = Positive()
+            c = 3
+
+            def __init__(self):
+                self.a = 1
+                self.__dict__["d"] = 2
+                self.f = lambda: None
+
+            @property
+            def p(self):
+                return 1
+
+        assert get_next_attrs(Foo()) == [("a", 1), ("c", 3)]
+
+    def test_instance_shadows_class_attribute(self):
+        class Foo:
+            x = 1
+
+        foo = Foo()
+        foo.x = 2
+
+        assert get_next_attrs(foo) == [("x", 2)]
+
+    def test_dataclass_machinery_is_excluded(self):
+        @dataclass
+        class Foo:
+            x: int
+            y: int = 2
+
+        assert get_next_attrs(Foo(1)) == [("x", 1), ("y", 2)]
+
+    def test_layout_is_computed_once(self):
+        class Foo:
+            x = 1
+
+        assert ClassLayout.of(Foo) is ClassLayout.of(Foo)
+        assert ClassLayout.of(Foo).class_attributes == ("x",)
+
+
+def run_fixtures(mf, **names):
+    """Execute the fixtures of a MetaFixture, with names in scope, and return the value it builds."""
+    scope = {"pytest": pytest, "dill": dill, **names}
+    module = ast.Module(
+        body=mf.required_imports() + mf.make_fixture()[::-1], type_ignores=[]
+    )
+    # like generated tests, go through source code
+    exec(ast.unparse(ast.fix_missing_locations(module)), scope)
+
+    values = {}
+    for fixture in mf.topological_order():
+        # fixtures built by others (see meta_fixture._make_builders) have no function of their own
+        name = f"generate_{fixture.parameter}"
+        if name in scope:
+            generate = scope[name].__wrapped__
+            values[name] = generate(
+                *[values[arg] for arg in inspect.signature(generate).parameters]
+            )
+    return values[f"generate_{mf.parameter}"]
+
+
+class TestCompactCollections:
+    @pytest.fixture(autouse=True)
+    def threshold(self, monkeypatch):
+        monkeypatch.setattr(config, "compact_threshold", 10)
+
+    def test_floats_are_packed(self, setup):
+        values = [i / 3 for i in range(100)]
+
+        mf = setup.make_fixture("x", values)
+
+        assert "read_array" in ast.unparse(mf.body[0])
+        assert len(ast.unparse(mf.body[0])) < 200
+        assert run_fixtures(mf) == values
+
+    def test_int_tuple_is_packed(self, setup):
+        values = tuple(range(-50, 50))
+
+        mf = setup.make_fixture("x", values)
+
+        assert run_fixtures(mf) == values
+
+    def test_huge_ints_and_strings_are_pickled(self, setup):
+        for values in [[2**70 + i for i in range(20)], [str(i) for i in range(20)]]:
+            mf = setup.make_fixture("x", values)
+            assert "dill.load" in ast.unparse(mf.body)
+            assert run_fixtures(mf) == values
+
+    def test_small_or_mixed_collections_are_spelled_out(self, setup):
+        for values in [list(range(5)), [1, "a"] * 10, [True] * 20]:
+            mf = setup.make_fixture("x", values)
+            assert ast.unparse(mf.body[0]) == f"x = {values!r}"
+
+    def test_nested_collections_are_packed(self, setup):
+        class Series:
+            def __init__(self):
+                self.name = "s"
+                self.points = [float(i) for i in range(50)]
+
+        mf = setup.make_fixture("s", [Series(), list(range(50))])
+        series = mf.depends[0]
+
+        assert len(mf.depends) == 2
+        assert "read_array" in ast.unparse(series.depends[0].body[0])
+        assert "read_array" in ast.unparse(mf.depends[1].body[0])
+
+
+class TestHybridReconstruction:
+    class Job:
+        def __init__(self, resource):
+            self.name = "job"
+            self.steps = [TestHybridReconstruction.Step(i) for i in range(3)]
+            self.resource = resource
+
+    class Step:
+        def __init__(self, i):
+            self.i = i
+
+    @pytest.fixture
+    def arr(self, tmp_path):
+        yield ArgumentReconstructor(tmp_path / "fut.py", PickleReconstructor)
+
+    def test_only_the_lock_is_pickled(self, arr, tmp_path):
+        job = self.Job(threading.Lock())
+
+        mf = arr.make_fixture("job", job)
+
+        assert "fut.Job.__new__" in ast.unparse(mf.body[0])
+        assert len(list((tmp_path / "pickled").glob("*.pkl"))) == 1
+
+        fut = types.SimpleNamespace(Job=self.Job, Step=self.Step)
+        rebuilt = run_fixtures(mf, fut=fut)
+        assert [step.i for step in rebuilt.steps] == [0, 1, 2]
+        assert isinstance(rebuilt.resource, type(threading.Lock()))
+
+    def test_file_handle_is_pickled(self, arr, tmp_path):
+        with open(tmp_path / "log.txt", "w") as f:
+            mf = arr.make_fixture("job", self.Job(f))
+
+        assert "fut.Job.__new__" in ast.unparse(mf.body[0])
+        assert len(list((tmp_path / "pickled").glob("*.pkl"))) == 1
+
+    def test_opaque_objects(self):
+        assert is_opaque(threading.Lock())
+        assert is_opaque(datetime.datetime(2024, 1, 1))
+        assert not is_opaque(self.Step(1))
+        assert not is_opaque([threading.Lock()])
+        assert not is_reconstructible(self.Job(threading.Lock()))
+
+
+def test_shared_object_fixture_is_valid(setup):
+    class Leaf:
+        pass
+
+    class Pair:
+        def __init__(self, a, b):
+            self.a = a
+            self.b = b
+
+    leaf = Leaf()
+    mf = setup.make_fixture("p", Pair(leaf, [leaf]))
+
+    fut = types.SimpleNamespace(Leaf=Leaf, Pair=Pair)
+    clone = run_fixtures(mf, **{setup.file_path.stem: fut})
+    assert clone.a is clone.b[0]
+
+
+def test_cycle_is_rebuilt(setup):
+    class Node:
+        def __init__(self, value):
+            self.value = value
+            self.other = None
+
+    a, b = Node(1), Node(2)
+    a.other, b.other = b, a
+    mf = setup.make_fixture("a", a)
+
+    clone = run_fixtures(mf, **{setup.file_path.stem: types.SimpleNamespace(Node=Node)})
+    assert (clone.value, clone.other.value) == (1, 2)
+    assert clone.other.other is clone
@@ -0,0 +1,152 @@
+import array
+import ast
+
+import pytest
+
+from explotest import config
+from explotest.reconstructors.buffer_reconstructor import (
+    BufferReconstructor,
+    is_buffer,
+)
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "buffer_threshold", 16)
+    yield BufferReconstructor(tmp_path / "fut.py")
+
+
+def run_fixture(mf):
+    """Execute the body of a MetaFixture and return the value it builds."""
+    module = ast.fix_missing_locations(ast.Module(body=mf.imports + mf.body))
+    scope = {}
+    exec(compile(module, "<generated>", "exec"), scope)
+    return scope[mf.parameter]
+
+
+def sidecars(tmp_path, suffix):
+    return list((tmp_path / "pickled").glob(f"*{suffix}"))
+
+
+def test_bytearray_round_trip(setup, tmp_path):
+    buffer = bytearray(range(256))
+
+    mf = setup.make_fixture("x", buffer)
+
+    assert "read_bytearray" in ast.unparse(mf.body[0])
+    assert run_fixture(mf) == buffer
+    assert len(sidecars(tmp_path, ".bin")) == 1
+
+
+def test_array_round_trip(setup):
+    buffer = array.array("d", [0.5 * i for i in range(100)])
+
+    loaded = run_fixture(setup.make_fixture("x", buffer))
+
+    assert loaded == buffer
+    assert loaded.typecode == "d"
+
+
+def test_memoryview_is_mapped_copy_on_write(setup, tmp_path):
+    buffer = memoryview(array.array("i", range(64))).cast("B").cast("i", [8, 8])
+
+    loaded = run_fixture(setup.make_fixture("x", buffer))
+    assert loaded.tolist() == buffer.tolist()
+    assert loaded.format == "i"
+
+    loaded[0, 0] = 42
+    (path,) = sidecars(tmp_path, ".bin")
+    assert run_fixture(setup.make_fixture("x", buffer))[0, 0] == 0
+    assert path.read_bytes() == buffer.tobytes()
+
+
+def test_same_buffer_is_written_once(setup, tmp_path):
+    setup.make_fixture("x", bytearray(100))
+    setup.make_fixture("y", bytearray(100))
+    setup.make_fixture("z", bytearray(101))
+
+    assert len(sidecars(tmp_path, ".bin")) == 2
+
+
+def test_small_buffer_is_pickled(setup, tmp_path):
+    mf = setup.make_fixture("x", bytearray(4))
+
+    assert "dill.load" in ast.unparse(mf.body)
+    assert sidecars(tmp_path, ".bin") == []
+
+
+def test_other_objects_are_pickled(setup):
+    mf = setup.make_fixture("x", {1: [object()]})
+
+    assert "dill.load" in ast.unparse(mf.body)
+
+
+def test_is_buffer():
+    assert is_buffer(bytearray())
+    assert is_buffer(array.array("b"))
+    assert is_buffer(memoryview(b"abc"))
+    assert not is_buffer(b"abc")
+    assert not is_buffer([1, 2, 3])
+    # not contiguous
+    assert not is_buffer(memoryview(b"abcdef")[::2])
+
+
+def test_ndarray_is_memory_mapped(setup, tmp_path):
+    numpy = pytest.importorskip("numpy")
+    matrix = numpy.arange(100, dtype=numpy.float32).reshape(10, 10)
+
+    mf = setup.make_fixture("x", matrix)
+    loaded = run_fixture(mf)
+
+    assert isinstance(loaded, numpy.memmap)
+    assert loaded.dtype == matrix.dtype
+    assert (loaded == matrix).all()
+    assert len(sidecars(tmp_path, ".npy")) == 1
+
+    # writes stay in memory
+    loaded[0, 0] = -1
+    assert run_fixture(mf)[0, 0] == 0
+
+
+def test_ndarray_layout_is_part_of_the_key(setup, tmp_path):
+    numpy = pytest.importorskip("numpy")
+    data = numpy.arange(64, dtype=numpy.uint8)
+
+    setup.make_fixture("x", data)
+    setup.make_fixture("y", data.reshape(8, 8))
+    setup.make_fixture("z", data.view(numpy.int64))
+
+    assert len(sidecars(tmp_path, ".npy")) == 3
+
+
+@pytest.mark.parametrize("layout", ["transposed", "strided", "fortran"])
+def test_non_contiguous_ndarray_round_trip(setup, layout):
+    numpy = pytest.importorskip("numpy")
+    square = numpy.arange(100, dtype=numpy.float64).reshape(10, 10)
+    matrix = {
+        "transposed": square.T,
+        "strided": square[:, ::2],
+        "fortran": numpy.asfortranarray(square),
+    }[layout]
+
+    loaded = run_fixture(setup.make_fixture("x", matrix))
+
+    assert (loaded == matrix).all()
+    assert loaded.flags.f_contiguous == matrix.flags.f_contiguous
+
+
+def test_transposed_ndarray_is_not_mistaken_for_the_original(setup, tmp_path):
+    numpy = pytest.importorskip("numpy")
+    square = numpy.arange(64, dtype=numpy.uint8).reshape(8, 8)
+
+    assert (run_fixture(setup.make_fixture("x", square.T)) == square.T).all()
+    assert (run_fixture(setup.make_fixture("y", square)) == square).all()
+    assert len(sidecars(tmp_path, ".npy")) == 2
+
+
+def test_object_ndarray_is_pickled(setup):
+    numpy = pytest.importorskip("numpy")
+    objects = numpy.array([object() for _ in range(10)], dtype=object)
+
+    assert not is_buffer(objects)
+    assert "dill.load" in ast.unparse(setup.make_fixture("x", objects).body)
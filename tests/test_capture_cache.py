@@ -0,0 +1,108 @@
+from explotest import capture_cache, config, serializer
+from explotest.reconstructors import argument_reconstructor
+from explotest.reconstructors.argument_reconstructor import ArgumentReconstructor
+from explotest.storage import ContentAddressedStore, digest_of
+
+
+class Node:
+    def __init__(self, children):
+        self.children = children
+
+
+def counting(monkeypatch, owner, name):
+    """Wrap owner.name so that calls to it are counted."""
+    calls = []
+    original = getattr(owner, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(owner, name, wrapper)
+    return calls
+
+
+def test_memoize_outside_scope_always_computes():
+    calls = []
+    capture_cache.memoize("kind", 1, lambda: calls.append(1))
+    capture_cache.memoize("kind", 1, lambda: calls.append(1))
+
+    assert len(calls) == 2
+    assert capture_cache.lookup("kind", 1) is None
+
+
+def test_memoize_by_identity():
+    a, b = [1], [1]
+    with capture_cache.scope():
+        assert capture_cache.memoize("kind", a, lambda: "a") == "a"
+        assert capture_cache.memoize("kind", a, lambda: "other") == "a"
+        assert capture_cache.memoize("kind", b, lambda: "b") == "b"
+        assert capture_cache.memoize("other kind", a, lambda: "c") == "c"
+        assert capture_cache.lookup("kind", a) == "a"
+    assert capture_cache.lookup("kind", a) is None
+
+
+def test_nested_scopes_share_the_memo():
+    a = object()
+    with capture_cache.scope():
+        capture_cache.memoize("kind", a, lambda: 1)
+        with capture_cache.scope():
+            assert capture_cache.lookup("kind", a) == 1
+        assert capture_cache.lookup("kind", a) == 1
+
+
+def test_exceptions_are_not_memoized():
+    a = object()
+
+    def fail():
+        raise ValueError
+
+    with capture_cache.scope():
+        try:
+            capture_cache.memoize("kind", a, fail)
+        except ValueError:
+            pass
+        assert capture_cache.memoize("kind", a, lambda: 2) == 2
+
+
+def test_value_is_serialized_once(tmp_path, monkeypatch):
+    calls = counting(monkeypatch, serializer, "dump")
+    store = ContentAddressedStore(tmp_path)
+    value = Node([Node([]), Node([])])
+
+    with capture_cache.scope():
+        payload = serializer.dumps(value)
+        key = store.dump(value)
+
+    assert len(calls) == 1
+    assert key == digest_of(payload)
+
+
+def test_only_the_digest_of_large_values_is_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "compression_threshold", 1024)
+    calls = counting(monkeypatch, serializer, "dump")
+    store = ContentAddressedStore(tmp_path)
+    value = list(range(10_000))
+
+    with capture_cache.scope():
+        digest = serializer.pickled(value)
+        key = store.dump(value)
+    with capture_cache.scope():
+        serializer.pickled(value)
+        assert store.dump(value) == key
+
+    assert digest == key == digest_of(serializer.dumps(value))
+    # the store serializes the value again, except once it is stored
+    assert len(calls) == 4
+
+
+def test_graph_is_traversed_once(monkeypatch):
+    calls = counting(monkeypatch, argument_reconstructor, "get_next_attrs")
+    value = Node([Node([]), Node([])])
+
+    with capture_cache.scope():
+        assert ArgumentReconstructor.is_reconstructible(value)
+        assert ArgumentReconstructor.is_reconstructible(value)
+        assert ArgumentReconstructor.is_reconstructible(value.children)
+
+    assert len(calls) == len({id(args[0]) for args in calls})
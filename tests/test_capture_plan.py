@@ -0,0 +1,131 @@
+import inspect
+
+import dill
+
+import pytest
+
+from explotest.capture_plan import CapturePlan, make_binder
+from explotest.helpers import Mode
+from explotest.reconstructors.buffer_reconstructor import BufferReconstructor
+from explotest.reconstructors.pickle_reconstructor import PickleReconstructor
+
+
+def positional(a, b, c=3, d=None):
+    pass
+
+
+def variadic(a, b, c=30, *args, **kwargs):
+    pass
+
+
+def keyword_only(x, /, y, *, bar, baz=6):
+    pass
+
+
+@pytest.mark.parametrize(
+    "func, args, kwargs",
+    [
+        (positional, (1, 2, 3, 4), {}),
+        (positional, (1, 2), {}),
+        (positional, (1,), {"b": 2, "d": 4}),
+        (positional, (), {"d": 4, "a": 1, "b": 2}),
+        (variadic, (1, 2, 3, 4, 5), {"x": 100}),
+        (variadic, (1, 2), {}),
+        (keyword_only, (1, 2), {"bar": 7}),
+    ],
+)
+def test_binder_matches_inspect(func, args, kwargs):
+    sig = inspect.signature(func)
+    expected = sig.bind(*args, **kwargs)
+    expected.apply_defaults()
+
+    bound = make_binder(sig)(args, kwargs)
+
+    assert bound == dict(expected.arguments)
+    assert list(bound) == list(expected.arguments)
+
+
+@pytest.mark.parametrize(
+    "args, kwargs",
+    [
+        ((1,), {}),
+        ((1, 2, 3, 4, 5), {}),
+        ((1, 2), {"a": 1}),
+        ((1, 2), {"e": 5}),
+    ],
+)
+def test_binder_rejects_bad_calls(args, kwargs):
+    with pytest.raises(TypeError):
+        make_binder(inspect.signature(positional))(args, kwargs)
+
+
+TABLE = list(range(100))
+
+
+def with_table(a, table=TABLE, scale=2):
+    pass
+
+
+def with_table_variadic(a, /, table=TABLE, *args, key=TABLE, **kwargs):
+    pass
+
+
+@pytest.mark.parametrize(
+    "func, args, kwargs, expected",
+    [
+        (with_table, (1,), {}, {"a": 1}),
+        (with_table, (1, TABLE, 3), {}, {"a": 1, "scale": 3}),
+        (with_table, (1, list(TABLE)), {}, {"a": 1, "table": TABLE}),
+        (with_table_variadic, (1,), {"x": 2}, {"a": 1, "args": (), "kwargs": {"x": 2}}),
+        # table must be passed by position, before *args
+        (
+            with_table_variadic,
+            (1, TABLE, 3),
+            {},
+            {"a": 1, "table": TABLE, "args": (3,), "kwargs": {}},
+        ),
+    ],
+)
+def test_binder_skips_defaults(func, args, kwargs, expected):
+    bound = make_binder(inspect.signature(func), skip_defaults=True)(args, kwargs)
+
+    assert bound == expected
+    assert list(bound) == list(expected)
+
+
+def test_plan_from_function():
+    plan = CapturePlan.from_function(positional, "p")
+
+    assert plan.fut_name == "positional"
+    assert plan.fut_path.name == "test_capture_plan.py"
+    assert plan.output_dir == plan.fut_path.parent
+    assert plan.mode == Mode.PICKLE
+    assert plan.test_path(2).name == "test_positional_2.py"
+
+
+def test_plan_invalid_mode():
+    with pytest.raises(KeyError):
+        CapturePlan.from_function(positional, "z")
+
+
+def test_plan_reuses_reconstructor(tmp_path):
+    plan = CapturePlan.from_function(positional, "p")
+    plan.fut_path = tmp_path / "fut.py"
+
+    reconstructor = plan.reconstructor
+
+    assert isinstance(reconstructor, BufferReconstructor)
+    assert isinstance(reconstructor.backup_reconstructor, PickleReconstructor)
+    assert plan.reconstructor is reconstructor
+    assert (tmp_path / "pickled").is_dir()
+
+
+def test_plan_pickles_without_reconstructor(tmp_path):
+    plan = CapturePlan.from_function(positional, "p")
+    plan.fut_path = tmp_path / "fut.py"
+    plan.reconstructor
+
+    clone = dill.loads(dill.dumps(plan))
+
+    assert clone._reconstructor is None
+    assert clone.fut_name == plan.fut_name
@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import explotest
+from explotest import config, explore
+
+SRC = Path(__file__).parent.parent / "src"
+
+
+@pytest.fixture
+def disabled():
+    config.set_enabled(False)
+    yield
+    config.set_enabled(True)
+
+
+def foo(x):
+    return x
+
+
+def test_disabled_returns_function(disabled):
+    assert explore(foo) is foo
+    assert explore(mode="a", background=True)(foo) is foo
+
+
+def test_enabled_wraps_function():
+    wrapped = explore(foo)
+    assert wrapped is not foo
+    assert wrapped.__wrapped__ is foo
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, True),
+        ("1", True),
+        ("true", True),
+        ("0", False),
+        ("False", False),
+        ("off", False),
+    ],
+)
+def test_env_flag(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("EXPLOTEST_TEST_FLAG", raising=False)
+    else:
+        monkeypatch.setenv("EXPLOTEST_TEST_FLAG", value)
+    assert config._env_flag("EXPLOTEST_TEST_FLAG", True) is expected
+
+
+def run_python(code: str, **env: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": str(SRC), **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+def test_import_is_lazy():
+    code = "import sys, explotest; print('dill' in sys.modules, 'explotest.pipeline' in sys.modules)"
+    assert run_python(code) == "False False"
+
+
+def test_disabled_by_env_does_not_load_capture_machinery():
+    code = "import sys, explotest\n@explotest.explore\ndef f(): pass\nprint('explotest.capture_plan' in sys.modules)"
+    assert run_python(code, EXPLOTEST_ENABLED="0") == "False"
+    assert run_python(code, EXPLOTEST_ENABLED="1") == "True"
+
+
+def test_lazy_pipeline_attributes():
+    assert callable(explotest.flush)
+    with pytest.raises(AttributeError):
+        explotest.does_not_exist
+
+
+def test_failed_captures_fail_open(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    code = (
+        "import explotest, explotest.pipeline\n"
+        "def fail(job): raise ValueError('no fixture')\n"
+        "explotest.pipeline.CaptureJob.arrange = fail\n"
+        "@explotest.explore\n"
+        "def f(x): return x + 1\n"
+        "print([f(i) for i in range(8)])"
+    )
+    out = run_python(code, EXPLOTEST_MAX_CAPTURE_FAILURES="3").splitlines()
+
+    assert out[-1] == "[1, 2, 3, 4, 5, 6, 7, 8]"
+    # then the circuit breaker stops trying
+    assert sum("ValueError('no fixture')" in line for line in out) == 3
@@ -0,0 +1,132 @@
+import pytest
+
+from explotest import config
+from explotest.autoassert import purity, test_runner
+from explotest.autoassert.autoassert import AssertionGenerator, AssertionToGenerate
+from explotest.autoassert.determinism import DeterminismProfile, Outcome, outcome_of
+from explotest.autoassert.test_runner import ExecutionResult
+from explotest.capture_plan import CapturePlan
+from explotest.pipeline import CaptureJob
+
+
+@pytest.fixture(autouse=True)
+def threshold(monkeypatch):
+    monkeypatch.setattr(config, "determinism_threshold", 3)
+
+
+def f():
+    pass
+
+
+def g():
+    pass
+
+
+@pytest.mark.parametrize(
+    "one, two, outcome",
+    [
+        (None, None, Outcome.EQUAL),
+        ([1, 2], [1, 2], Outcome.EQUAL),
+        ([1, 2], [3, 4], Outcome.SAME_LENGTH),
+        ([1, 2], [3], Outcome.SAME_TYPE),
+        (1, 2, Outcome.SAME_TYPE),
+        (1, "1", Outcome.DIVERGENT),
+        (None, 1, Outcome.DIVERGENT),
+    ],
+)
+def test_outcome_of(one, two, outcome):
+    assert outcome_of(ExecutionResult(one, two)) is outcome
+
+
+def reruns(profile, func, outcomes):
+    """Capture func once per outcome, and return whether each capture reran it."""
+    reran = []
+    for outcome in outcomes:
+        predicted = profile.predict(func)
+        reran.append(predicted is None)
+        if predicted is None:
+            profile.record(outcome)
+        else:
+            assert predicted is outcome
+    return reran
+
+
+def test_reruns_become_rarer():
+    profile = DeterminismProfile()
+
+    reran = reruns(profile, f, [Outcome.EQUAL] * 14)
+
+    # three in a row, then checks 1, 2 and 4 captures apart
+    assert reran == [True] * 3 + [False, True] + [False] * 2 + [True] + [False] * 4 + [
+        True,
+        False,
+    ]
+
+
+def test_disagreeing_check_starts_over():
+    profile = DeterminismProfile()
+    reruns(profile, f, [Outcome.EQUAL] * 4)
+
+    assert reruns(profile, f, [Outcome.SAME_TYPE] * 5) == [True] * 3 + [False, True]
+
+
+def test_new_code_starts_over(monkeypatch):
+    profile = DeterminismProfile()
+    reruns(profile, f, [Outcome.EQUAL] * 3)
+    monkeypatch.setattr(f, "__code__", g.__code__)
+
+    assert profile.predict(f) is None
+
+
+def test_threshold_zero_always_reruns(monkeypatch):
+    monkeypatch.setattr(config, "determinism_threshold", 0)
+    profile = DeterminismProfile()
+
+    assert all(reruns(profile, f, [Outcome.EQUAL] * 10))
+
+
+@pytest.mark.parametrize(
+    "outcome, value, expected",
+    [
+        (Outcome.EQUAL, None, AssertionToGenerate.NULL),
+        (Outcome.EQUAL, [1, 2], AssertionToGenerate.ARR),
+        (Outcome.SAME_LENGTH, [1, 2], AssertionToGenerate.LENGTH),
+        (Outcome.SAME_TYPE, 1, AssertionToGenerate.TYPE),
+        (Outcome.DIVERGENT, 1, AssertionToGenerate.NONE),
+    ],
+)
+def test_assume(outcome, value, expected):
+    ag = AssertionGenerator()
+
+    ag.assume(outcome, value)
+
+    assert ag.assertion_to_generate is expected
+
+
+def add(x, y):
+    return x + y
+
+
+def test_capture_skips_predictable_reruns(tmp_path, monkeypatch):
+    calls = []
+    run_fut_twice = test_runner.run_fut_twice
+
+    def counting(*args):
+        calls.append(args)
+        return run_fut_twice(*args)
+
+    monkeypatch.setattr(test_runner, "run_fut_twice", counting)
+    # add is pure, so it would not be rerun at all
+    monkeypatch.setattr(purity, "analyze", lambda func: purity.UNKNOWN)
+    plan = CapturePlan.from_function(add, "p")
+    plan.fut_path = tmp_path / "fut.py"
+    plan.output_dir = tmp_path
+
+    for depth in range(1, 5):
+        job = CaptureJob(plan, add, (1, 2), {}, depth)
+        job.result = 3
+        job.run()
+
+    assert len(calls) == 3
+    generated = (tmp_path / "test_add_4.py").read_text()
+    assert "assert return_value == saved_return_value" in generated
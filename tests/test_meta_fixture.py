@@ -1,7 +1,11 @@
 import ast
+import inspect
 from typing import cast
 
-from explotest.meta_fixture import MetaFixture
+import pytest
+
+from explotest import config
+from explotest.meta_fixture import MetaFixture, make_fixtures
 
 
 def ast_equal(a: ast.AST, b: ast.AST) -> bool:
@@ -253,3 +257,99 @@ def test_make_fixture_three_linear_dependencies():
     assert result_fixture.args.args[0].arg == "generate_c"
 
 
+
+
+def test_make_fixture_deep_dependencies(monkeypatch):
+    """Test that the depth of the dependencies is not bounded by the recursion limit."""
+    monkeypatch.setattr(config, "inline_threshold", 1_000_000)
+    mf = None
+    for i in range(10_000):
+        body = [ast.parse(f"x{i} = {i}", mode="exec").body[0]]
+        ret = ast.Return(value=ast.Name(id=f"x{i}", ctx=ast.Load()))
+        mf = MetaFixture(depends=[mf] if mf else [], parameter=f"x{i}", body=body, ret=ret)
+
+    generated_list = mf.make_fixture()
+
+    assert [f.name for f in generated_list] == [f"generate_x{i}" for i in reversed(range(10_000))]
+
+
+def test_topological_order_diamond_dependency():
+    """Test that each fixture comes once, after all of its dependencies."""
+    ret = ast.Return(value=ast.Constant(value=None))
+    base = MetaFixture(depends=[], parameter="base", body=[], ret=ret)
+    left = MetaFixture(depends=[base], parameter="left", body=[], ret=ret)
+    right = MetaFixture(depends=[base], parameter="right", body=[], ret=ret)
+    top = MetaFixture(depends=[left, right], parameter="top", body=[], ret=ret)
+
+    order = [f.parameter for f in top.topological_order()]
+
+    assert sorted(order) == ["base", "left", "right", "top"]
+    assert order.index("base") < order.index("left") < order.index("top")
+    assert order.index("base") < order.index("right") < order.index("top")
+
+
+def test_make_fixtures_builds_dependencies_in_one_fixture(monkeypatch):
+    """Test that, in large graphs, each fixture builds the dependencies that only it needs."""
+    monkeypatch.setattr(config, "inline_threshold", 0)
+    base = MetaFixture([], "base", [ast.parse("b = 1").body[0]], ast.Return(ast.Name("b")))
+    left = MetaFixture([base], "left", [], ast.Return(ast.parse("generate_base + 1").body[0].value))
+    right = MetaFixture([base], "right", [], ast.Return(ast.parse("generate_base + 2").body[0].value))
+    top = MetaFixture([left, right], "top", [], ast.Return(ast.parse("generate_left * generate_right").body[0].value))
+    other = MetaFixture([base], "other", [], ast.Return(ast.Name("generate_base")))
+
+    generated_list = make_fixtures([top, other])
+
+    # base is shared by top and other, so it is a fixture of its own
+    assert [f.name for f in generated_list] == ["generate_top", "generate_other", "generate_base"]
+    assert [a.arg for a in generated_list[0].args.args] == ["generate_base"]
+    scope = {"pytest": pytest}
+    exec(ast.unparse(ast.Module(body=generated_list, type_ignores=[])), scope)
+    assert scope["generate_top"].__wrapped__(1) == 6
+
+
+def test_make_fixtures_cycle():
+    """Test that statements on a cycle wait until the fixture they use is built."""
+    a = MetaFixture(
+        [], "a", ast.parse("a = {}\nsetitem(a, 'b', generate_b)").body, ast.Return(ast.Name("a"))
+    )
+    b = MetaFixture(
+        [a], "b", ast.parse("b = {}\nsetitem(b, 'a', generate_a)").body, ast.Return(ast.Name("b"))
+    )
+    a.depends.append(b)
+
+    generated_list = make_fixtures([a])
+
+    assert len(generated_list) == 1
+    scope = {"pytest": pytest, "setitem": dict.__setitem__}
+    exec(ast.unparse(ast.Module(body=generated_list, type_ignores=[])), scope)
+    clone = scope["generate_a"].__wrapped__()
+    assert clone["b"]["a"] is clone
+
+
+def test_make_fixtures_cycle_across_arguments():
+    """Test that a cycle two arguments are on is built once, by a fixture both of them request."""
+    a = MetaFixture(
+        [], "a", ast.parse("a = {}\nsetitem(a, 'peer', generate_a_peer)").body, ast.Return(ast.Name("a"))
+    )
+    a_peer = MetaFixture(
+        [a], "a_peer", ast.parse("b = {}\nsetitem(b, 'peer', generate_a)").body, ast.Return(ast.Name("b"))
+    )
+    a.depends.append(a_peer)
+    b = MetaFixture.alias("b", a_peer)
+
+    generated_list = make_fixtures([a, b])
+
+    scope = {"pytest": pytest, "setitem": dict.__setitem__}
+    exec(ast.unparse(ast.Module(body=generated_list, type_ignores=[])), scope)
+    values = {}
+
+    def request(name):
+        # like pytest: each fixture once, with the fixtures it names as arguments
+        if name not in values:
+            generate = scope[name].__wrapped__
+            values[name] = generate(*map(request, inspect.signature(generate).parameters))
+        return values[name]
+
+    clone_a, clone_b = request("generate_a"), request("generate_b")
+    assert clone_a["peer"] is clone_b
+    assert clone_b["peer"] is clone_a
@@ -256,8 +256,55 @@ def test_meta_test_with_fixture_dependencies():
     generated = mt.make_test()
     assert generated is not None
     assert isinstance(generated, ast.Module)
-    # Should have import + fixture_x (which includes base) + test function
-    # fixture_x.make_fixture() returns [fixture_x, base_fixture]
-    assert len(generated.body) == 3  # import + [fixture_x, base_fixture] + test function
+    # Should have import + fixture_x + base_fixture + test function
+    assert len(generated.body) == 4
 
 
+
+
+def test_meta_test_fixture_imports():
+    extra = ast.Import([ast.alias("explotest.runtime")])
+    dep = MetaFixture(
+        [], "y", [ast.parse("y = 1").body[0]], ast.Return(ast.Name("y")), [extra]
+    )
+    fixture_x = MetaFixture(
+        [dep], "x", [ast.parse("x = y").body[0]], ast.Return(ast.Name("x")), [extra]
+    )
+
+    mt = MetaTest()
+    mt.fut_name = "fut"
+    mt.fut_parameters = ["x"]
+    mt.imports = [ast.Import([ast.alias("bar")])]
+    mt.direct_fixtures = [fixture_x]
+    mt.act_phase = ast.parse("return_value = foo(x)").body[0]
+    mt.asserts = []
+
+    generated = ast.unparse(mt.make_test())
+    assert generated.startswith("import bar\nimport explotest.runtime\n")
+    assert generated.count("import explotest.runtime") == 1
+
+
+def test_meta_test_shared_fixtures_are_generated_once():
+    base = MetaFixture(
+        [], "base", [ast.parse("base = []").body[0]], ast.Return(ast.Name("base"))
+    )
+    fixture_x = MetaFixture(
+        [base], "x", [ast.parse("x = [generate_base]").body[0]], ast.Return(ast.Name("x"))
+    )
+    fixture_y = MetaFixture(
+        [base], "y", [ast.parse("y = [generate_base]").body[0]], ast.Return(ast.Name("y"))
+    )
+
+    mt = MetaTest()
+    mt.fut_name = "foo"
+    mt.fut_parameters = ["x", "y"]
+    mt.imports = [ast.Import([ast.alias("pytest")])]
+    mt.direct_fixtures = [fixture_x, fixture_y]
+    mt.act_phase = ast.parse("return_value = foo(x, y)").body[0]
+    mt.asserts = []
+
+    names = [
+        node.name for node in mt.make_test().body if isinstance(node, ast.FunctionDef)
+    ]
+
+    assert names == ["generate_x", "generate_y", "generate_base", "test_foo"]
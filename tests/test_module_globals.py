@@ -0,0 +1,147 @@
+import ast
+import copy
+import sys
+import textwrap
+
+import dill
+import pytest
+
+from explotest import capture_cache, config, module_globals
+from explotest.reconstructors.pickle_reconstructor import PickleReconstructor
+from explotest.reconstructors.type_handlers import ExpressionWriter
+
+
+class Registry:
+    def __init__(self):
+        self.entries = {}
+
+
+REGISTRY = Registry()
+_ALIAS = REGISTRY
+NUMBER = 1000
+PAIR = (1, 2)
+
+
+@pytest.fixture
+def by_reference(monkeypatch):
+    monkeypatch.setattr(config, "by_reference", True)
+
+
+def test_find_global(by_reference):
+    assert module_globals.find(REGISTRY) == (__name__, "REGISTRY")
+    assert module_globals.find(Registry) == (__name__, "Registry")
+
+
+def test_other_objects_are_not_found(by_reference):
+    assert module_globals.find(Registry()) is None
+    assert module_globals.find(NUMBER) is None
+    assert module_globals.find(PAIR) is None
+
+
+def test_library_globals_are_not_found(by_reference):
+    assert module_globals.find(ast.Load) is None
+
+
+def test_rebound_globals_are_not_found(by_reference, monkeypatch):
+    with capture_cache.scope():
+        assert module_globals.find(REGISTRY) is not None
+        monkeypatch.setattr(sys.modules[__name__], "REGISTRY", Registry())
+        monkeypatch.setattr(sys.modules[__name__], "_ALIAS", Registry())
+        assert module_globals.find(REGISTRY) is None
+
+
+def test_disabled_by_default():
+    assert module_globals.find(REGISTRY) is None
+
+
+def test_globals_mutated_after_import_are_copied(tmp_path, monkeypatch):
+    # a test importing the module would get an empty registry
+    monkeypatch.setattr(REGISTRY, "entries", {"a": 1})
+    reconstructor = PickleReconstructor(tmp_path / "fut.py")
+
+    mf = reconstructor.make_fixture("r", REGISTRY)
+
+    assert "REGISTRY" not in ast.unparse(mf.body[0])
+    (payload,) = [p for p in tmp_path.rglob("*") if p.is_file()]
+    assert dill.loads(payload.read_bytes()).entries == {"a": 1}
+
+
+def test_import_time_names(tmp_path):
+    path = tmp_path / "program.py"
+    path.write_text(textwrap.dedent("""
+        import os.path
+        from typing import List as L
+        CONFIG = object()
+        a, (b, c) = 1, (2, 3)
+        MODEL = None
+
+        def load():
+            global MODEL
+            MODEL = object()
+
+        class Job:
+            pass
+
+        try:
+            import numpy
+        except ImportError:
+            FALLBACK = True
+
+        if __name__ == "__main__":
+            x = Job()
+        else:
+            y = Job()
+        """))
+
+    assert module_globals._import_time_names(str(path)) == {
+        "os",
+        "L",
+        "CONFIG",
+        "a",
+        "b",
+        "c",
+        "load",
+        "Job",
+        "numpy",
+        "FALLBACK",
+        "y",
+    }
+
+
+def test_main_globals_are_only_found_for_the_fut_module(by_reference, monkeypatch):
+    main = sys.modules["__main__"]
+    monkeypatch.setattr(main, "__file__", __file__, raising=False)
+    monkeypatch.setattr(main, "REGISTRY", REGISTRY, raising=False)
+    stem = __name__.rsplit(".", 1)[-1]
+
+    with capture_cache.scope():
+        assert module_globals.importable_name("__main__") is None
+        with module_globals.capturing(stem):
+            assert module_globals.importable_name("__main__") == stem
+            assert module_globals.find(REGISTRY) == ("__main__", "REGISTRY")
+        assert module_globals.find(REGISTRY) == (__name__, "REGISTRY")
+
+
+def test_expression_refers_to_global(by_reference):
+    writer = ExpressionWriter("fut")
+
+    assert ast.unparse(writer.expression(REGISTRY)) == f"{__name__}.REGISTRY"
+    assert [ast.unparse(i) for i in writer.imports] == [f"import {__name__}"]
+
+
+def test_pickle_mode_refers_to_global(by_reference, tmp_path):
+    reconstructor = PickleReconstructor(tmp_path / "fut.py")
+
+    mf = reconstructor.make_fixture("r", REGISTRY)
+
+    assert ast.unparse(mf.body[0]) == f"r = {__name__}.REGISTRY"
+    assert not [p for p in tmp_path.rglob("*") if p.is_file()]
+
+
+def test_deepcopy_memo_keeps_globals(by_reference):
+    args = ([REGISTRY], Registry())
+
+    copied = copy.deepcopy(args, module_globals.deepcopy_memo())
+
+    assert copied[0] is not args[0] and copied[0][0] is REGISTRY
+    assert copied[1] is not args[1]
@@ -1,8 +1,10 @@
 import ast
+import builtins
 import re
 
 from pytest import fixture
 
+from explotest import config
 from explotest.reconstructors.pickle_reconstructor import PickleReconstructor
 
 
@@ -54,7 +56,7 @@ def test_pickle_reconstructor_object(setup):
     mf = setup.make_fixture("f", Foo())
     assert mf.parameter == "f"
     assert mf.depends == []
-    pattern = r"with open\(..*\) as f:\s+f = dill\.loads\(f\.read\(\)\)"
+    pattern = r"with open\(..*\) as f:\s+f = dill\.load\(f\)"
     assert re.search(pattern, ast.unparse(mf.body[0]))
     assert ast.dump(mf.ret) == ast.dump(ast.Return(
         value=ast.Name(id="f", ctx=ast.Load())
@@ -66,8 +68,54 @@ def test_pickle_reconstructor_lambda(setup):
     mf = setup.make_fixture("f", lambda x: x)
     assert mf.parameter == "f"
     assert mf.depends == []
-    pattern = r"with open\(..*\) as f:\s+f = dill\.loads\(f\.read\(\)\)"
+    pattern = r"with open\(..*\) as f:\s+f = dill\.load\(f\)"
     assert re.search(pattern, ast.unparse(mf.body[0]))
     assert ast.dump(mf.ret) == ast.dump(ast.Return(
         value=ast.Name(id="f", ctx=ast.Load())
     ))
+
+
+def pickled_path_of(mf):
+    return ast.unparse(mf.body[0]).split("'")[1]
+
+
+def test_pickle_reconstructor_deduplicates(setup, tmp_path):
+    class Foo:
+        pass
+
+    foo = Foo()
+    paths = {pickled_path_of(setup.make_fixture(f"f{i}", foo)) for i in range(10)}
+
+    assert len(paths) == 1
+    assert len(list((tmp_path.parent / "pickled").glob("*.pkl"))) >= 1
+
+
+class Point:
+    def __init__(self, x):
+        self.x = x
+
+
+def test_pickle_reconstructor_distinct_payloads(setup):
+    assert pickled_path_of(setup.make_fixture("p", Point(1))) != pickled_path_of(
+        setup.make_fixture("p", Point(2))
+    )
+
+
+def test_known_digest_skips_write(setup, mocker):
+    setup.make_fixture("p", Point(3))
+    spy = mocker.spy(builtins, "open")
+    setup.make_fixture("q", Point(3))
+    spy.assert_not_called()
+
+
+def test_pickle_reconstructor_packs_large_lists(setup, monkeypatch):
+    monkeypatch.setattr(config, "compact_threshold", 10)
+    values = list(range(1000))
+
+    mf = setup.make_fixture("x", values)
+
+    code = ast.unparse(mf.body[0])
+    assert "explotest.runtime.read_array" in code and code.endswith(".tolist()")
+    scope = {}
+    exec(ast.unparse(mf.imports + mf.body), scope)
+    assert scope["x"] == values
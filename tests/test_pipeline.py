@@ -0,0 +1,347 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from explotest import config
+from explotest.autoassert import test_runner
+from explotest.autoassert.test_runner import (
+    ExecutionResult,
+    RerunTimeout,
+    run_fut_twice,
+    run_fut_twice_forked,
+)
+from explotest.capture_plan import CapturePlan
+from explotest.helpers import is_running_under_test
+from explotest.pipeline import Backpressure, CaptureJob, CapturePipeline
+
+
+class FakePlan:
+    fut_name = "fake"
+
+
+class FakeJob:
+    """Records when it runs; optionally waits for an event first."""
+
+    plan = FakePlan()
+
+    def __init__(self, name, log, gate=None, started=None):
+        self.name = name
+        self.log = log
+        self.gate = gate
+        self.started = started
+
+    def run(self):
+        if self.started:
+            self.started.set()
+        if self.gate:
+            self.gate.wait()
+        self.log.append(self.name)
+
+
+def blocked_pipeline(backpressure, log):
+    """A pipeline of size 1 whose worker is stuck on a job until the returned event is set."""
+    pipeline = CapturePipeline(maxsize=1, backpressure=backpressure)
+    gate, started = threading.Event(), threading.Event()
+    pipeline.submit(FakeJob("blocker", log, gate, started))
+    started.wait()
+    return pipeline, gate
+
+
+def test_jobs_run_in_order():
+    log = []
+    pipeline = CapturePipeline()
+    for i in range(10):
+        assert pipeline.submit(FakeJob(i, log))
+    assert pipeline.flush(timeout=5)
+    assert log == list(range(10))
+
+
+def test_drop_newest():
+    log = []
+    pipeline, gate = blocked_pipeline(Backpressure.DROP_NEWEST, log)
+
+    assert pipeline.submit(FakeJob("a", log))
+    assert not pipeline.submit(FakeJob("b", log))
+
+    gate.set()
+    assert pipeline.flush(timeout=5)
+    assert log == ["blocker", "a"]
+    assert pipeline.dropped == 1
+
+
+def test_drop_oldest():
+    log = []
+    pipeline, gate = blocked_pipeline(Backpressure.DROP_OLDEST, log)
+
+    assert pipeline.submit(FakeJob("a", log))
+    assert pipeline.submit(FakeJob("b", log))
+
+    gate.set()
+    assert pipeline.flush(timeout=5)
+    assert log == ["blocker", "b"]
+    assert pipeline.dropped == 1
+
+
+def test_block():
+    log = []
+    pipeline, gate = blocked_pipeline(Backpressure.BLOCK, log)
+    pipeline.submit(FakeJob("a", log))
+
+    submitter = threading.Thread(target=pipeline.submit, args=(FakeJob("b", log),))
+    submitter.start()
+    submitter.join(timeout=0.2)
+    assert submitter.is_alive()
+
+    gate.set()
+    submitter.join(timeout=5)
+    assert pipeline.flush(timeout=5)
+    assert log == ["blocker", "a", "b"]
+
+
+def test_flush_timeout():
+    pipeline, gate = blocked_pipeline(Backpressure.BLOCK, [])
+    assert not pipeline.flush(timeout=0.05)
+    gate.set()
+    assert pipeline.flush(timeout=5)
+
+
+def test_failing_job_does_not_stop_worker(capsys):
+    class FailingJob(FakeJob):
+        def run(self):
+            raise ValueError("boom")
+
+    log = []
+    pipeline = CapturePipeline()
+    pipeline.submit(FailingJob("bad", log))
+    pipeline.submit(FakeJob("good", log))
+
+    assert pipeline.flush(timeout=5)
+    assert log == ["good"]
+    assert "boom" in capsys.readouterr().out
+
+
+def add(x, y):
+    return x + y
+
+
+@pytest.fixture
+def plan(tmp_path):
+    plan = CapturePlan.from_function(add, "p")
+    plan.fut_path = tmp_path / "fut.py"
+    plan.output_dir = tmp_path
+    return plan
+
+
+def test_capture_job_writes_test(plan, tmp_path):
+    job = CaptureJob(plan, add, (1, 2), {}, depth=1).snapshot()
+    job.result = 3
+    job.run()
+
+    generated = (tmp_path / "test_add_1.py").read_text()
+    assert "return_value = fut.add(x, y)" in generated
+    assert "assert return_value == saved_return_value" in generated
+
+
+def test_snapshot_copies_arguments(plan):
+    arg = [1, 2]
+    job = CaptureJob(plan, add, (arg, [3]), {}, depth=1).snapshot()
+    arg.append(4)
+
+    assert job.args == ([1, 2], [3])
+    assert job.test_builder is None
+
+
+def test_snapshot_falls_back_to_arranging(plan):
+    lock = threading.Lock()
+    job = CaptureJob(plan, add, (lock, 1), {}, depth=1).snapshot()
+
+    assert job.args[0] is lock
+    assert job.test_builder is not None
+
+
+def test_rerun_only_silences_own_thread(capsys):
+    printed_elsewhere = threading.Event()
+
+    def noisy():
+        print("from rerun")
+        other = threading.Thread(target=lambda: print("from other thread"))
+        other.start()
+        other.join()
+        printed_elsewhere.set()
+        return is_running_under_test()
+
+    stdout = sys.stdout
+    result = run_fut_twice(noisy, (), {})
+
+    out = capsys.readouterr().out
+    assert "from rerun" not in out
+    assert "from other thread" in out
+    assert result is not None and result.result_from_run_one
+    assert printed_elsewhere.is_set()
+    assert sys.stdout is stdout
+
+
+TABLE = {"a": 1}
+
+
+def lookup(key, table=TABLE, default=None):
+    return table.get(key, default)
+
+
+def test_capture_job_skips_defaults(tmp_path):
+    plan = CapturePlan.from_function(lookup, "p", skip_defaults=True)
+    plan.fut_path = tmp_path / "fut.py"
+    plan.output_dir = tmp_path
+    job = CaptureJob(plan, lookup, ("b",), {"default": 0}, depth=1).snapshot()
+    job.result = 0
+    job.run()
+
+    generated = (tmp_path / "test_lookup_1.py").read_text()
+    assert "return_value = fut.lookup(key, default=default)" in generated
+    assert "generate_table" not in generated
+
+
+fork_only = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+calls = []
+
+
+def append_call(x):
+    calls.append(x)
+    print("side effect")
+    return [x, len(calls)]
+
+
+@fork_only
+def test_forked_reruns_leave_no_side_effects(capfd):
+    calls.clear()
+
+    result = run_fut_twice_forked(append_call, (1,), {})
+
+    assert result == ExecutionResult([1, 1], [1, 1])
+    assert calls == []
+    assert "side effect" not in capfd.readouterr().out
+
+
+@fork_only
+def test_forked_reruns_fail_like_inline_reruns():
+    def fail():
+        raise ValueError
+
+    def unserializable():
+        return (i for i in range(3))
+
+    assert run_fut_twice_forked(fail, (), {}) is None
+    assert run_fut_twice_forked(unserializable, (), {}) is None
+
+
+@fork_only
+def test_rerun_isolation_setting(monkeypatch):
+    calls.clear()
+    monkeypatch.setattr(config, "rerun_isolation", "fork")
+    # the workers of the pipelines of other tests are still running
+    monkeypatch.setattr(threading, "active_count", lambda: 1)
+
+    assert run_fut_twice(append_call, (2,), {}) is not None
+    assert calls == []
+
+
+def slow_call(seconds):
+    calls.append(seconds)
+    time.sleep(seconds)
+    return seconds
+
+
+def test_inline_reruns_past_budget_are_cancelled():
+    calls.clear()
+
+    with pytest.raises(RerunTimeout):
+        run_fut_twice(slow_call, (0.05,), {}, budget=0.05)
+    assert calls == [0.05]
+
+
+@fork_only
+def test_forked_reruns_past_budget_are_killed():
+    start = time.monotonic()
+
+    with pytest.raises(RerunTimeout):
+        run_fut_twice_forked(slow_call, (10,), {}, budget=0.1)
+    assert time.monotonic() - start < 5
+
+
+@fork_only
+def test_forked_reruns_are_killed_without_budget(monkeypatch):
+    monkeypatch.setattr(config, "fork_rerun_timeout", 0.1)
+    start = time.monotonic()
+
+    with pytest.raises(RerunTimeout):
+        run_fut_twice_forked(slow_call, (10,), {})
+    assert time.monotonic() - start < 5
+
+
+@fork_only
+def test_reruns_are_not_forked_while_other_threads_run(monkeypatch):
+    monkeypatch.setattr(config, "rerun_isolation", "fork")
+    lock = threading.Lock()
+    held, release = threading.Event(), threading.Event()
+
+    def hold():
+        with lock:
+            held.set()
+            release.wait()
+
+    def locked_call():
+        # a forked child would wait for its copy of the lock forever
+        with lock:
+            return os.getpid()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait()
+    try:
+        assert not test_runner.isolates_reruns()
+        threading.Timer(0.1, release.set).start()
+        result = run_fut_twice(locked_call, (), {})
+    finally:
+        release.set()
+        thread.join()
+
+    assert result == ExecutionResult(os.getpid(), os.getpid())
+
+
+def test_slow_calls_are_not_rerun(tmp_path, monkeypatch):
+    plan = CapturePlan.from_function(slow_call, "p", rerun_budget=1)
+    plan.fut_path = tmp_path / "fut.py"
+    plan.output_dir = tmp_path
+    monkeypatch.setattr(test_runner, "run_fut_twice", None)
+
+    job = CaptureJob(plan, slow_call, (0.6,), {}, depth=1, result=0.6, duration=0.6)
+    job.run()
+
+    generated = (tmp_path / "test_slow_call_1.py").read_text()
+    assert "type(return_value).__name__ == 'float'" in generated
+
+
+def test_rerun_budget_of_plan_overrides_setting(plan, monkeypatch):
+    monkeypatch.setattr(config, "rerun_budget", 5)
+    job = CaptureJob(plan, add, (1, 2), {}, depth=1)
+
+    assert job.rerun_budget() == 5
+    plan.rerun_budget = 1
+    assert job.rerun_budget() == 1
+
+
+def test_forked_reruns_get_a_budget_from_the_call(plan, monkeypatch):
+    monkeypatch.setattr(config, "rerun_budget", None)
+    monkeypatch.setattr(config, "fork_rerun_timeout", 60)
+    monkeypatch.setattr(test_runner, "isolates_reruns", lambda: True)
+
+    assert CaptureJob(plan, add, (1, 2), {}, depth=1).rerun_budget() is None
+    assert CaptureJob(plan, add, (1, 2), {}, depth=1, duration=2).rerun_budget() == 20
+    assert CaptureJob(plan, add, (1, 2), {}, depth=1, duration=0).rerun_budget() == 1
+    assert CaptureJob(plan, add, (1, 2), {}, depth=1, duration=30).rerun_budget() == 60
+
+    monkeypatch.setattr(test_runner, "isolates_reruns", lambda: False)
+    assert CaptureJob(plan, add, (1, 2), {}, depth=1, duration=2).rerun_budget() is None
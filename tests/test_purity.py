@@ -0,0 +1,233 @@
+import datetime
+import itertools
+import os
+from random import randint, random
+from time import perf_counter
+
+import pytest
+
+from explotest import config
+from explotest.autoassert import purity, test_runner
+from explotest.autoassert.purity import Purity, analyze
+from explotest.capture_plan import CapturePlan
+from explotest.pipeline import CaptureJob
+
+CACHE = {}
+COUNT = 0
+
+
+def pure(xs, offset=0):
+    out = []
+    for x in xs:
+        out.append(x + offset)
+    return sorted(out) + [os.path.join("a", "b")]
+
+
+def reads_environment():
+    return os.environ.get("HOME")
+
+
+def reads_clock():
+    return perf_counter()
+
+
+def today():
+    return datetime.datetime.now().date()
+
+
+def rolls():
+    return randint(1, 6)
+
+
+def jitters(x):
+    return x + random()
+
+
+TICKETS = itertools.count()
+
+
+def ticket():
+    return next(TICKETS)
+
+
+def elapsed():
+    return os.times().elapsed
+
+
+def next_value(obj):
+    return obj.next_value()
+
+
+def calls_next_value(obj):
+    return next_value(obj) + 1
+
+
+def prints(x):
+    print(x)
+    return x
+
+
+def reads_file(f):
+    return f.read()
+
+
+def calls_reads_clock():
+    return reads_clock() + 1
+
+
+def caches(key):
+    CACHE[key] = len(CACHE)
+    return CACHE[key]
+
+
+def counts():
+    global COUNT
+    COUNT += 1
+    return COUNT
+
+
+def appends(xs):
+    xs.append(1)
+    return xs
+
+
+class Counter:
+    def __init__(self):
+        self.n = 0
+
+    def increment(self):
+        self.n += 1
+        return self.n
+
+
+@pytest.mark.parametrize(
+    "func, expected",
+    [
+        (pure, Purity.PURE),
+        (reads_environment, Purity.IO),
+        (reads_clock, Purity.IO),
+        (today, Purity.IO),
+        (rolls, Purity.IO),
+        (jitters, Purity.IO),
+        (prints, Purity.IO),
+        (reads_file, Purity.IO),
+        (calls_reads_clock, Purity.IO),
+        (caches, Purity.MUTATES_GLOBALS),
+        (counts, Purity.MUTATES_GLOBALS),
+        (appends, Purity.MUTATES_ARGUMENTS),
+        (Counter.increment, Purity.MUTATES_ARGUMENTS),
+        (Counter, Purity.UNKNOWN),
+        (ticket, Purity.UNKNOWN),
+        (elapsed, Purity.UNKNOWN),
+        (next_value, Purity.UNKNOWN),
+        (calls_next_value, Purity.UNKNOWN),
+        (lambda x: x, Purity.UNKNOWN),
+    ],
+)
+def test_analyze(func, expected):
+    assert analyze(func).purity is expected
+
+
+def test_analysis_names_what_is_touched():
+    assert analyze(reads_clock).io == {"time.perf_counter"}
+    assert analyze(calls_reads_clock).io == {"time.perf_counter"}
+    assert analyze(caches).globals_written == {"CACHE"}
+    assert analyze(Counter.increment).arguments_written == {"self"}
+    assert analyze(jitters).io == {"random.Random.random"}
+    assert analyze(ticket).unresolved == {"next"}
+    assert analyze(calls_next_value).unresolved == {".next_value"}
+
+
+def test_numpy_random_is_io():
+    np = pytest.importorskip("numpy")
+
+    def noise():
+        return float(np.random.rand())
+
+    assert analyze(noise).purity is Purity.IO
+
+
+def test_analysis_is_cached_per_code_object(monkeypatch):
+    analyze(pure)
+    monkeypatch.setattr(purity, "_analyze", None)
+
+    assert analyze(pure).purity is Purity.PURE
+
+
+def test_failed_analysis_is_unknown(monkeypatch):
+    def fails(*args):
+        raise RecursionError
+
+    def unseen():
+        return 1
+
+    monkeypatch.setattr(purity, "_analyze", fails)
+
+    assert analyze(unseen) is purity.UNKNOWN
+
+
+@pytest.fixture
+def capture(tmp_path, monkeypatch):
+    calls = []
+    run_fut_twice = test_runner.run_fut_twice
+
+    def counting(*args):
+        calls.append(args)
+        return run_fut_twice(*args)
+
+    monkeypatch.setattr(test_runner, "run_fut_twice", counting)
+
+    def capture(func, *args):
+        plan = CapturePlan.from_function(func, "p")
+        plan.fut_path = tmp_path / "fut.py"
+        plan.output_dir = tmp_path
+        job = CaptureJob(plan, func, args, {}, 1)
+        job.result = func(*args)
+        job.run()
+        return (tmp_path / f"test_{func.__name__}_1.py").read_text()
+
+    capture.calls = calls
+    return capture
+
+
+def test_pure_functions_are_rerun_by_default(capture, monkeypatch):
+    monkeypatch.setattr(purity, "analyze", None)
+    capture(pure, [2, 1], 1)
+
+    assert len(capture.calls) == 1
+
+
+def test_pure_functions_are_not_rerun_when_enabled(capture, monkeypatch):
+    monkeypatch.setattr(config, "skip_pure_reruns", True)
+
+    generated = capture(pure, [2, 1], 1)
+
+    assert capture.calls == []
+    assert "assert return_value == saved_return_value" in generated
+
+
+def adder(n):
+    return lambda x: x + n
+
+
+def test_pure_functions_returning_objects_are_rerun(capture, monkeypatch):
+    monkeypatch.setattr(config, "skip_pure_reruns", True)
+    capture(adder, 1)
+
+    assert len(capture.calls) == 1
+
+
+def test_side_effects_are_rerun_by_default(capture):
+    capture(caches, "a")
+
+    assert len(capture.calls) == 1
+
+
+def test_side_effects_are_not_rerun_when_disabled(capture, monkeypatch):
+    monkeypatch.setattr(config, "rerun_side_effects", False)
+    monkeypatch.setattr(config, "rerun_isolation", "inline")
+
+    generated = capture(caches, "b")
+
+    assert capture.calls == []
+    assert "type(return_value).__name__ == 'int'" in generated
@@ -0,0 +1,156 @@
+import pytest
+
+from explotest.sampling import (
+    AllOf,
+    Always,
+    CircuitBreaker,
+    FirstN,
+    OverheadBudget,
+    Percentage,
+    RateLimit,
+    UniqueArguments,
+    fingerprint,
+)
+
+
+def captured(policy, calls):
+    return [policy.should_capture(args, kwargs) for args, kwargs in calls]
+
+
+def test_always():
+    assert captured(Always(), [((1,), {})] * 3) == [True, True, True]
+
+
+def test_first_n():
+    assert captured(FirstN(2), [((i,), {}) for i in range(4)]) == [
+        True,
+        True,
+        False,
+        False,
+    ]
+
+
+@pytest.mark.parametrize("percent, expected", [(0, 0), (100, 1000)])
+def test_percentage_bounds(percent, expected):
+    assert sum(captured(Percentage(percent), [((), {})] * 1000)) == expected
+
+
+def test_percentage_rate():
+    assert 300 < sum(captured(Percentage(50), [((), {})] * 1000)) < 700
+
+
+def test_percentage_invalid():
+    with pytest.raises(ValueError):
+        Percentage(120)
+
+
+def test_rate_limit(mocker):
+    clock = mocker.patch("explotest.sampling.time.monotonic", return_value=10.0)
+    policy = RateLimit(2)
+
+    assert captured(policy, [((), {})] * 3) == [True, True, False]
+
+    clock.return_value = 11.5
+    assert captured(policy, [((), {})] * 3) == [True, True, False]
+
+
+def test_unique_arguments():
+    calls = [((1, 2), {}), ((1, 2), {}), ((1,), {"b": 2}), (([1], 2), {}), (([1], 2), {})]
+    assert captured(UniqueArguments(), calls) == [True, False, True, True, False]
+
+
+def test_unique_arguments_forget_the_least_recently_seen():
+    calls = [((1,), {}), ((2,), {}), ((1,), {}), ((3,), {}), ((1,), {}), ((2,), {})]
+    assert captured(UniqueArguments(maxsize=2), calls) == [True, True, False, True, False, True]
+
+
+def test_fingerprint_kwargs_order():
+    assert fingerprint((), {"a": 1, "b": 2}) == fingerprint((), {"b": 2, "a": 1})
+
+
+def test_unique_arguments_are_not_merged():
+    # hash(-1) == hash(-2), and 1 == 1.0 == True
+    calls = [((-1,), {}), ((-2,), {}), ((1,), {}), ((1.0,), {}), ((True,), {}), ((), {"x": 1}), ((), {"x": True})]
+    assert captured(UniqueArguments(), calls) == [True] * len(calls)
+
+
+def test_unhashable_arguments_are_digested():
+    assert fingerprint(([1],), {}) == fingerprint(([1],), {})
+    assert fingerprint(([1],), {}) != fingerprint(([1.0],), {})
+    assert fingerprint(([-1],), {}) != fingerprint(([-2],), {})
+
+
+def test_all_of_short_circuits():
+    first_n = FirstN(1)
+    policy = AllOf(Percentage(0), first_n)
+
+    assert captured(policy, [((), {})] * 2) == [False, False]
+    assert first_n.remaining == 1
+
+
+def test_all_of_records_to_all():
+    budget, breaker = OverheadBudget(10), CircuitBreaker(1)
+    policy = AllOf(breaker, budget)
+
+    policy.record(1.0, 0.5)
+    policy.record_outcome(True)
+
+    assert policy.timed
+    assert budget.overhead == 0.5
+    assert breaker.failures == 1
+
+
+def test_overhead_budget_rate():
+    policy = OverheadBudget(10, window=10)
+    assert policy.should_capture((), {})
+
+    # capturing costs as much as 20 calls, and may cost as much as a tenth of one
+    policy.record(1.0, 20.0)
+    for _ in range(9):
+        policy.record(1.0, None)
+
+    assert 0 < sum(captured(policy, [((), {})] * 10000)) < 2 * 10000 / 200
+
+
+def test_overhead_budget_window():
+    policy = OverheadBudget(10, window=2)
+    policy.record(1.0, 100.0)
+    policy.record(1.0, 0.01)
+    policy.record(1.0, 0.01)
+
+    assert policy.overhead == pytest.approx(0.02)
+    assert all(captured(policy, [((), {})] * 100))
+
+
+def test_overhead_budget_invalid():
+    with pytest.raises(ValueError):
+        OverheadBudget(-1)
+
+
+def test_circuit_breaker_trips_after_failures(mocker):
+    clock = mocker.patch("explotest.sampling.time.monotonic", return_value=10.0)
+    policy = CircuitBreaker(max_failures=2, cooldown=60)
+
+    policy.record_outcome(True)
+    assert policy.should_capture((), {})
+    policy.record_outcome(True)
+    assert not policy.should_capture((), {})
+
+    # one call is captured to check after the cooldown
+    clock.return_value = 71.0
+    assert captured(policy, [((), {})] * 2) == [True, False]
+    policy.record_outcome(False)
+    assert all(captured(policy, [((), {})] * 2))
+
+
+def test_circuit_breaker_trips_after_latency_spikes(mocker):
+    mocker.patch("explotest.sampling.time.monotonic", return_value=10.0)
+    policy = CircuitBreaker(max_failures=2, max_latency=1)
+
+    policy.record(0.1, 5)
+    policy.record(0.1, None)
+    policy.record(0.1, 0.5)
+    policy.record(0.1, 5)
+    assert policy.should_capture((), {})
+    policy.record(0.1, 5)
+    assert not policy.should_capture((), {})
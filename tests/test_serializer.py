@@ -0,0 +1,150 @@
+import sys
+
+import dill
+import pytest
+
+from explotest import config, module_globals, serializer
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __eq__(self, other):
+        return (self.x, self.y) == (other.x, other.y)
+
+
+@pytest.fixture(autouse=True)
+def clear_memo():
+    serializer._dill_types.clear()
+    serializer._dill_containers.clear()
+    yield
+    serializer._dill_types.clear()
+    serializer._dill_containers.clear()
+
+
+def test_plain_data_uses_pickle():
+    value = {"points": [Point(1, 2), Point(3, 4)], "total": 10}
+
+    payload = serializer.dumps(value)
+
+    assert b"dill" not in payload
+    assert dill.loads(payload) == value
+    assert serializer._dill_types == set()
+
+
+def test_lambda_falls_back_on_dill():
+    payload = serializer.dumps(lambda x: x + 1)
+
+    assert dill.loads(payload)(1) == 2
+    assert serializer._dill_types == {type(lambda: None)}
+
+
+def test_closure_falls_back_on_dill():
+    def make_adder(n):
+        def add(x):
+            return x + n
+
+        return add
+
+    assert dill.loads(serializer.dumps(make_adder(2)))(1) == 3
+
+
+def test_main_classes_are_saved_by_value(monkeypatch):
+    # pickle would save a reference to __main__.Local, which generated tests cannot import
+    class Local:
+        pass
+
+    Local.__module__ = "__main__"
+    Local.__qualname__ = "Local"
+    monkeypatch.setattr(sys.modules["__main__"], "Local", Local, raising=False)
+
+    payload = serializer.dumps(Local())
+
+    assert serializer._dill_types == {Local}
+    monkeypatch.delattr(sys.modules["__main__"], "Local")
+    assert type(dill.loads(payload)).__name__ == "Local"
+
+
+def test_containers_are_not_memoized():
+    serializer.dumps([lambda: None])
+    assert serializer._dill_types == set()
+
+    assert b"dill" not in serializer.dumps([1, 2, 3])
+
+
+def test_containers_are_memoized_per_fut_module(monkeypatch):
+    with module_globals.capturing("fut"):
+        serializer.dumps([lambda: None])
+
+    def fail(*args):
+        raise AssertionError("pickle should not be tried")
+
+    with monkeypatch.context() as m:
+        m.setattr(serializer._Pickler, "dump", fail)
+        with module_globals.capturing("fut"):
+            assert dill.loads(serializer.dumps([lambda: 1]))[0]() == 1
+
+    with module_globals.capturing("other"):
+        assert b"dill" not in serializer.dumps([1, 2, 3])
+    assert serializer._dill_types == set()
+
+
+def test_plain_values_are_pickled_without_reducer_override(monkeypatch):
+    def fail(*args):
+        raise AssertionError("reducer_override should not be called")
+
+    monkeypatch.setattr(serializer, "_saved_by_name", fail)
+
+    payload = serializer.dumps({"points": [Point(1, 2)], "module": None})
+
+    assert b"dill" not in payload
+    assert serializer._dill_types == set()
+
+
+def test_modules_are_saved_by_import():
+    value = [lambda: None, sys.modules[__name__]]
+
+    assert dill.loads(serializer.dumps(value))[1] is sys.modules[__name__]
+
+
+def test_memoized_types_skip_pickle(monkeypatch):
+    serializer._dill_types.add(Point)
+
+    def fail(*args):
+        raise AssertionError("pickle should not be tried")
+
+    monkeypatch.setattr(serializer._Pickler, "dump", fail)
+
+    assert dill.loads(serializer.dumps(Point(1, 2))) == Point(1, 2)
+
+
+def test_dill_is_not_configured_globally():
+    serializer.dumps(lambda: None)
+
+    assert dill.settings["recurse"] is False
+
+
+class Holder:
+    def __init__(self, value):
+        self.value = value
+
+
+SHARED = Point(0, 0)
+
+
+def test_globals_are_saved_by_reference(monkeypatch):
+    monkeypatch.setattr(config, "by_reference", True)
+
+    payload = serializer.dumps(Holder(SHARED))
+
+    assert dill.loads(payload).value is SHARED
+
+
+def test_globals_are_saved_by_reference_with_dill(monkeypatch):
+    monkeypatch.setattr(config, "by_reference", True)
+
+    value = [lambda: None, SHARED]
+
+    assert dill.loads(serializer.dumps(value))[1] is SHARED
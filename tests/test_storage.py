@@ -0,0 +1,158 @@
+import ast
+
+import dill
+import pytest
+
+from explotest import config, serializer
+from explotest.runtime import load_blob
+from explotest.storage import (
+    CODECS,
+    ArchiveStore,
+    ContentAddressedStore,
+    SpillingWriter,
+    digest_of,
+    get_store,
+)
+
+
+def run_load(store, key):
+    """Execute the code emitted by store.make_load and return the loaded value."""
+    module = ast.fix_missing_locations(
+        ast.Module(body=store.make_load_imports(key) + store.make_load("x", key))
+    )
+    scope = {"dill": dill}
+    exec(compile(module, "<generated>", "exec"), scope)
+    return scope["x"]
+
+
+def test_put_is_content_addressed(tmp_path):
+    store = ContentAddressedStore(tmp_path)
+
+    first = store.put(b"payload")
+    second = store.put(b"payload")
+
+    assert first == second == digest_of(b"payload")
+    assert store.path_of(first).read_bytes() == b"payload"
+    assert list(tmp_path.iterdir()) == [store.path_of(first)]
+
+
+def test_put_distinct_payloads(tmp_path):
+    store = ContentAddressedStore(tmp_path)
+    assert store.put(b"a") != store.put(b"b")
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_existing_file_is_reused(tmp_path):
+    path = ContentAddressedStore(tmp_path).path_of(
+        ContentAddressedStore(tmp_path).put(b"payload")
+    )
+    mtime = path.stat().st_mtime_ns
+
+    # a fresh store (e.g. a new process) does not rewrite payloads already on disk
+    ContentAddressedStore(tmp_path).put(b"payload")
+    assert path.stat().st_mtime_ns == mtime
+
+
+@pytest.mark.parametrize("store_type", [ContentAddressedStore, ArchiveStore])
+def test_round_trip(tmp_path, store_type):
+    store = store_type(tmp_path)
+    key = store.put(dill.dumps({"a": [1, 2]}))
+    assert run_load(store, key) == {"a": [1, 2]}
+
+
+def test_archive_is_a_single_file(tmp_path):
+    store = ArchiveStore(tmp_path)
+    keys = {store.put(dill.dumps(i)) for i in range(100)}
+    store.put(dill.dumps(0))
+
+    assert len(keys) == 100
+    assert {p.name for p in tmp_path.iterdir()} <= {
+        "captures.sqlite",
+        "captures.sqlite-wal",
+        "captures.sqlite-shm",
+    }
+    assert load_blob(str(store.path), digest_of(dill.dumps(42))) == 42
+
+
+def test_load_blob_missing_key(tmp_path):
+    store = ArchiveStore(tmp_path)
+    store.put(b"x")
+    with pytest.raises(KeyError):
+        load_blob(str(store.path), "missing")
+
+
+@pytest.fixture
+def archive_storage():
+    config.set_storage("archive")
+    yield
+    config.set_storage("files")
+
+
+def test_get_store_follows_config(tmp_path, archive_storage):
+    assert isinstance(get_store(tmp_path), ArchiveStore)
+    assert get_store(tmp_path) is get_store(tmp_path)
+
+
+def test_get_store_unknown_kind(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "storage", "tape")
+    with pytest.raises(ValueError):
+        get_store(tmp_path)
+
+
+@pytest.fixture
+def compression(request):
+    config.set_compression(request.param, threshold=1024)
+    yield CODECS[request.param] if request.param else None
+    config.set_compression(None, threshold=1 << 20)
+
+
+@pytest.mark.parametrize("compression", [None, *CODECS], indirect=True)
+@pytest.mark.parametrize("store_type", [ContentAddressedStore, ArchiveStore])
+def test_dump_round_trip(tmp_path, store_type, compression):
+    store = store_type(tmp_path)
+    small, large = list(range(10)), list(range(20_000))
+
+    small_key, large_key = store.dump(small), store.dump(large)
+
+    assert small_key == digest_of(serializer.dumps(small))
+    assert large_key == digest_of(serializer.dumps(large))
+    assert store.dump(list(range(20_000))) == large_key
+    assert run_load(store, small_key) == small
+    assert run_load(store, large_key) == large
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("compression", ["gzip"], indirect=True)
+def test_only_large_payloads_are_compressed(tmp_path, compression):
+    store = ContentAddressedStore(tmp_path)
+    small_key, large_key = store.dump("x"), store.dump("x" * 100_000)
+
+    assert store.path_of(small_key).exists()
+    assert store.path_of(large_key, compression).stat().st_size < 10_000
+    load = ast.fix_missing_locations(store.make_load("x", large_key)[0])
+    assert "gzip.open" in ast.unparse(load)
+    assert ast.unparse(store.make_load_imports(large_key)[0]) == "import gzip"
+    assert store.make_load_imports(small_key) == []
+
+
+def test_spilling_writer_bounds_memory(tmp_path):
+    writer = SpillingWriter(tmp_path, threshold=100, codec=None)
+    for _ in range(100):
+        writer.write(b"x" * 50)
+        assert len(writer.buffer) <= 150
+    writer.close()
+
+    assert writer.tmp_path.read_bytes() == b"x" * 5000
+    assert writer.digest == digest_of(b"x" * 5000)
+    writer.discard()
+    assert not writer.tmp_path.exists()
+
+
+def test_failed_dump_leaves_nothing_behind(tmp_path):
+    config.set_compression(None, threshold=16)
+    try:
+        with pytest.raises(TypeError):
+            ContentAddressedStore(tmp_path).dump(["x" * 100, (i for i in range(3))])
+    finally:
+        config.set_compression(None, threshold=1 << 20)
+    assert list(tmp_path.iterdir()) == []
@@ -1,5 +1,7 @@
+import ast
 import inspect
 
+from explotest import capture_cache
 from explotest.reconstructors.argument_reconstructor import ArgumentReconstructor
 from explotest.test_builder import TestBuilder
 
@@ -250,3 +252,51 @@ def test_test_builder_complex_signature_from_demo(tmp_path):
     # Verify **kwargs present
     kwargs_kw = [kw for kw in call.keywords if kw.arg is None]
     assert len(kwargs_kw) == 1
+
+
+class Config:
+    pass
+
+
+class Job:
+    def __init__(self, config):
+        self.config = config
+
+
+def test_test_builder_shared_objects_are_generated_once(tmp_path):
+    def example_func(a, b, c):
+        pass
+
+    sig = inspect.signature(example_func)
+    config = Config()
+    first, second = Job(config), Job(config)
+
+    bound_args = sig.bind(first, second, first)
+    tb = TestBuilder(tmp_path / "fut.py", "fut", dict(bound_args.arguments))
+    # like CaptureJob.arrange
+    with capture_cache.scope():
+        tb.build_imports(None).build_fixtures(
+            ArgumentReconstructor(tmp_path / "fut.py")
+        ).build_act_phase(sig)
+
+    source = ast.unparse(tb.get_meta_test().make_test())
+    compile(source, "test_fut.py", "exec")
+
+    assert source.count("fut.Config.__new__") == 1
+    assert source.count("fut.Job.__new__") == 2
+    # the same object is passed twice
+    assert "return generate_a" in source
+
+
+def test_test_builder_missing_defaults(tmp_path):
+    """Parameters left out take their default: the positional parameters after them are passed by keyword."""
+
+    def foo(x, y=2, z=3, *, bar=4):
+        pass
+
+    sig = inspect.signature(foo)
+    tb = TestBuilder(tmp_path, "foo", {"x": 1, "z": 5})
+    tb.build_imports(None).build_fixtures(ArgumentReconstructor(tmp_path)).build_act_phase(sig)
+
+    call = tb.get_meta_test().act_phase.value
+    assert ast.unparse(call) == f"{tmp_path.stem}.foo(x, z=z)"
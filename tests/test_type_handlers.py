@@ -0,0 +1,234 @@
+import ast
+import datetime
+import decimal
+import enum
+import fractions
+import pathlib
+import sys
+import uuid
+import zoneinfo
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+import pytest
+from pytest import fixture
+
+from explotest import capture_cache
+from explotest.reconstructors import type_handlers
+from explotest.reconstructors.argument_reconstructor import ArgumentReconstructor
+from explotest.reconstructors.pickle_reconstructor import PickleReconstructor
+from explotest.reconstructors.type_handlers import ExpressionWriter
+
+
+class Color(enum.Enum):
+    RED = 1
+    GREEN = 2
+
+
+class Permission(enum.Flag):
+    READ = 1
+    WRITE = 2
+
+
+Pair = namedtuple("Pair", ["left", "right"])
+
+
+class Span(NamedTuple):
+    start: datetime.date
+    end: datetime.date
+
+
+@dataclass(frozen=True)
+class Point:
+    x: int
+    y: int
+
+
+@dataclass
+class Order:
+    placed: datetime.datetime
+    total: decimal.Decimal
+    tags: list = field(default_factory=list)
+
+
+@dataclass
+class Checked:
+    x: int
+
+    def __post_init__(self):
+        assert self.x >= 0
+
+
+class Holder:
+    def __init__(self, value):
+        self.value = value
+
+
+def rebuild(value):
+    """Write the expression for value, then evaluate it from source, like a generated test."""
+    writer = ExpressionWriter("fut")
+    expression = writer.expression(value)
+    assert expression is not None
+    scope: dict = {}
+    module = ast.Module(body=writer.imports, type_ignores=[])
+    exec(ast.unparse(ast.fix_missing_locations(module)), scope)
+    return eval(ast.unparse(ast.fix_missing_locations(expression)), scope)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        b"\x00bytes",
+        (1, "a", None),
+        frozenset({1, 2}),
+        frozenset(),
+        range(1, 10, 3),
+        datetime.date(2024, 1, 31),
+        datetime.datetime(2024, 1, 31, 12, 30, 15, 500),
+        datetime.datetime(2024, 1, 31, tzinfo=datetime.timezone.utc),
+        datetime.datetime(
+            2024, 1, 31, tzinfo=datetime.timezone(datetime.timedelta(hours=-5), "EST")
+        ),
+        datetime.datetime(2024, 1, 31, tzinfo=zoneinfo.ZoneInfo("UTC")),
+        datetime.time(23, 59, 1),
+        datetime.timedelta(days=-1, seconds=5),
+        decimal.Decimal("3.14159265358979323846"),
+        fractions.Fraction(1, 3),
+        uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        pathlib.PurePosixPath("/tmp/a.txt"),
+        pathlib.Path("relative/b.txt"),
+        (datetime.date(2024, 1, 1), (decimal.Decimal("1.5"),)),
+        Color.GREEN,
+        Permission.READ | Permission.WRITE,
+        Pair(1, 2),
+        Span(datetime.date(2024, 1, 1), datetime.date(2024, 12, 31)),
+        Point(1, 2),
+        Order(datetime.datetime(2024, 1, 31), decimal.Decimal("9.99"), ["gift"]),
+    ],
+)
+def test_value_round_trips(value):
+    rebuilt = rebuild(value)
+    assert type(rebuilt) is type(value)
+    assert rebuilt == value
+
+
+def test_unsupported_values_have_no_expression():
+    writer = ExpressionWriter("fut")
+    assert writer.expression(Holder(1)) is None
+    assert writer.expression(Checked(1)) is None
+    assert writer.expression((1, Holder(1))) is None
+    assert writer.expression(b"x" * (type_handlers.MAX_BYTES_LENGTH + 1)) is None
+
+
+def test_local_classes_have_no_expression():
+    @dataclass
+    class Local:
+        x: int
+
+    assert ExpressionWriter("fut").expression(Local(1)) is None
+
+
+def test_mutable_dataclass_is_not_inlined():
+    writer = ExpressionWriter("fut")
+    order = Order(datetime.datetime(2024, 1, 31), decimal.Decimal("1"))
+    assert writer.expression(order) is not None
+    assert writer.inline(order) is None
+    assert writer.inline(Point(1, 2)) is not None
+
+
+def test_fut_classes_are_referenced_through_the_fut_module(monkeypatch):
+    monkeypatch.setattr(Point, "__module__", "__main__")
+    monkeypatch.setattr(sys.modules["__main__"], "Point", Point, raising=False)
+    writer = ExpressionWriter("fut")
+    assert ast.unparse(writer.expression(Point(1, 2))) == "fut.Point(x=1, y=2)"
+    assert writer.imports == []
+
+
+def test_imports_are_collected_once():
+    writer = ExpressionWriter("fut")
+    writer.expression((datetime.date(2024, 1, 1), datetime.date(2024, 1, 2)))
+    assert [ast.unparse(i) for i in writer.imports] == ["import datetime"]
+
+
+def test_register(monkeypatch):
+    monkeypatch.setattr(type_handlers, "_handlers", dict(type_handlers._handlers))
+    monkeypatch.setattr(type_handlers, "_handler_of", {})
+    type_handlers.register(
+        Holder, lambda value, writer: writer.call(writer.qualified(Holder), value.value)
+    )
+
+    assert rebuild(Holder(datetime.date(2024, 1, 1))).value == datetime.date(2024, 1, 1)
+
+
+def test_pickle_mode_writes_no_file(tmp_path):
+    reconstructor = PickleReconstructor(tmp_path / "fut.py")
+
+    mf = reconstructor.make_fixture("d", datetime.date(2024, 1, 31))
+
+    assert ast.unparse(mf.body[0]) == "d = datetime.date(2024, 1, 31)"
+    assert [ast.unparse(i) for i in mf.imports] == ["import datetime"]
+    assert not [p for p in tmp_path.rglob("*") if p.is_file()]
+
+
+@fixture
+def arr(tmp_path):
+    yield ArgumentReconstructor(
+        tmp_path / "fut.py", backup_reconstructor=PickleReconstructor
+    )
+
+
+def test_arr_builds_attributes_in_place(arr):
+    holder = Holder(Span(datetime.date(2024, 1, 1), datetime.date(2024, 1, 2)))
+
+    mf = arr.make_fixture("h", holder)
+
+    assert mf.depends == []
+    source = ast.unparse(mf.body)
+    assert (
+        "Span(start=datetime.date(2024, 1, 1), end=datetime.date(2024, 1, 2))" in source
+    )
+    assert "import datetime" in [ast.unparse(i) for i in mf.imports]
+
+
+def test_arr_keeps_mutable_dataclass_fixtures(arr):
+    order = Order(datetime.datetime(2024, 1, 31), decimal.Decimal("1"))
+    holder = Holder([order, order])
+
+    mf = arr.make_fixture("h", holder)
+
+    # the order is shared, so it is built once, by a fixture of its own
+    [values] = mf.depends
+    assert len({id(d) for d in values.depends}) == 1
+    order_fixture = values.depends[0]
+    assert "Order(placed=datetime.datetime(2024, 1, 31, 0, 0, 0, 0)" in ast.unparse(
+        order_fixture.body
+    )
+
+
+def nested_lists(depth):
+    value = []
+    for _ in range(depth):
+        value = [value]
+    return value
+
+
+def test_deep_nesting_does_not_recurse():
+    """Test that values nested far deeper than the recursion limit have no expression, rather than raising."""
+    deep_tuple = ()
+    for _ in range(20_000):
+        deep_tuple = (deep_tuple, Color.RED)
+
+    writer = ExpressionWriter("fut")
+    with capture_cache.scope():
+        assert writer.expression([nested_lists(20_000), Holder(1)]) is None
+        assert writer.expression(deep_tuple) is None
+        assert writer.expression(frozenset([deep_tuple])) is None
+    shallow = (((1, Color.RED),),)
+    assert rebuild(shallow) == shallow
+
+
+def test_arr_deep_nesting_in_dataclass(arr):
+    mf = arr.make_fixture("o", Order(datetime.datetime(2024, 1, 31), decimal.Decimal("1"), nested_lists(20_000)))
+
+    assert mf is not None